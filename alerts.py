@@ -0,0 +1,288 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+RECEIPT_LOG = os.path.join("logs", "alert_receipts.jsonl")
+
+
+class Delivery:
+    """One alert message on its way through one channel"""
+
+    def __init__(self, alert_id, channel, message, on_receipt=None):
+        self.alert_id = alert_id
+        self.channel = channel
+        self.message = message
+        self.on_receipt = on_receipt
+        self.created = time.time()
+        self.attempts = 0
+
+
+class ClientPool:
+    """A small pool of lazily created, reused transport clients.
+
+    At most `size` clients exist at once. acquire() reuses a free client,
+    creates one while below the limit, and otherwise waits; discard() frees
+    the slot of a broken client and wakes a waiter so it can create a new one.
+    """
+
+    def __init__(self, factory, size=1):
+        self.factory = factory
+        self._free = []
+        self._cond = threading.Condition()
+        self._created = 0
+        self.size = size
+
+    def acquire(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free or self._created < self.size, timeout):
+                raise TimeoutError("no transport client became available")
+            if self._free:
+                return self._free.pop()
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            self.discard(None)
+            raise
+
+    def release(self, client):
+        with self._cond:
+            self._free.append(client)
+            self._cond.notify()
+
+    def discard(self, client):
+        """Drop a client that failed in a way that may have broken it"""
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+
+class Transport:
+    """Delivers a message; returns a receipt string or raises on failure"""
+
+    def send(self, message):
+        raise NotImplementedError
+
+
+class PooledTransport(Transport):
+    def __init__(self, factory, pool_size=1):
+        self.pool = ClientPool(factory, pool_size)
+
+    def send(self, message):
+        client = self.pool.acquire()
+        try:
+            receipt = self._send(client, message)
+        except Exception:
+            self.pool.discard(client)
+            raise
+        self.pool.release(client)
+        return receipt
+
+    def _send(self, client, message):
+        raise NotImplementedError
+
+
+def _twilio_client(account_sid, auth_token):
+    from twilio.rest import Client
+    return lambda: Client(account_sid, auth_token)
+
+
+class TwilioSmsTransport(PooledTransport):
+    def __init__(self, account_sid, auth_token, from_number, to_number, pool_size=2):
+        super().__init__(_twilio_client(account_sid, auth_token), pool_size)
+        self.from_number = from_number
+        self.to_number = to_number
+
+    def _send(self, client, message):
+        return client.messages.create(body=message, from_=self.from_number, to=self.to_number).sid
+
+
+class TwilioCallTransport(PooledTransport):
+    def __init__(self, account_sid, auth_token, from_number, to_number, pool_size=1):
+        super().__init__(_twilio_client(account_sid, auth_token), pool_size)
+        self.from_number = from_number
+        self.to_number = to_number
+
+    def _send(self, client, message):
+        twiml = f"<Response><Say>{escape(message)}</Say></Response>"
+        return client.calls.create(to=self.to_number, from_=self.from_number, twiml=twiml).sid
+
+
+class SpeechTransport(PooledTransport):
+    """Speaks the message; a pool of one engine serializes speech"""
+
+    def __init__(self, rate=150):
+        def factory():
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', rate)
+            return engine
+        super().__init__(factory, pool_size=1)
+
+    def _send(self, engine, message):
+        engine.say(message)
+        engine.runAndWait()
+        return "spoken"
+
+
+class AlarmTransport(Transport):
+    def __init__(self, wav_path="alarm.wav"):
+        self.wav_path = wav_path
+        self._wave = None
+
+    def send(self, message):
+        import simpleaudio as sa
+        if self._wave is None:
+            self._wave = sa.WaveObject.from_wave_file(self.wav_path)
+        self._wave.play()
+        return "played"
+
+
+class StubTransport(Transport):
+    """Local stand-in for any channel, for offline load tests"""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent = []
+        self._random = random.Random(seed)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self._random.random() < self.failure_rate:
+                raise RuntimeError("stub transport failure")
+            self.sent.append(message)
+            return f"STUB{next(self._counter):06d}"
+
+
+class AlertDispatcher:
+    """Delivers alerts on worker threads so detection loops never wait on them.
+
+    submit() only enqueues; a full queue drops the delivery (and logs it)
+    rather than blocking the caller. Failed deliveries are retried with
+    exponential backoff, and every outcome is appended to a JSONL receipt log.
+    """
+
+    def __init__(self, transports, workers=2, max_queue=64, max_attempts=3,
+                 backoff=0.5, backoff_factor=2.0, receipt_path=RECEIPT_LOG):
+        self.transports = dict(transports)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.receipt_path = receipt_path
+        self.stats = {"submitted": 0, "delivered": 0, "failed": 0, "retried": 0, "dropped": 0}
+
+        self._receipt_file = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running = True
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, message, channels, on_receipt=None):
+        """Queue `message` on each channel; returns the alert id without blocking"""
+        alert_id = next(self._ids)
+        for channel in channels:
+            if channel not in self.transports:
+                logger.warning(f"No transport for alert channel '{channel}'")
+                continue
+            delivery = Delivery(alert_id, channel, message, on_receipt)
+            self._count("submitted")
+            self._enqueue(delivery)
+        return alert_id
+
+    def _enqueue(self, delivery):
+        try:
+            self._queue.put_nowait(delivery)
+        except queue.Full:
+            self._count("dropped")
+            self._receipt(delivery, "dropped")
+
+    def _run(self):
+        while self._running:
+            try:
+                delivery = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            delivery.attempts += 1
+            try:
+                receipt = self.transports[delivery.channel].send(delivery.message)
+            except Exception as e:
+                if delivery.attempts < self.max_attempts and self._running:
+                    self._count("retried")
+                    delay = self.backoff * self.backoff_factor ** (delivery.attempts - 1)
+                    self._receipt(delivery, "retrying", error=str(e))
+                    timer = threading.Timer(delay, self._enqueue, args=(delivery,))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    self._count("failed")
+                    self._receipt(delivery, "failed", error=str(e))
+                continue
+            self._count("delivered")
+            self._receipt(delivery, "delivered", receipt=receipt)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _receipt(self, delivery, status, receipt=None, error=None):
+        record = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "alert_id": delivery.alert_id,
+            "channel": delivery.channel,
+            "status": status,
+            "attempts": delivery.attempts,
+            "latency_ms": round((time.time() - delivery.created) * 1000, 1),
+        }
+        if receipt is not None:
+            record["receipt"] = receipt
+        if error is not None:
+            record["error"] = error
+        log = logger.warning if status in ("failed", "dropped") else logger.info
+        log(f"Alert {delivery.alert_id} via {delivery.channel}: {status}")
+        if self.receipt_path:
+            line = json.dumps(record) + "\n"
+            with self._lock:
+                if self._receipt_file is None:
+                    os.makedirs(os.path.dirname(self.receipt_path) or ".", exist_ok=True)
+                    self._receipt_file = open(self.receipt_path, "a", buffering=1)
+                self._receipt_file.write(line)
+        if delivery.on_receipt is not None and status != "retrying":
+            delivery.on_receipt(delivery, status, receipt or error)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        with self._lock:
+            if self._receipt_file is not None:
+                self._receipt_file.close()
+                self._receipt_file = None
+
+
+def stub_transports(channels, **kwargs):
+    return {channel: StubTransport(**kwargs) for channel in channels}
+
+
+def use_stub_transports():
+    """True when ALERT_TRANSPORT=stub, e.g. for offline load tests"""
+    return os.getenv("ALERT_TRANSPORT", "").lower() == "stub"
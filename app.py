@@ -1,8 +1,17 @@
+import argparse
 import logging
-from ui import EmergencySoundTracker
+import sys
+
+from startup import StartupProfiler
 import atexit
 
 def main():
+    parser = argparse.ArgumentParser(description="Emergency Sound Tracker")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time spent per import and per initialization once warm-up finishes")
+    args = parser.parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup)
+
     # Setup logging
     logging.basicConfig(
         level=logging.INFO,
@@ -13,8 +22,18 @@ def main():
         ]
     )
 
+    # ui only imports what the window needs; the heavy modules load in the
+    # background once it is on screen
+    ui = profiler.import_module("ui")
+
     # Create the application
-    app = EmergencySoundTracker()
+    with profiler.phase("create window"):
+        app = ui.EmergencySoundTracker(profiler=profiler)
+    if args.profile_startup:
+        def report():
+            profiler.stop()
+            print(profiler.report(), file=sys.stderr)
+        app.on_warmup_done = report
     
     # Ensure proper cleanup on exit
     atexit.register(lambda: app.scheduler.stop() if hasattr(app, 'scheduler') else None)
@@ -30,4 +49,4 @@ def main():
         app.destroy()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
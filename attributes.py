@@ -0,0 +1,148 @@
+import threading
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+MODEL_PATH = "face_attrib_net-facial-attribute-detection-float.onnx"
+INT8_MODEL_PATH = "face_attrib_net-facial-attribute-detection-int8.onnx"
+INPUT_SIZE = 128
+
+GENDERS = ["Male", "Female"]
+EMOTIONS = ["Neutral", "Happy", "Sad", "Surprise", "Anger"]
+
+OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def _to_probabilities(logits):
+    logits = np.asarray(logits, dtype=np.float32).ravel()
+    if logits.min() >= 0 and abs(logits.sum() - 1.0) < 1e-3:
+        return logits  # the model already applied a softmax
+    exp = np.exp(logits - logits.max())
+    return exp / exp.sum()
+
+
+class AttributeModel:
+    """face_attrib_net ONNX session with preallocated preprocessing buffers"""
+
+    def __init__(self, model_path=None, quantized=False, intra_op_threads=1,
+                 inter_op_threads=1, optimization_level="all"):
+        if model_path is None:
+            model_path = INT8_MODEL_PATH if quantized else MODEL_PATH
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = OPTIMIZATION_LEVELS[optimization_level]
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        self._resized = np.empty((INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+        self._swapped = np.empty((INPUT_SIZE, INPUT_SIZE, 3), dtype=np.uint8)
+        self._blob = np.empty((1, 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+
+    def infer(self, face_crop):
+        """Return (gender probabilities, emotion probabilities) for a BGR face crop"""
+        cv2.resize(face_crop, (INPUT_SIZE, INPUT_SIZE), dst=self._resized)
+        # Same channel swap the original per-frame code applied before the model
+        cv2.cvtColor(self._resized, cv2.COLOR_RGB2BGR, dst=self._swapped)
+        # HWC uint8 -> CHW float32 in [0, 1], written straight into the input blob
+        np.multiply(self._swapped.transpose(2, 0, 1), 1.0 / 255.0, out=self._blob[0], dtype=np.float32)
+        outputs = self.session.run(None, {self.input_name: self._blob})
+        return _to_probabilities(outputs[0]), _to_probabilities(outputs[1])
+
+
+class AttributeWorker:
+    """Runs AttributeModel off the frame loop and smooths its predictions.
+
+    submit() never blocks: it hands the newest face crop to a background thread
+    only every `every_n_frames` frames or when the crop changed noticeably, and
+    returns the current smoothed (gender, emotion) labels.
+    """
+
+    def __init__(self, model, every_n_frames=10, change_threshold=12.0, smoothing=0.3):
+        self.model = model
+        self.every_n_frames = every_n_frames
+        self.change_threshold = change_threshold
+        self.smoothing = smoothing
+
+        self.gender_probs = None
+        self.emotion_probs = None
+        self.inferences = 0
+        self.skipped = 0
+
+        self._last_index = None
+        self._last_thumb = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _changed(self, thumb):
+        if self._last_thumb is None:
+            return True
+        diff = cv2.absdiff(thumb, self._last_thumb)
+        return float(diff.mean()) > self.change_threshold
+
+    def submit(self, frame_index, face_crop):
+        if face_crop.size == 0:
+            return self.labels()
+        thumb = cv2.resize(cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY), (16, 16),
+                           interpolation=cv2.INTER_AREA)
+        due = self._last_index is None or frame_index - self._last_index >= self.every_n_frames
+        if due or self._changed(thumb):
+            self._last_index = frame_index
+            self._last_thumb = thumb
+            with self._cond:
+                # Latest crop wins; the frame buffer may be reused, so keep a copy
+                self._pending = face_crop.copy()
+                self._cond.notify()
+        else:
+            self.skipped += 1
+        return self.labels()
+
+    def _smooth(self, current, update):
+        if current is None or current.shape != update.shape:
+            return update
+        return current + self.smoothing * (update - current)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                crop, self._pending = self._pending, None
+            try:
+                gender, emotion = self.model.infer(crop)
+            except Exception as e:
+                print("⚠️ Attribute detection error:", e)
+                continue
+            self.gender_probs = self._smooth(self.gender_probs, gender)
+            self.emotion_probs = self._smooth(self.emotion_probs, emotion)
+            self.inferences += 1
+
+    def labels(self):
+        return (self._label(self.gender_probs, GENDERS),
+                self._label(self.emotion_probs, EMOTIONS))
+
+    @staticmethod
+    def _label(probs, names):
+        if probs is None:
+            return "Unknown"
+        idx = int(np.argmax(probs))
+        return names[idx] if idx < len(names) else "Unknown"
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1)
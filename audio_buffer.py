@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from streaming import RunningStats
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# data is a memoryview into a preallocated slot, valid until the next get();
+# timestamp is time.monotonic() when the block arrived from the driver.
+AudioBlock = namedtuple("AudioBlock", ["data", "timestamp", "seq"])
+
+
+class AudioBlockQueue:
+    """Bounded single-producer queue of audio blocks backed by preallocated slots.
+
+    put() runs in the audio callback: it copies the block into a free slot and
+    never allocates or blocks. When all `capacity` slots are waiting, the
+    policy decides which block is lost: drop_oldest keeps latency bounded,
+    drop_newest keeps the audio already queued contiguous. One extra slot is
+    reserved for the block the consumer is currently decoding.
+    """
+
+    def __init__(self, block_bytes, capacity=16, policy=DROP_OLDEST, latency_window=200):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.block_bytes = block_bytes
+        self.capacity = capacity
+        self.policy = policy
+        self._slots = [bytearray(block_bytes) for _ in range(capacity + 1)]
+        self._views = [memoryview(slot) for slot in self._slots]
+        self._free = deque(range(capacity + 1))
+        self._ready = deque()
+        self._held = None
+        self._cond = threading.Condition()
+        self._seq = 0
+
+        self.overflows = 0
+        self.max_depth = 0
+        self.queue_latency = RunningStats(latency_window)
+        self.max_queue_latency_ms = 0.0
+
+    def put(self, data, timestamp=None, block=False, timeout=None):
+        """Queue a copy of `data`; returns False if the block itself was dropped.
+
+        block=True waits (up to `timeout`) for a free slot instead of applying
+        the drop policy, for file replay that must not lose audio; it returns
+        False without queueing if the wait times out.
+        """
+        data = memoryview(data).cast("B")
+        size = min(len(data), self.block_bytes)
+        with self._cond:
+            if block and not self._cond.wait_for(lambda: len(self._ready) < self.capacity, timeout):
+                return False
+            timestamp = time.monotonic() if timestamp is None else timestamp
+            if len(self._ready) < self.capacity:
+                slot = self._free.popleft()
+            elif self.policy == DROP_NEWEST:
+                self.overflows += 1
+                return False
+            else:
+                slot = self._ready.popleft()[0]
+                self.overflows += 1
+            self._views[slot][:size] = data[:size]
+            self._seq += 1
+            self._ready.append((slot, size, timestamp, self._seq))
+            self.max_depth = max(self.max_depth, len(self._ready))
+            self._cond.notify_all()
+        return True
+
+    def get(self, timeout=None):
+        """Return the oldest queued AudioBlock, or None on timeout.
+
+        The previously returned block's slot is recycled, so its data must not
+        be used after this call.
+        """
+        with self._cond:
+            if self._held is not None:
+                self._free.append(self._held)
+                self._held = None
+            if not self._cond.wait_for(lambda: self._ready, timeout):
+                return None
+            slot, size, timestamp, seq = self._ready.popleft()
+            self._held = slot
+            self._cond.notify_all()
+        waited_ms = (time.monotonic() - timestamp) * 1000
+        self.queue_latency.update(waited_ms)
+        self.max_queue_latency_ms = max(self.max_queue_latency_ms, waited_ms)
+        return AudioBlock(self._views[slot][:size], timestamp, seq)
+
+    def qsize(self):
+        return len(self._ready)
+
+    def clear(self):
+        with self._cond:
+            while self._ready:
+                self._free.append(self._ready.popleft()[0])
+
+    def stats(self):
+        return {
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "overflows": self.overflows,
+            "queue_latency_ms": round(self.queue_latency.mean, 1),
+            "max_queue_latency_ms": round(self.max_queue_latency_ms, 1),
+        }
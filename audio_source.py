@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+import time
+import wave
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+
+class AudioSource:
+    """Base class for everything that feeds 16-bit mono PCM blocks to the speech engine.
+
+    start(push) delivers blocks by calling push(data, block=...) from the
+    source's own thread; block=True asks the engine to wait a while for queue
+    space instead of dropping audio, and push returns False if it gave up.
+    `finished` is set, and `on_finished()` called if assigned, once a finite
+    source has delivered everything.
+    """
+
+    def __init__(self, samplerate=16000, blocksize=4000):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.finished = threading.Event()
+        self.on_finished = None
+
+    def start(self, push):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class MicrophoneSource(AudioSource):
+    def __init__(self, samplerate=16000, blocksize=4000, device=None):
+        super().__init__(samplerate, blocksize)
+        self.device = device
+        self.stream = None
+
+    def start(self, push):
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            if status:
+                logger.warning(f"Audio stream status: {status}")
+            push(indata)
+
+        self.stream = sd.RawInputStream(
+            samplerate=self.samplerate,
+            blocksize=self.blocksize,
+            device=self.device,
+            dtype='int16',
+            channels=1,
+            callback=callback
+        )
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class PcmFileSource(AudioSource):
+    """Replays raw 16-bit mono PCM; at real-time pace or, with realtime=False, as fast as it is decoded"""
+
+    def __init__(self, path, samplerate=16000, blocksize=4000, realtime=True):
+        super().__init__(samplerate, blocksize)
+        if not os.path.isfile(path):
+            raise IOError(f"Cannot open audio file: {path}")
+        self.path = path
+        self.realtime = realtime
+        self.running = False
+        self.thread = None
+
+    def _open(self):
+        return open(self.path, "rb")
+
+    def _read(self, f):
+        return f.read(self.blocksize * 2)
+
+    def start(self, push):
+        self.running = True
+        self.finished.clear()
+        self.thread = threading.Thread(target=self._run, args=(push,), daemon=True)
+        self.thread.start()
+
+    def _run(self, push):
+        block_seconds = self.blocksize / self.samplerate
+        next_due = time.monotonic()
+        try:
+            with self._open() as f:
+                while self.running:
+                    data = self._read(f)
+                    if not data:
+                        break
+                    if self.realtime:
+                        next_due += block_seconds
+                        delay = next_due - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    # Paced replay behaves like a microphone; fast replay must not lose audio
+                    if self.realtime:
+                        push(data)
+                    else:
+                        while self.running and not push(data, block=True):
+                            pass
+        finally:
+            self.running = False
+            self.finished.set()
+            if self.on_finished is not None:
+                self.on_finished()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=1)
+
+
+class WavFileSource(PcmFileSource):
+    """Replays a 16-bit mono WAV file recorded at the engine's sample rate"""
+
+    def __init__(self, path, samplerate=16000, blocksize=4000, realtime=True):
+        super().__init__(path, samplerate, blocksize, realtime)
+        with wave.open(path, "rb") as w:
+            if w.getnchannels() != 1 or w.getsampwidth() != 2 or w.getframerate() != samplerate:
+                raise ValueError(f"{path}: expected 16-bit mono {samplerate} Hz audio, got "
+                                 f"{w.getsampwidth() * 8}-bit, {w.getnchannels()} channels, {w.getframerate()} Hz")
+            self.duration = w.getnframes() / samplerate
+
+    def _open(self):
+        return wave.open(self.path, "rb")
+
+    def _read(self, w):
+        return w.readframes(self.blocksize)
+
+
+def open_audio_source(spec=None, samplerate=16000, blocksize=4000, realtime=True, device=None):
+    """Pick a source: None for the microphone, a .wav file, or any other file as raw PCM"""
+    if spec is None:
+        return MicrophoneSource(samplerate, blocksize, device)
+    if spec.lower().endswith(".wav"):
+        return WavFileSource(spec, samplerate, blocksize, realtime)
+    return PcmFileSource(spec, samplerate, blocksize, realtime)
@@ -0,0 +1,156 @@
+"""Headless, faster-than-real-time gesture analysis of recorded sessions.
+
+Usage:
+    python batch_analysis.py session.mp4 -o timeline.jsonl
+    python batch_analysis.py session.mp4 -o timeline.csv --segment 120 --workers 4
+
+The expensive FaceMesh pass runs on video segments in a process pool. The
+stateful blink/nod/twitch analyzers that GestureDetector uses then consume the
+landmarks strictly in frame order in this process, so consecutive-blink chains,
+cooldowns and moving windows carry across segment boundaries exactly as in a
+live run. No alerts are sent; events are written to a JSONL or CSV timeline.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from face_analyzers import BlinkAnalyzer, NodAnalyzer, TwitchAnalyzer
+from face_pipeline import FaceObservation
+
+TIMELINE_FIELDS = ["time", "frame", "kind", "message", "source"]
+
+
+def _extract_segment(path, start, end, warmup, roi_tracking):
+    """Run FaceMesh over frames [start, end) and return (index, timestamp, points, box) rows.
+
+    `warmup` frames before `start` are processed but not returned, so FaceMesh
+    has locked onto the face by the time the segment proper begins. With
+    `end` None the segment runs to the end of the video.
+    """
+    from face_pipeline import FacePipeline
+    from frame_source import VideoFileSource
+
+    pipeline = FacePipeline(roi_tracking=roi_tracking)
+    source = VideoFileSource(path, start_frame=max(0, start - warmup))
+    rows = []
+    try:
+        for frame in source:
+            if end is not None and frame.index >= end:
+                break
+            observation, _ = pipeline.process(frame.image, frame.timestamp, frame.index)
+            if frame.index >= start:
+                points = observation.points.copy() if observation.points is not None else None
+                rows.append((frame.index, frame.timestamp, points, observation.face_box))
+    finally:
+        source.release()
+    return rows
+
+
+def _segments(frame_count, segment_frames):
+    if frame_count <= 0:
+        # Some containers and streams do not report their length; read them in one pass
+        return [(0, None)]
+    return [(start, min(start + segment_frames, frame_count))
+            for start in range(0, frame_count, segment_frames)]
+
+
+def analyze_video(path, segment_seconds=60.0, warmup_seconds=1.0, workers=None, roi_tracking=True):
+    """Yield timeline rows (dicts) for every gesture event in the video, in order"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    segment_frames = max(1, int(segment_seconds * fps))
+    warmup = int(warmup_seconds * fps)
+    segments = _segments(frame_count, segment_frames)
+    if frame_count <= 0:
+        print(f"{path} does not report a frame count; analyzing it as one sequential segment")
+    workers = workers or os.cpu_count() or 1
+    analyzers = [BlinkAnalyzer(), NodAnalyzer(), TwitchAnalyzer()]
+
+    # Keep a bounded window of segments in flight so finished-but-unconsumed
+    # landmark arrays cannot pile up for very long recordings.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = []
+        next_segment = 0
+        while next_segment < len(segments) or pending:
+            while next_segment < len(segments) and len(pending) < 2 * workers:
+                start, end = segments[next_segment]
+                pending.append(pool.submit(_extract_segment, path, start, end, warmup, roi_tracking))
+                next_segment += 1
+            rows = pending.pop(0).result()
+            for index, timestamp, points, face_box in rows:
+                observation = FaceObservation(None, points, face_box, timestamp, index)
+                for analyzer in analyzers:
+                    for event in analyzer.analyze(observation):
+                        yield {
+                            "time": round(event.timestamp, 3),
+                            "frame": index,
+                            "kind": event.kind,
+                            "message": event.message,
+                            "source": event.source,
+                        }
+
+
+def write_timeline(rows, output, fmt):
+    counts = Counter()
+    with open(output, "w", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+            writer.writeheader()
+        for row in rows:
+            counts[row["kind"]] += 1
+            if fmt == "csv":
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(row) + "\n")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch gesture analysis of a recorded video")
+    parser.add_argument("video", help="recorded session video file")
+    parser.add_argument("-o", "--output", help="timeline file (default: <video>.jsonl)")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="timeline format (default: from the output extension)")
+    parser.add_argument("--segment", type=float, default=60.0, help="segment length in seconds")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="seconds processed before each segment to let FaceMesh lock on")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--no-track", action="store_true", help="run FaceMesh on full frames")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.video)[0] + ".jsonl"
+    fmt = args.format or ("csv" if output.lower().endswith(".csv") else "jsonl")
+
+    start = time.time()
+    rows = analyze_video(args.video, args.segment, args.warmup, args.workers,
+                         roi_tracking=not args.no_track)
+    counts = write_timeline(rows, output, fmt)
+    elapsed = time.time() - start
+
+    cap = cv2.VideoCapture(args.video)
+    duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    cap.release()
+    print(f"Wrote {sum(counts.values())} events to {output}")
+    for kind, count in sorted(counts.items()):
+        print(f"- {kind}: {count}")
+    if duration > 0:
+        print(f"Analyzed {duration:.1f}s of video in {elapsed:.1f}s ({duration / elapsed:.1f}x real time)")
+    else:
+        print(f"Analyzed the video in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
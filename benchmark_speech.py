@@ -0,0 +1,130 @@
+"""Speech engine benchmark on recorded audio, no microphone needed.
+
+Usage:
+    python benchmark_speech.py recording.wav --keywords help fire
+    python benchmark_speech.py recording.raw --realtime --blocksize 1600
+
+Replays a 16 kHz 16-bit mono WAV (or raw PCM) file through
+SpeechRecognitionEngine and reports the real-time factor, per-chunk decode
+latency and, for the keywords, how much audio past the end of the spoken
+keyword the engine needed before triggering (from Vosk word timings).
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from audio_source import open_audio_source
+from model_registry import default_registry
+from recognizer import SpeechRecognitionEngine
+from vad import VoiceActivityDetector
+
+MODEL_PATH = "vosk-model-small-en-us-0.15"
+
+
+def _percentiles(values):
+    if not values:
+        return "n/a"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return f"p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, max {max(values):.1f} ms"
+
+
+class KeywordLatency:
+    """Pairs keyword triggers with the word timings of the final result that contains them"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.pending = []
+        self.records = []
+
+    def on_keyword(self, keyword, early):
+        self.pending.append((keyword, self.engine.position, early))
+
+    def on_text(self, text):
+        words = (self.engine.last_result or {}).get("result", [])
+        used = set()
+        for keyword, position, early in self.pending:
+            phrase = keyword.split()
+            for i in range(len(words) - len(phrase) + 1):
+                if i in used or [w["word"] for w in words[i:i + len(phrase)]] != phrase:
+                    continue
+                used.add(i)
+                spoken_end = words[i + len(phrase) - 1]["end"]
+                self.records.append((keyword, early, spoken_end, (position - spoken_end) * 1000))
+                break
+        self.pending = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the speech engine on recorded audio")
+    parser.add_argument("audio", help="16 kHz 16-bit mono WAV or raw PCM file")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--keywords", nargs="*", default=["help", "fire", "emergency"])
+    parser.add_argument("--blocksize", type=int, default=4000, help="samples per audio block")
+    parser.add_argument("--realtime", action="store_true", help="replay at real-time pace")
+    parser.add_argument("--grammar", action="store_true", help="restrict decoding to the keywords")
+    parser.add_argument("--vad", action="store_true",
+                        help="gate decoding with VAD (keyword latencies are then approximate)")
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.model, "am", "final.mdl")):
+        parser.error(f"{args.model} is not a complete Vosk model (no am/final.mdl); "
+                     "download one from https://alphacephei.com/vosk/models")
+
+    start = time.perf_counter()
+    model = default_registry().get(args.model)
+    print(f"Model loaded in {time.perf_counter() - start:.2f}s")
+
+    source = open_audio_source(args.audio, blocksize=args.blocksize, realtime=args.realtime)
+    engine = SpeechRecognitionEngine(
+        model=model,
+        keywords=args.keywords,
+        use_grammar=args.grammar,
+        blocksize=args.blocksize,
+        vad=VoiceActivityDetector() if args.vad else None,
+        source=source,
+        words=True
+    )
+    chunk_ms = []
+    decoded_bytes = [0]
+
+    def on_chunk(nbytes, elapsed_ms):
+        chunk_ms.append(elapsed_ms)
+        decoded_bytes[0] += nbytes
+
+    engine.decoder.decode_listener = on_chunk
+    keywords = KeywordLatency(engine)
+    transcript = []
+
+    def on_text(text):
+        transcript.append(text)
+        keywords.on_text(text)
+
+    start = time.perf_counter()
+    engine.start(on_text, keywords.on_keyword)
+    engine.wait()
+    wall = time.perf_counter() - start
+    engine.stop()
+
+    audio_seconds = engine.position
+    decode_seconds = sum(chunk_ms) / 1000
+    print(f"Audio: {audio_seconds:.1f}s, {len(chunk_ms)} chunks of {args.blocksize} samples, "
+          f"{decoded_bytes[0] / 2 / engine.samplerate:.1f}s decoded")
+    print(f"Wall time: {wall:.2f}s, decode time: {decode_seconds:.2f}s")
+    if audio_seconds:
+        print(f"Real-time factor: {decode_seconds / audio_seconds:.3f} (decode), {wall / audio_seconds:.3f} (wall)")
+    print(f"Chunk decode latency: {_percentiles(chunk_ms)}")
+    print(f"Capture to decoded: {engine.stats()}")
+    if keywords.records:
+        print("Keyword latency (audio past the end of the spoken keyword):")
+        for keyword, early, spoken_end, latency in keywords.records:
+            kind = "partial" if early else "final"
+            print(f"- {keyword} at {spoken_end:.2f}s: {latency:.0f} ms ({kind})")
+        print(f"Keyword latency: {_percentiles([r[3] for r in keywords.records])}")
+    else:
+        print("No keywords detected")
+    print("Transcript: " + " / ".join(transcript))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import numpy as np
+
+FULL = "full"
+STILL = "still"
+NO_FACE = "no_face"
+
+
+class MotionDetector:
+    """Frame-difference motion on a strided thumbnail of the green channel.
+
+    Taking every `step`-th pixel needs no resize or color conversion, so a
+    check costs a few microseconds. Motion means more than `min_fraction`
+    of the thumbnail changed by more than `threshold`. When a face region is
+    given it is also sampled at the finer `roi_step`, so a blink, which
+    barely touches the whole-frame thumbnail, still counts as motion.
+    """
+
+    def __init__(self, step=8, roi_step=2, threshold=12, min_fraction=0.01, roi_min_fraction=0.01):
+        self.step = step
+        self.roi_step = roi_step
+        self.threshold = threshold
+        self.min_fraction = min_fraction
+        self.roi_min_fraction = roi_min_fraction
+        self._previous = None
+        self._previous_roi = None
+        self._roi_box = None
+        self.last_fraction = 0.0
+        self.last_roi_fraction = 0.0
+
+    def _changed(self, current, previous):
+        diff = np.abs(np.subtract(current, previous, dtype=np.int16))
+        return np.count_nonzero(diff > self.threshold) / diff.size
+
+    def update(self, frame, region=None):
+        """Compare `frame` with the previous one; `region` is an (x0, y0, x1, y1) pixel box"""
+        thumb = frame[::self.step, ::self.step, 1]
+        moved = False
+        if self._previous is not None and self._previous.shape == thumb.shape:
+            self.last_fraction = self._changed(thumb, self._previous)
+            moved = self.last_fraction > self.min_fraction
+        self._previous = thumb.copy()
+
+        if region is None:
+            self._previous_roi = self._roi_box = None
+            return moved
+        x0, y0, x1, y1 = region
+        roi = frame[max(0, y0):y1:self.roi_step, max(0, x0):x1:self.roi_step, 1]
+        if region == self._roi_box and self._previous_roi is not None and roi.size:
+            self.last_roi_fraction = self._changed(roi, self._previous_roi)
+            moved = moved or self.last_roi_fraction > self.roi_min_fraction
+        self._roi_box = region
+        self._previous_roi = roi.copy()
+        return moved
+
+    def reset(self):
+        self._previous = self._previous_roi = self._roi_box = None
+
+
+class DutyCycle:
+    """Decides frame by frame whether the full FaceMesh pass runs.
+
+    - full: every frame, for `hold` seconds after the last motion or after a
+      face reappears. Make `hold` longer than the blink chain timeout so an
+      emergency blink pattern, once started, is watched at full rate.
+    - still: a face is visible but nothing moves; FaceMesh runs every
+      `still_interval` seconds.
+    - no_face: FaceMesh found nobody; the interval starts at `min_interval`
+      when full rate ends and doubles after every empty pass up to
+      `max_interval`.
+
+    The motion check runs on every frame, so motion switches back to full
+    rate on the frame where it is seen. Motion the detector misses is still
+    picked up by the next scheduled pass, so reaction time never exceeds
+    worst_case_reaction() plus one frame.
+    """
+
+    def __init__(self, hold=4.0, still_interval=0.25, min_interval=0.25, max_interval=2.0, motion=None):
+        self.hold = hold
+        self.still_interval = still_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.motion = motion or MotionDetector()
+
+        self.mode = FULL
+        self.face_visible = False
+        self._active_until = None
+        self._next_run = 0.0
+        self._backoff = min_interval
+        self._last_time = None
+        self.processed = 0
+        self.skipped = 0
+        self.wakeups = 0
+        self.mode_seconds = {FULL: 0.0, STILL: 0.0, NO_FACE: 0.0}
+
+    def should_process(self, frame, timestamp, face_box=None):
+        """Run the motion check on `frame`; True when FaceMesh should process it"""
+        if self._active_until is None:
+            self._active_until = timestamp + self.hold
+        if self._last_time is not None:
+            self.mode_seconds[self.mode] += max(0.0, timestamp - self._last_time)
+        self._last_time = timestamp
+
+        if self.motion.update(frame, face_box if self.face_visible else None):
+            if timestamp >= self._active_until:
+                self.wakeups += 1
+            self._active_until = timestamp + self.hold
+        if timestamp < self._active_until:
+            self.mode = FULL
+            run = True
+        else:
+            self.mode = STILL if self.face_visible else NO_FACE
+            run = timestamp >= self._next_run
+        if run:
+            self.processed += 1
+        else:
+            self.skipped += 1
+        return run
+
+    def observe(self, face_visible, timestamp):
+        """Report whether the FaceMesh pass that was just allowed found a face"""
+        if face_visible:
+            if not self.face_visible:
+                self._active_until = timestamp + self.hold
+            self._backoff = self.min_interval
+            self._next_run = timestamp + self.still_interval
+        elif self.mode == FULL:
+            # Full rate ignores the schedule; back off from the start once it ends
+            self._backoff = self.min_interval
+        else:
+            self._next_run = timestamp + self._backoff
+            self._backoff = min(self._backoff * 2, self.max_interval)
+        self.face_visible = face_visible
+
+    def worst_case_reaction(self):
+        """Longest gap between FaceMesh passes in the current mode, in seconds"""
+        if self.mode == FULL:
+            return 0.0
+        return self.still_interval if self.face_visible else self.max_interval
+
+    def stats(self):
+        total = self.processed + self.skipped
+        return {
+            "mode": self.mode,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "duty": round(self.processed / total, 3) if total else 1.0,
+            "wakeups": self.wakeups,
+            "seconds": {mode: round(seconds, 1) for mode, seconds in self.mode_seconds.items()},
+        }
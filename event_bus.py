@@ -0,0 +1,97 @@
+import logging
+import time
+from collections import deque, namedtuple
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+RECOGNITION = "recognition"
+GESTURE = "gesture"
+REMINDER = "reminder"
+ALERT = "alert"
+LOG = "log"
+WARMUP = "warmup"
+
+# kind is one of the constants above, payload a dict of event-specific fields
+# and timestamp time.time() when the producer posted it.
+BusEvent = namedtuple("BusEvent", ["kind", "payload", "timestamp"])
+
+
+class EventBus:
+    """Hands events from worker threads to the one thread that owns the UI.
+
+    post() is a single deque.append, which is atomic in CPython, so producers
+    never take a lock or wait on the consumer. The consumer calls drain() and
+    handlers run there, in posting order. A handler that raises is logged and
+    does not stop the rest of the batch.
+    """
+
+    def __init__(self):
+        self._events = deque()
+        self._handlers = {}
+        self.posted = 0
+        self.delivered = 0
+        self.max_backlog = 0
+        self.max_batch = 0
+
+    def subscribe(self, kind, handler):
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def post(self, kind, **payload):
+        self._events.append(BusEvent(kind, payload, time.time()))
+        self.posted += 1
+
+    def pending(self):
+        return len(self._events)
+
+    def drain(self, limit=None):
+        """Dispatch up to `limit` queued events (all of them by default); returns the count"""
+        backlog = len(self._events)
+        self.max_backlog = max(self.max_backlog, backlog)
+        count = backlog if limit is None else min(limit, backlog)
+        for _ in range(count):
+            event = self._events.popleft()
+            for handler in self._handlers.get(event.kind, ()):
+                try:
+                    handler(event)
+                except Exception:
+                    logger.exception(f"Event handler for '{event.kind}' failed")
+        self.delivered += count
+        self.max_batch = max(self.max_batch, count)
+        return count
+
+    def stats(self):
+        return {"posted": self.posted, "delivered": self.delivered, "pending": self.pending(),
+                "max_backlog": self.max_backlog, "max_batch": self.max_batch}
+
+
+class TkEventPump:
+    """Drains an EventBus from Tk after() callbacks on the main loop.
+
+    Each tick dispatches at most `batch` events so a burst cannot freeze the
+    window; when events are left over the next tick is scheduled immediately.
+    """
+
+    def __init__(self, widget, bus, interval_ms=50, batch=200):
+        self.widget = widget
+        self.bus = bus
+        self.interval_ms = interval_ms
+        self.batch = batch
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self._tick)
+
+    def pump(self):
+        """Dispatch one batch now; returns how many events were handled"""
+        return self.bus.drain(self.batch)
+
+    def _tick(self):
+        self.pump()
+        delay = 1 if self.bus.pending() else self.interval_ms
+        self._after_id = self.widget.after(delay, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,152 @@
+import numpy as np
+
+from face_pipeline import Analyzer
+from landmarks import eye_aspect_ratios, nod_displacement
+from streaming import Hysteresis, MedianFilter, RingBuffer, RunningStats
+
+
+class BlinkAnalyzer(Analyzer):
+    """EAR-based blinks, the consecutive-blink emergency pattern and long eye closure.
+
+    A blink is a closing edge of a hysteresis switch on the EAR, so one long
+    closure counts once; blinks are chained while each follows the previous
+    within `timeout` seconds.
+    """
+
+    name = "blink"
+
+    def __init__(self, threshold=0.2, release_margin=0.03, cooldown=1.0, timeout=3.0,
+                 emergency_count=4, closed_alert_after=5.0):
+        super().__init__()
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.emergency_count = emergency_count
+        self.closed_alert_after = closed_alert_after
+
+        self.closed = Hysteresis(threshold, threshold + release_margin)
+        self.blink_times = RingBuffer(max(16, 2 * emergency_count))
+        self.ear = None
+        self.blink_count = 0
+        self.consecutive = 0
+        self.emergency_triggered = False
+        self.closed_start = None
+
+    def _chain_length(self):
+        times = self.blink_times.values()
+        breaks = np.flatnonzero(np.diff(times) > self.timeout)
+        return len(times) - (breaks[-1] + 1 if len(breaks) else 0)
+
+    def analyze(self, observation):
+        if observation.points is None:
+            return []
+        t = observation.timestamp
+        left_ear, right_ear = eye_aspect_ratios(observation.points)
+        self.ear = (left_ear + right_ear) / 2
+        closed = self.closed.update(self.ear)
+        last_blink = self.blink_times.last
+
+        events = []
+        if self.closed.rose:
+            self.closed_start = t
+            if last_blink is None or t - last_blink > self.cooldown:
+                self.blink_times.append(t)
+                self.blink_count += 1
+                self.consecutive = self._chain_length()
+                events.append(self.event("blink", t, f"Blink detected! Count: {self.blink_count}"))
+                if self.consecutive >= self.emergency_count and not self.emergency_triggered:
+                    self.emergency_triggered = True
+                    events.append(self.event("emergency", t, f"{self.consecutive} consecutive blinks detected"))
+        elif closed and t - self.closed_start >= self.closed_alert_after:
+            events.append(self.event("eyes_closed", t, "Eyes closed too long. Possible fatigue or emergency."))
+            self.closed_start = t
+        if not closed and last_blink is not None and t - last_blink > self.timeout:
+            self.consecutive = 0
+            self.emergency_triggered = False
+        return events
+
+
+class NodAnalyzer(Analyzer):
+    """Nose-based nods plus unusual nodding relative to the recent nose position"""
+
+    name = "nod"
+
+    def __init__(self, threshold=0.1, cooldown=1.0, window=10, pattern_threshold=0.04):
+        super().__init__()
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.pattern_threshold = pattern_threshold
+
+        self.nodding = Hysteresis(threshold, threshold * 0.8)
+        # Window can be seconds of history at 30 fps; updates stay O(1)
+        self.nose = RunningStats(window)
+        self.nod_count = 0
+        self.last_nod_time = None
+
+    def analyze(self, observation):
+        points = observation.points
+        if points is None:
+            return []
+        t = observation.timestamp
+
+        events = []
+        self.nodding.update(nod_displacement(points))
+        if self.nodding.rose and (self.last_nod_time is None or t - self.last_nod_time > self.cooldown):
+            self.nod_count += 1
+            self.last_nod_time = t
+            events.append(self.event("nod", t, f"Nod detected! Count: {self.nod_count}"))
+
+        nose_y = float(points[1, 1])
+        self.nose.update(nose_y)
+        if self.nose.full and abs(self.nose.mean - nose_y) > self.pattern_threshold:
+            events.append(self.event("unusual_nod", t, "Unusual nodding pattern detected."))
+        return events
+
+
+class TwitchAnalyzer(Analyzer):
+    """Brow and mouth displacement beyond a threshold, median-filtered over a few frames"""
+
+    name = "twitch"
+
+    def __init__(self, threshold=0.015, mouth_margin=0.01, window=3):
+        super().__init__()
+        self.threshold = threshold
+        self.mouth_margin = mouth_margin
+        self.brow = MedianFilter(window)
+        self.mouth = MedianFilter(window)
+
+    def analyze(self, observation):
+        points = observation.points
+        if points is None:
+            return []
+        brow_diff = self.brow.update(abs(points[65, 1] - points[55, 1]))
+        mouth_diff = self.mouth.update(abs(points[13, 1] - points[14, 1]))
+        if brow_diff > self.threshold or mouth_diff > (self.threshold + self.mouth_margin):
+            return [self.event("twitch", observation.timestamp, "Possible facial twitch detected.")]
+        return []
+
+
+class EmotionAnalyzer(Analyzer):
+    """Feeds padded face crops to an AttributeWorker and flags discomfort"""
+
+    name = "emotion"
+
+    def __init__(self, worker, pad=20, discomfort=("Sad", "Anger")):
+        super().__init__()
+        self.worker = worker
+        self.pad = pad
+        self.discomfort = discomfort
+        self.gender = "Unknown"
+        self.emotion = "Unknown"
+
+    def analyze(self, observation):
+        if observation.points is None:
+            return []
+        h, w = observation.frame.shape[:2]
+        x_min, y_min, x_max, y_max = observation.face_box
+        face_crop = observation.frame[max(0, y_min - self.pad):min(h, y_max + self.pad),
+                                      max(0, x_min - self.pad):min(w, x_max + self.pad)]
+        self.gender, self.emotion = self.worker.submit(observation.index, face_crop)
+        if self.emotion in self.discomfort:
+            return [self.event("discomfort", observation.timestamp, "Emotion suggests discomfort.")]
+        return []
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import mediapipe as mp
+import numpy as np
+
+from roi_tracker import RoiTracker
+
+# What every analyzer sees for one frame. points is an (N, 3) array of
+# full-frame normalized landmarks and face_box a pixel box, both None when no
+# face was found.
+FaceObservation = namedtuple("FaceObservation", ["frame", "points", "face_box", "timestamp", "index"])
+
+# Something an analyzer noticed: kind is a short identifier such as "blink",
+# message the human-readable text used for logs and alerts.
+FaceEvent = namedtuple("FaceEvent", ["kind", "timestamp", "message", "source"])
+
+
+class CostMeter:
+    """Accumulates wall time spent in one pipeline stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    def add(self, elapsed_ms):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def __repr__(self):
+        return f"{self.calls} calls, {self.mean_ms:.2f} ms avg, {self.total_ms:.0f} ms total"
+
+
+class Analyzer:
+    """Base class for per-frame face analyzers; each keeps its own state"""
+
+    name = "analyzer"
+
+    def __init__(self):
+        self.cost = CostMeter()
+
+    def analyze(self, observation):
+        """Return a list of FaceEvents for this observation"""
+        raise NotImplementedError
+
+    def event(self, kind, timestamp, message):
+        return FaceEvent(kind, timestamp, message, self.name)
+
+
+class FacePipeline:
+    """Runs FaceMesh once per frame and fans the result out to registered analyzers"""
+
+    def __init__(self, roi_tracking=False, latency_budget_ms=None, refine_landmarks=True):
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.roi_tracker = RoiTracker(tracking=roi_tracking, latency_budget_ms=latency_budget_ms)
+        self.mesh_cost = CostMeter()
+        self.analyzers = []
+        self.listeners = []
+        self.last_observation = None
+        self._index = 0
+        # The tracker refills one points array in place, so drawing from
+        # another thread reads this copy instead
+        self._overlay_lock = threading.Lock()
+        self._overlay_points = None
+        self._overlay_visible = False
+
+    def register(self, analyzer):
+        self.analyzers.append(analyzer)
+        return analyzer
+
+    def ensure(self, analyzer_class, *args, **kwargs):
+        """Return the registered analyzer of this class, registering one if needed"""
+        for analyzer in self.analyzers:
+            if type(analyzer) is analyzer_class:
+                return analyzer
+        return self.register(analyzer_class(*args, **kwargs))
+
+    def unregister(self, analyzer):
+        if analyzer in self.analyzers:
+            self.analyzers.remove(analyzer)
+
+    def add_listener(self, callback):
+        """Call `callback(event)` for every event produced by any analyzer"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def process(self, frame, timestamp=None, index=None):
+        """Analyze one BGR frame; return (FaceObservation, events)"""
+        if timestamp is None:
+            timestamp = time.time()
+        if index is None:
+            index = self._index
+        self._index = index + 1
+
+        start = time.perf_counter()
+        points = self.roi_tracker.process(self.face_mesh, frame)
+        self.mesh_cost.add((time.perf_counter() - start) * 1000)
+        with self._overlay_lock:
+            if points is not None:
+                if self._overlay_points is None or self._overlay_points.shape != points.shape:
+                    self._overlay_points = np.empty_like(points)
+                np.copyto(self._overlay_points, points)
+            self._overlay_visible = points is not None
+        face_box = self.roi_tracker.face_box if points is not None else None
+        observation = FaceObservation(frame, points, face_box, timestamp, index)
+        self.last_observation = observation
+
+        events = []
+        for analyzer in self.analyzers:
+            start = time.perf_counter()
+            events.extend(analyzer.analyze(observation))
+            analyzer.cost.add((time.perf_counter() - start) * 1000)
+        for event in events:
+            for listener in self.listeners:
+                listener(event)
+        return observation, events
+
+    @contextmanager
+    def overlay_points(self):
+        """Landmarks of the latest frame for drawing, None without a face.
+
+        Safe to use from any thread; the array does not change until the
+        block exits.
+        """
+        with self._overlay_lock:
+            yield self._overlay_points if self._overlay_visible else None
+
+    def close(self):
+        """Release the MediaPipe graph"""
+        self.face_mesh.close()
+
+    def cost_report(self):
+        lines = [f"facemesh: {self.mesh_cost}"]
+        lines += [f"{a.name}: {a.cost}" for a in self.analyzers]
+        return "\n".join(lines)
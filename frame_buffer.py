@@ -0,0 +1,115 @@
+import threading
+import time
+
+
+class LatestFrameBuffer:
+    """Fixed-size ring of the most recent frames, written by a single producer.
+
+    Consumers never queue: each subscriber always receives the newest frame and
+    the frames it skipped are counted as drops, so a slow consumer sees fresh
+    frames at a lower rate instead of an ever-growing backlog.
+    """
+
+    def __init__(self, capacity=3):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def publish(self, frame):
+        with self._cond:
+            self._slots[self._seq % self.capacity] = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        """Return (sequence number, frame) of the newest frame, or (0, None)"""
+        with self._cond:
+            if self._seq == 0:
+                return 0, None
+            return self._seq, self._slots[(self._seq - 1) % self.capacity]
+
+    def recent(self, count):
+        """Return up to `count` of the newest frames, oldest first"""
+        with self._cond:
+            count = min(count, self.capacity, self._seq)
+            return [self._slots[(self._seq - count + i) % self.capacity] for i in range(count)]
+
+    def wait_newer(self, seq, timeout=None):
+        """Block until a frame newer than `seq` exists; return (seq, frame) or (seq, None)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > seq or self.closed, timeout):
+                return seq, None
+            if self._seq <= seq:
+                return seq, None
+            return self._seq, self._slots[(self._seq - 1) % self.capacity]
+
+    def subscribe(self, name, max_fps=None):
+        return FrameSubscriber(self, name, max_fps)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FrameSubscriber:
+    """A consumer's view of a LatestFrameBuffer with its own rate cap and counters"""
+
+    def __init__(self, buffer, name, max_fps=None):
+        self.buffer = buffer
+        self.name = name
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_seq = 0
+        self.received = 0
+        self.dropped = 0
+        self._next_due = 0.0
+
+    def get(self, timeout=None):
+        """Return the newest unseen frame, or None on timeout or when the buffer closes"""
+        if self.min_interval:
+            delay = self._next_due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        seq, frame = self.buffer.wait_newer(self.last_seq, timeout)
+        if frame is None:
+            return None
+        if self.last_seq:
+            self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        self.received += 1
+        self._next_due = time.monotonic() + self.min_interval
+        return frame
+
+    def stats(self):
+        return {"name": self.name, "received": self.received, "dropped": self.dropped}
+
+
+class CaptureThread(threading.Thread):
+    """Single producer that reads a FrameSource into a LatestFrameBuffer"""
+
+    def __init__(self, source, buffer):
+        super().__init__(daemon=True)
+        self.source = source
+        self.buffer = buffer
+        self.running = False
+        self.captured = 0
+
+    def run(self):
+        self.running = True
+        try:
+            while self.running and self.source.is_opened():
+                frame = self.source.read()
+                if frame is None:
+                    break
+                self.buffer.publish(frame)
+                self.captured += 1
+        finally:
+            self.running = False
+            self.buffer.close()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout=timeout)
@@ -0,0 +1,172 @@
+import os
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# A captured frame plus its capture time in seconds. Live sources use wall-clock
+# time; replay sources use media time starting at 0 so runs are deterministic.
+Frame = namedtuple("Frame", ["image", "timestamp", "index"])
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """Base class for everything that yields frames to the vision pipeline"""
+
+    def read(self):
+        """Return the next Frame, or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def is_opened(self):
+        return True
+
+    def release(self):
+        pass
+
+    def __iter__(self):
+        while self.is_opened():
+            frame = self.read()
+            if frame is None:
+                break
+            yield frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.index = 0
+
+    def read(self):
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        frame = Frame(image, time.time(), self.index)
+        self.index += 1
+        return frame
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Replays a recorded video; as fast as possible unless realtime=True"""
+
+    def __init__(self, path, realtime=False, start_frame=0):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.realtime = realtime
+        self.index = start_frame
+        if start_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        self._clock_start = None
+
+    def read(self):
+        ret, image = self.cap.read()
+        if not ret:
+            return None
+        # Derive the timestamp from the frame index rather than CAP_PROP_POS_MSEC,
+        # which some backends report inconsistently after seeking.
+        timestamp = self.index / self.fps
+        if self.realtime:
+            if self._clock_start is None:
+                self._clock_start = time.monotonic() - timestamp
+            delay = self._clock_start + timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        frame = Frame(image, timestamp, self.index)
+        self.index += 1
+        return frame
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Reads the images of a directory in sorted filename order at a nominal fps"""
+
+    def __init__(self, path, fps=30.0):
+        self.paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.fps = fps
+        self.index = 0
+
+    def read(self):
+        while self.index < len(self.paths):
+            image = cv2.imread(self.paths[self.index])
+            frame_index = self.index
+            self.index += 1
+            if image is not None:
+                return Frame(image, frame_index / self.fps, frame_index)
+        return None
+
+    def is_opened(self):
+        return self.index < len(self.paths)
+
+
+class SyntheticSource(FrameSource):
+    """Generates deterministic frames, for throughput tests without any media.
+
+    `generator` is called with the frame index and must return a BGR image;
+    the default draws a moving disc over a static gradient.
+    """
+
+    def __init__(self, width=640, height=480, fps=30.0, count=300, generator=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.count = count
+        self.generator = generator or self._default_frame
+        self.index = 0
+        ramp = np.linspace(0, 255, width, dtype=np.uint8)
+        self._background = np.repeat(np.tile(ramp, (height, 1))[:, :, None], 3, axis=2)
+
+    def _default_frame(self, index):
+        image = self._background.copy()
+        x = int((index * 7) % self.width)
+        cv2.circle(image, (x, self.height // 2), 40, (0, 0, 255), -1)
+        return image
+
+    def read(self):
+        if self.count is not None and self.index >= self.count:
+            return None
+        frame = Frame(self.generator(self.index), self.index / self.fps, self.index)
+        self.index += 1
+        return frame
+
+    def is_opened(self):
+        return self.count is None or self.index < self.count
+
+
+def open_source(spec=0, realtime=False):
+    """Build a FrameSource from a CLI-style spec.
+
+    An int or digit string selects a camera, "synthetic" or "synthetic:N" a
+    generator of N frames, a directory an image sequence, anything else a video file.
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if spec.startswith("synthetic"):
+        _, _, count = spec.partition(":")
+        return SyntheticSource(count=int(count) if count else 300)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec)
+    return VideoFileSource(spec, realtime=realtime)
@@ -1,39 +1,62 @@
+import argparse
 import cv2
-import mediapipe as mp
 import numpy as np
-from scipy.spatial import distance
 import time
-from twilio.rest import Client
 import os
 from datetime import datetime
 from dotenv import load_dotenv
+from frame_source import open_source
+from alerts import AlertDispatcher, TwilioCallTransport, stub_transports, use_stub_transports
+from overlay import LandmarkOverlay, TextCache
+from face_pipeline import FacePipeline
+from face_analyzers import BlinkAnalyzer, NodAnalyzer
+from landmarks import eye_aspect_ratios, nod_displacement, twitch_motion
+from duty_cycle import DutyCycle
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+def call_dispatcher():
+    """Background dispatcher for emergency calls; ALERT_TRANSPORT=stub swaps Twilio for a local stub.
+
+    Apps that start and stop detection create one, pass it to every
+    GestureDetector and stop it on exit, so a queued call outlives the detector.
+    """
+    if use_stub_transports():
+        transports = stub_transports(["call"])
+    else:
+        transports = {"call": TwilioCallTransport(
+            os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"),
+            os.getenv("TWILIO_PHONE_NUMBER"), os.getenv("EMERGENCY_NUMBER"))}
+    return AlertDispatcher(transports, workers=1)
+
+
 class GestureDetector:
-    def __init__(self):
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, roi_tracking=False, latency_budget_ms=None, pipeline=None, alert_dispatcher=None,
+                 power_save=False):
+        # Pass a shared FacePipeline to run these gestures off the same FaceMesh
+        # pass as other analyzers; the pipeline's owner then calls process().
+        self.owns_pipeline = pipeline is None
+        if pipeline is None:
+            pipeline = FacePipeline(roi_tracking=roi_tracking, latency_budget_ms=latency_budget_ms)
+        self.pipeline = pipeline
+        self.face_mesh = pipeline.face_mesh
+        self.roi_tracker = pipeline.roi_tracker
+        self.blink = pipeline.ensure(BlinkAnalyzer)
+        self.nod = pipeline.ensure(NodAnalyzer)
+        pipeline.add_listener(self._on_event)
 
-        self.blink_threshold = 0.2
-        self.nod_threshold = 0.1
+        self.blink_threshold = self.blink.threshold
+        self.nod_threshold = self.nod.threshold
         self.twitch_threshold = 0.15
-        self.blink_counter = 0
-        self.nod_counter = 0
         self.twitch_counter = 0
+        self.blink_timeout = self.blink.timeout
+        self.emergency_blink_count = self.blink.emergency_count
 
-        self.consecutive_blinks = 0
-        self.last_blink_time = time.time()
-        self.last_nod_time = time.time()
-        self.blink_timeout = 3.0
-        self.emergency_blink_count = 4
-        self.emergency_triggered = False
+        # power_save skips FaceMesh while the room is empty or still; the hold
+        # outlasts the blink chain timeout so a started pattern runs at full rate
+        self.duty_cycle = DutyCycle(hold=self.blink_timeout + 1.0) if power_save else None
 
         # Load Twilio credentials from environment with SAME names as .env
         self.TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
@@ -41,11 +64,20 @@ class GestureDetector:
         self.EMERGENCY_NUMBER = os.getenv("EMERGENCY_NUMBER")
         self.TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
 
-        self.twilio_client = Client(self.TWILIO_ACCOUNT_SID, self.TWILIO_AUTH_TOKEN)
+        # Calls go through a background dispatcher so process_frame never waits on
+        # the network; without a shared one the detector creates and owns its own
+        self.owns_dispatcher = alert_dispatcher is None
+        if alert_dispatcher is None:
+            alert_dispatcher = call_dispatcher()
+        self.alert_dispatcher = alert_dispatcher
+
+        self.landmark_overlay = LandmarkOverlay()
+        self.text_cache = TextCache()
 
-        self.cooldown = 1.0
+        self.cooldown = self.blink.cooldown
         self.is_paused = False
         self.detection_disabled = False
+        self.emergency_time = None
 
         # Debug prints to verify environment variables are loaded
         print("EMERGENCY_NUMBER:", self.EMERGENCY_NUMBER)
@@ -53,141 +85,161 @@ class GestureDetector:
         print("TWILIO_ACCOUNT_SID:", self.TWILIO_ACCOUNT_SID)
         print("TWILIO_AUTH_TOKEN:", self.TWILIO_AUTH_TOKEN)
 
+    @property
+    def blink_counter(self):
+        return self.blink.blink_count
+
+    @property
+    def nod_counter(self):
+        return self.nod.nod_count
+
+    @property
+    def consecutive_blinks(self):
+        return self.blink.consecutive
+
+    @property
+    def emergency_triggered(self):
+        return self.blink.emergency_triggered
+
+    @property
+    def points(self):
+        observation = self.pipeline.last_observation
+        return observation.points if observation is not None else None
+
+    @property
+    def face_visible(self):
+        return self.points is not None
+
     def make_emergency_call(self):
+        """Queue the emergency call; delivery and retries happen off the frame loop"""
         if not self.EMERGENCY_NUMBER or not self.TWILIO_PHONE_NUMBER:
             print("Error: Phone numbers are not set in the environment variables.")
             return False
-        try:
-            call = self.twilio_client.calls.create(
-                to=self.EMERGENCY_NUMBER,
-                from_=self.TWILIO_PHONE_NUMBER,
-                twiml='<Response><Say>Emergency alert! The patient has triggered an emergency signal by blinking 4 times consecutively. Please check on them immediately.</Say></Response>'
-            )
-            print(f"Emergency call initiated. Call SID: {call.sid}")
-            self.log_emergency()
-            self.detection_disabled = True
-            return True
-        except Exception as e:
-            print(f"Failed to make emergency call: {str(e)}")
-            return False
+        self.alert_dispatcher.submit(
+            "Emergency alert! The patient has triggered an emergency signal by blinking 4 times consecutively. Please check on them immediately.",
+            channels=["call"],
+            on_receipt=self._on_call_receipt,
+        )
+        # Written once the dispatcher reports the outcome, not when the call is queued
+        self.emergency_time = datetime.now()
+        self.detection_disabled = True
+        return True
+
+    def _on_call_receipt(self, delivery, status, detail):
+        if status == "delivered":
+            print(f"Emergency call initiated. Call SID: {detail}")
+            self.log_emergency(f"call delivered, SID {detail}")
+        else:
+            # Resume detection so the patient can signal again
+            print(f"Failed to make emergency call: {detail}")
+            self.log_emergency(f"call {status}: {detail}")
+            self.detection_disabled = False
 
-    def log_emergency(self):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"Emergency triggered at {timestamp} - 4 consecutive blinks detected"
+    def log_emergency(self, outcome):
+        triggered = self.emergency_time or datetime.now()
+        timestamp = triggered.strftime("%Y-%m-%d %H:%M:%S")
+        log_message = f"Emergency triggered at {timestamp} - 4 consecutive blinks detected - {outcome}"
         if not os.path.exists('logs'):
             os.makedirs('logs')
         with open('logs/emergency_log.txt', 'a') as f:
             f.write(log_message + '\n')
         print(log_message)
 
-    def calculate_eye_aspect_ratio(self, landmarks):
-        left_eye = [362, 385, 387, 263, 373, 380]
-        right_eye = [33, 160, 158, 133, 153, 144]
-        left_ear = self._calculate_ear(landmarks, left_eye)
-        right_ear = self._calculate_ear(landmarks, right_eye)
+    def calculate_eye_aspect_ratio(self, points):
+        left_ear, right_ear = eye_aspect_ratios(points)
         ear = (left_ear + right_ear) / 2
         return ear
 
-    def _calculate_ear(self, landmarks, eye_indices):
-        points = []
-        for idx in eye_indices:
-            point = landmarks.landmark[idx]
-            points.append((point.x, point.y))
-        v1 = distance.euclidean(points[1], points[5])
-        v2 = distance.euclidean(points[2], points[4])
-        h = distance.euclidean(points[0], points[3])
-        ear = (v1 + v2) / (2.0 * h)
-        return ear
-
-    def detect_nod(self, landmarks):
-        nose_tip = landmarks.landmark[1]
-        forehead = landmarks.landmark[10]
-        vertical_movement = abs(nose_tip.y - forehead.y)
-        return vertical_movement > self.nod_threshold
+    def detect_nod(self, points):
+        return nod_displacement(points) > self.nod_threshold
 
-    def detect_twitch(self, landmarks, prev_landmarks):
-        if prev_landmarks is None:
+    def detect_twitch(self, points, prev_points):
+        if prev_points is None:
             return False
-        mouth_points = [61, 291, 0, 17]
-        eye_points = [33, 133, 362, 263]
-        mouth_movement = sum(
-            distance.euclidean(
-                (landmarks.landmark[i].x, landmarks.landmark[i].y),
-                (prev_landmarks.landmark[i].x, prev_landmarks.landmark[i].y)
-            )
-            for i in mouth_points
-        ) / len(mouth_points)
-        eye_movement = sum(
-            distance.euclidean(
-                (landmarks.landmark[i].x, landmarks.landmark[i].y),
-                (prev_landmarks.landmark[i].x, prev_landmarks.landmark[i].y)
-            )
-            for i in eye_points
-        ) / len(eye_points)
+        mouth_movement, eye_movement = twitch_motion(points, prev_points)
         return (mouth_movement > self.twitch_threshold or 
                 eye_movement > self.twitch_threshold)
 
-    def process_frame(self, frame):
+    def close(self):
+        """Release what this detector created: its own dispatcher and FaceMesh graph"""
+        self.pipeline.remove_listener(self._on_event)
+        if self.owns_dispatcher:
+            self.alert_dispatcher.stop()
+        if self.owns_pipeline:
+            self.pipeline.close()
+
+    def process_frame(self, frame, timestamp=None):
+        """Detect gestures and draw the overlay onto the frame (for display loops)"""
+        self.detect(frame, timestamp)
+        return self.render(frame)
+
+    def detect(self, frame, timestamp=None):
+        """Run detection only; headless callers pay no rendering cost.
+
+        With a shared pipeline this is a no-op: the pipeline's owner processes
+        each frame once and the events reach this detector through _on_event.
+        """
+        if self.is_paused or self.detection_disabled or not self.owns_pipeline:
+            return
+        if self.duty_cycle is None:
+            self.pipeline.process(frame, timestamp)
+            return
+        if timestamp is None:
+            timestamp = time.time()
+        if self.duty_cycle.should_process(frame, timestamp, self.roi_tracker.face_box):
+            self.pipeline.process(frame, timestamp)
+            self.duty_cycle.observe(self.face_visible, timestamp)
+
+    def _on_event(self, event):
+        if self.is_paused or self.detection_disabled:
+            return
+        if event.kind in ("blink", "nod"):
+            print(event.message)
+        elif event.kind == "emergency":
+            print("EMERGENCY TRIGGERED! Making emergency call...")
+            self.make_emergency_call()
+
+    def render(self, frame):
+        """Draw landmarks and status text from the latest detection onto the frame"""
+        text = self.text_cache
+        bottom = frame.shape[0]
         if self.is_paused:
-            cv2.putText(frame, "PAUSED - Press 'p' to resume", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            text.put_text(frame, "PAUSED - Press 'p' to resume", (10, 30), 1, (0, 0, 255))
             return frame
         if self.detection_disabled:
-            cv2.putText(frame, "EMERGENCY CALLED! Detection stopped.", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            cv2.putText(frame, "Press 'q' to quit", (10, frame.shape[0] - 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            text.put_text(frame, "EMERGENCY CALLED! Detection stopped.", (10, 30), 1, (0, 0, 255))
+            text.put_text(frame, "Press 'q' to quit", (10, bottom - 50), 0.7, (255, 255, 255))
             return frame
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0]
-            ear = self.calculate_eye_aspect_ratio(landmarks)
-            current_time = time.time()
-            if ear < self.blink_threshold:
-                if current_time - self.last_blink_time > self.cooldown:
-                    self.blink_counter += 1
-                    self.last_blink_time = current_time
-                    print(f"Blink detected! Count: {self.blink_counter}")
-                    if current_time - self.last_blink_time < self.blink_timeout:
-                        self.consecutive_blinks += 1
-                        if self.consecutive_blinks >= self.emergency_blink_count and not self.emergency_triggered:
-                            print("EMERGENCY TRIGGERED! Making emergency call...")
-                            self.emergency_triggered = True
-                            self.make_emergency_call()
-                    else:
-                        self.consecutive_blinks = 1
-            else:
-                if current_time - self.last_blink_time > self.blink_timeout:
-                    self.consecutive_blinks = 0
-                    self.emergency_triggered = False
-            if self.detect_nod(landmarks):
-                if current_time - self.last_nod_time > self.cooldown:
-                    self.nod_counter += 1
-                    self.last_nod_time = current_time
-                    print(f"Nod detected! Count: {self.nod_counter}")
-            for landmark in landmarks.landmark:
-                x = int(landmark.x * frame.shape[1])
-                y = int(landmark.y * frame.shape[0])
-                cv2.circle(frame, (x, y), 1, (0, 255, 0), -1)
-        cv2.putText(frame, f"Blinks: {self.blink_counter}", (10, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Nods: {self.nod_counter}", (10, 70),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Consecutive Blinks: {self.consecutive_blinks}", (10, 110),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        # Render runs on display threads while detect() refills the points
+        with self.pipeline.overlay_points() as points:
+            if points is not None:
+                self.landmark_overlay.draw(frame, points)
+        text.put_text(frame, f"Blinks: {self.blink_counter}", (10, 30), 1, (0, 255, 0))
+        text.put_text(frame, f"Nods: {self.nod_counter}", (10, 70), 1, (0, 255, 0))
+        text.put_text(frame, f"Consecutive Blinks: {self.consecutive_blinks}", (10, 110), 1, (0, 255, 0))
         if self.emergency_triggered:
-            cv2.putText(frame, "EMERGENCY CALLED!", (10, 150),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        cv2.putText(frame, "Press 'p' to pause/resume", (10, frame.shape[0] - 20),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(frame, "Press 'q' to quit", (10, frame.shape[0] - 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            text.put_text(frame, "EMERGENCY CALLED!", (10, 150), 1, (0, 0, 255))
+        text.put_text(frame, "Press 'p' to pause/resume", (10, bottom - 20), 0.7, (255, 255, 255))
+        text.put_text(frame, "Press 'q' to quit", (10, bottom - 50), 0.7, (255, 255, 255))
         return frame
 
 def main():
-    cap = cv2.VideoCapture(0)
-    detector = GestureDetector()
+    parser = argparse.ArgumentParser(description="Real-time gesture detection")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or 'synthetic[:N]'")
+    parser.add_argument("--realtime", action="store_true",
+                        help="pace video file replay at its native frame rate")
+    parser.add_argument("--track", action="store_true",
+                        help="crop FaceMesh input to the previously detected face")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="per-frame FaceMesh latency budget; input is downscaled to meet it")
+    parser.add_argument("--power-save", action="store_true",
+                        help="skip FaceMesh while nothing moves or no face is visible")
+    args = parser.parse_args()
+
+    source = open_source(args.source, realtime=args.realtime)
+    detector = GestureDetector(roi_tracking=args.track, latency_budget_ms=args.budget_ms,
+                               power_save=args.power_save)
     print("Gesture detection started.")
     print("Controls:")
     print("- Press 'p' to pause/resume detection")
@@ -195,11 +247,8 @@ def main():
     print("\nEmergency System:")
     print(f"- {detector.emergency_blink_count} consecutive blinks will trigger emergency call")
     print(f"- Emergency contact: {detector.EMERGENCY_NUMBER}")
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        processed_frame = detector.process_frame(frame)
+    for frame in source:
+        processed_frame = detector.process_frame(frame.image, frame.timestamp)
         cv2.imshow('Gesture Detection', processed_frame)
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
@@ -207,8 +256,10 @@ def main():
         elif key == ord('p'):
             detector.is_paused = not detector.is_paused
             print("Paused" if detector.is_paused else "Resumed")
-    cap.release()
+    source.release()
     cv2.destroyAllWindows()
+    if detector.duty_cycle is not None:
+        print(f"Power save: {detector.duty_cycle.stats()}")
 
 if __name__ == "__main__":
     main()
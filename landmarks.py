@@ -0,0 +1,48 @@
+import numpy as np
+
+# === Landmark index tables ===
+# Eye contours in EAR order: outer corner, two upper lid points, inner corner,
+# two lower lid points (p1..p6 in the Soukupova & Cech formulation).
+LEFT_EYE = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+EYE_INDICES = np.array([LEFT_EYE, RIGHT_EYE])
+
+# Point pairs inside an eye contour: two vertical spans, then the horizontal one
+EAR_PAIRS_A = np.array([1, 2, 0])
+EAR_PAIRS_B = np.array([5, 4, 3])
+
+NOSE_TIP = 1
+FOREHEAD = 10
+
+MOUTH_POINTS = [61, 291, 0, 17]
+EYE_CORNER_POINTS = [33, 133, 362, 263]
+TWITCH_INDICES = np.array(MOUTH_POINTS + EYE_CORNER_POINTS)
+
+
+def landmarks_to_array(landmarks, out=None):
+    """Convert a MediaPipe NormalizedLandmarkList into an (N, 3) float32 array"""
+    points = landmarks.landmark
+    if out is None or out.shape[0] != len(points):
+        out = np.empty((len(points), 3), dtype=np.float32)
+    out[:] = [(p.x, p.y, p.z) for p in points]
+    return out
+
+
+def eye_aspect_ratios(points):
+    """Return the (left, right) eye aspect ratios for an (N, 3) landmark array"""
+    eyes = points[EYE_INDICES, :2]
+    spans = np.linalg.norm(eyes[:, EAR_PAIRS_A] - eyes[:, EAR_PAIRS_B], axis=-1)
+    return (spans[:, 0] + spans[:, 1]) / (2.0 * spans[:, 2])
+
+
+def nod_displacement(points):
+    """Vertical distance between the nose tip and the forehead"""
+    return abs(float(points[NOSE_TIP, 1] - points[FOREHEAD, 1]))
+
+
+def twitch_motion(points, prev_points):
+    """Mean frame-to-frame motion of the (mouth, eye corner) point groups"""
+    idx = TWITCH_INDICES
+    motion = np.linalg.norm(points[idx, :2] - prev_points[idx, :2], axis=1)
+    n_mouth = len(MOUTH_POINTS)
+    return float(motion[:n_mouth].mean()), float(motion[n_mouth:].mean())
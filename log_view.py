@@ -0,0 +1,143 @@
+import os
+import tkinter as tk
+from array import array
+from datetime import datetime
+
+LOG_PATH = os.path.join("logs", "recognition_log.txt")
+
+
+class LogView:
+    """Bounded, batched front end for the recognition log ScrolledText.
+
+    append() only collects lines; they reach the widget in one insert per UI
+    tick and are written to `path` in one write. The widget keeps the newest
+    `max_lines` lines and trims the oldest in chunks of `trim_chunk`, so it
+    stays the same size however long the app runs. Trimmed lines stay on
+    disk and page_back() brings them back a page at a time, as far back as
+    the newest `history_lines` lines of the session. While the user is
+    scrolled up the view neither trims nor jumps to the end.
+    """
+
+    TAGS = {
+        "alert": {"foreground": "red", "font": ("Courier", 11, "bold")},
+        "normal": {"foreground": "black"},
+    }
+
+    def __init__(self, text, path=LOG_PATH, max_lines=5000, trim_chunk=500, page_lines=500,
+                 history_lines=100000):
+        self.text = text
+        self.path = path
+        self.max_lines = max_lines
+        self.trim_chunk = trim_chunk
+        self.page_lines = page_lines
+        self.history_lines = max(history_lines, max_lines)
+        for tag, options in self.TAGS.items():
+            text.tag_config(tag, **options)
+
+        self._pending = []
+        self._flush_id = None
+        self._file = None
+        # Byte offset and tag of the newest history_lines lines written this
+        # session, so any trimmed range among them can be read back with one seek
+        self._offsets = array("q")
+        self._alerts = bytearray()
+        self._base = 0  # session line number of the first indexed line
+        self._end_offset = 0
+        self._first = 0  # session line number of the first line in the widget
+        self._lines = 0  # lines currently in the widget
+        self.written = 0
+        self.trimmed = 0
+
+    def append(self, message, is_alert=False):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        # One message is one widget line, which keeps the ring bookkeeping exact
+        message = str(message).replace("\n", " ")
+        self._pending.append((f"[{timestamp}] {message}\n", "alert" if is_alert else "normal"))
+        if self._flush_id is None:
+            self._flush_id = self.text.after_idle(self.flush)
+
+    def flush(self):
+        self._flush_id = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._spill(batch)
+        at_end = self._at_end()
+        args = []
+        for line, tag in batch:
+            args += (line, tag)
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, *args)
+        self._lines += len(batch)
+        if at_end and self._lines > self.max_lines + self.trim_chunk:
+            self._trim(self._lines - self.max_lines)
+        self.text.config(state=tk.DISABLED)
+        if at_end:
+            self.text.see(tk.END)
+
+    def _at_end(self):
+        return self.text.yview()[1] >= 1.0
+
+    def _trim(self, count):
+        self.text.delete("1.0", f"{count + 1}.0")
+        self._first += count
+        self._lines -= count
+        self.trimmed += count
+
+    def _spill(self, batch):
+        if not self.path:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._end_offset = self._file.tell()
+        data = bytearray()
+        for line, tag in batch:
+            self._offsets.append(self._end_offset + len(data))
+            self._alerts.append(tag == "alert")
+            data += line.encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+        self._end_offset += len(data)
+        self.written += len(batch)
+        # Forget the oldest lines in chunks, but never ones the widget still shows
+        excess = min(len(self._offsets) - self.history_lines, self._first - self._base)
+        if excess >= self.trim_chunk:
+            del self._offsets[:excess]
+            del self._alerts[:excess]
+            self._base += excess
+
+    def can_page_back(self):
+        return self._file is not None and self._first > self._base
+
+    def page_back(self):
+        """Insert up to page_lines older lines from disk at the top; returns how many"""
+        if not self.can_page_back():
+            return 0
+        start = max(self._base, self._first - self.page_lines)
+        first, end = start - self._base, self._first - self._base
+        offsets = self._offsets
+        with open(self.path, "rb") as f:
+            f.seek(offsets[first])
+            data = f.read(offsets[end] - offsets[first])
+        base = offsets[first]
+        args = []
+        for index in range(first, end):
+            line = data[offsets[index] - base:offsets[index + 1] - base]
+            args += (line.decode("utf-8", errors="replace"), "alert" if self._alerts[index] else "normal")
+        self.text.config(state=tk.NORMAL)
+        self.text.insert("1.0", *args)
+        self.text.config(state=tk.DISABLED)
+        self.text.see("1.0")
+        count = self._first - start
+        self._lines += count
+        self._first = start
+        return count
+
+    def close(self):
+        if self._flush_id is not None:
+            self.text.after_cancel(self._flush_id)
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,5 +1,6 @@
 import threading
 from gesture_detector import GestureDetector
+from frame_source import open_source
 from recognizer import SpeechRecognitionEngine
 import time
 
@@ -7,22 +8,19 @@ import time
 VOSK_MODEL_PATH = 'model'  # Change this to your actual Vosk model directory
 
 # --- Gesture Detection Thread ---
-def run_gesture_detection():
+def run_gesture_detection(source_spec=0):
     detector = GestureDetector()
     import cv2
-    cap = cv2.VideoCapture(0)
+    source = open_source(source_spec)
     print("Gesture detection started.")
     print("Controls:")
     print("- Press 'p' to pause/resume detection")
     print("- Press 'q' to quit")
     print("\nEmergency System:")
     print(f"- {detector.emergency_blink_count} consecutive blinks will trigger emergency call")
-    print(f"- Emergency contact: {detector.emergency_number}")
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        processed_frame = detector.process_frame(frame)
+    print(f"- Emergency contact: {detector.EMERGENCY_NUMBER}")
+    for frame in source:
+        processed_frame = detector.process_frame(frame.image, frame.timestamp)
         cv2.imshow('Gesture Detection', processed_frame)
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
@@ -30,7 +28,7 @@ def run_gesture_detection():
         elif key == ord('p'):
             detector.is_paused = not detector.is_paused
             print("Paused" if detector.is_paused else "Resumed")
-    cap.release()
+    source.release()
     cv2.destroyAllWindows()
 
 # --- Speech Recognition Thread ---
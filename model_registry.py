@@ -0,0 +1,175 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+PENDING = "pending"
+LOADING = "loading"
+LOADED = "loaded"
+FAILED = "failed"
+EVICTED = "evicted"
+
+# Reading the model files first warms the OS page cache and gives a real byte
+# count to report; vosk.Model() itself has no progress hook.
+READ_CHUNK = 1 << 20
+READ_SHARE = 0.9
+
+
+def _vosk_loader(path):
+    from vosk import Model
+    return Model(path)
+
+
+def _model_files(path):
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            full = os.path.join(root, name)
+            files.append((full, os.path.getsize(full)))
+    return files
+
+
+class ModelEntry:
+    """Load state of one model; `ready` is set once it is loaded or has failed"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = PENDING
+        self.progress = 0.0
+        self.model = None
+        self.error = None
+        self.load_seconds = None
+        self.ready = threading.Event()
+
+
+class ModelRegistry:
+    """Process-wide cache of speech models, loaded once on background threads.
+
+    preload() starts loading and returns immediately; get() blocks until the
+    model is available and shares one instance between all recognizers.
+    Listeners are called as `callback(path, state, progress)` from the loader
+    thread.
+    """
+
+    def __init__(self, loader=_vosk_loader):
+        self.loader = loader
+        self.entries = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def preload(self, path):
+        """Start loading `path` in the background unless it is loaded or loading"""
+        path = os.path.normpath(path)
+        with self._lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.state in (PENDING, LOADING, LOADED):
+                return entry
+            entry = ModelEntry(path)
+            self.entries[path] = entry
+        threading.Thread(target=self._load, args=(entry,), daemon=True).start()
+        return entry
+
+    def get(self, path, timeout=None):
+        """Return the loaded model, waiting for it; raises if loading failed"""
+        entry = self.preload(path)
+        if not entry.ready.wait(timeout):
+            raise TimeoutError(f"Model '{path}' is still loading ({entry.progress:.0%})")
+        if entry.state != LOADED:
+            raise RuntimeError(f"Failed to load model '{path}': {entry.error}")
+        return entry.model
+
+    def state(self, path):
+        entry = self.entries.get(os.path.normpath(path))
+        return entry.state if entry is not None else None
+
+    def progress(self, path):
+        entry = self.entries.get(os.path.normpath(path))
+        return entry.progress if entry is not None else 0.0
+
+    def evict(self, path):
+        """Drop the cached model; recognizers still holding it keep working"""
+        with self._lock:
+            entry = self.entries.pop(os.path.normpath(path), None)
+        if entry is None:
+            return False
+        entry.model = None
+        entry.state = EVICTED
+        self._notify(entry)
+        return True
+
+    def swap(self, old_path, new_path, timeout=None):
+        """Load `new_path`, then evict `old_path`; returns the new model"""
+        model = self.get(new_path, timeout)
+        if os.path.normpath(old_path) != os.path.normpath(new_path):
+            self.evict(old_path)
+        return model
+
+    def _set(self, entry, state, progress=None):
+        entry.state = state
+        if progress is not None:
+            entry.progress = progress
+        self._notify(entry)
+
+    def _notify(self, entry):
+        for listener in list(self.listeners):
+            try:
+                listener(entry.path, entry.state, entry.progress)
+            except Exception as e:
+                logger.warning(f"Model progress listener failed: {e}")
+
+    def _load(self, entry):
+        start = time.time()
+        self._set(entry, LOADING, 0.0)
+        try:
+            if not os.path.isdir(entry.path):
+                raise FileNotFoundError(f"Model directory not found: {entry.path}")
+            files = _model_files(entry.path)
+            total = sum(size for _, size in files) or 1
+            done = 0
+            reported = 0.0
+            for name, _ in files:
+                with open(name, "rb") as f:
+                    while True:
+                        chunk = f.read(READ_CHUNK)
+                        if not chunk:
+                            break
+                        done += len(chunk)
+                        progress = READ_SHARE * done / total
+                        if progress - reported >= 0.05:
+                            reported = progress
+                            self._set(entry, LOADING, progress)
+            self._set(entry, LOADING, READ_SHARE)
+            entry.model = self.loader(entry.path)
+        except Exception as e:
+            entry.error = e
+            entry.load_seconds = time.time() - start
+            logger.error(f"Failed to load model {entry.path}: {e}")
+            self._set(entry, FAILED)
+            entry.ready.set()
+            return
+        entry.load_seconds = time.time() - start
+        logger.info(f"Loaded model {entry.path} in {entry.load_seconds:.1f}s")
+        self._set(entry, LOADED, 1.0)
+        entry.ready.set()
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def default_registry():
+    """The registry shared by the whole process"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def _disk_offsets(radius):
+    if radius <= 0:
+        return np.zeros((1, 2), dtype=np.int32)
+    r = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    inside = dx * dx + dy * dy <= radius * radius
+    return np.stack([dx[inside], dy[inside]], axis=1).astype(np.int32)
+
+
+class LandmarkOverlay:
+    """Draws every landmark as a small dot with one fancy-indexed write"""
+
+    def __init__(self, color=(0, 255, 0), radius=1):
+        self.color = np.array(color, dtype=np.uint8)
+        self.offsets = _disk_offsets(radius)
+
+    def draw(self, frame, points):
+        h, w = frame.shape[:2]
+        centers = (points[:, :2] * (w, h)).astype(np.int32)
+        pixels = (centers[:, None, :] + self.offsets[None, :, :]).reshape(-1, 2)
+        xs = pixels[:, 0]
+        ys = pixels[:, 1]
+        visible = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        frame[ys[visible], xs[visible]] = self.color
+        return frame
+
+
+class TextStamp:
+    """A string rasterised once into a mask and blitted with a boolean write"""
+
+    def __init__(self, text, scale=1.0, thickness=2):
+        (tw, th), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        self.pad = thickness
+        self.ascent = th + self.pad
+        mask = np.zeros((th + baseline + 2 * self.pad, tw + 2 * self.pad), dtype=np.uint8)
+        cv2.putText(mask, text, (self.pad, self.ascent), FONT, scale, 255, thickness)
+        self.mask = mask > 0
+
+    def draw(self, frame, org, color):
+        """Draw with `org` as the baseline-left corner, like cv2.putText"""
+        x0 = org[0] - self.pad
+        y0 = org[1] - self.ascent
+        mh, mw = self.mask.shape
+        fh, fw = frame.shape[:2]
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + mw, fw), min(y0 + mh, fh)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return frame
+        mask = self.mask[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+        frame[fy0:fy1, fx0:fx1][mask] = color
+        return frame
+
+
+class TextCache:
+    """LRU cache of TextStamps so counters only rasterise when their value changes"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._stamps = OrderedDict()
+
+    def stamp(self, text, scale=1.0, thickness=2):
+        key = (text, scale, thickness)
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            stamp = TextStamp(text, scale, thickness)
+            self._stamps[key] = stamp
+            if len(self._stamps) > self.max_entries:
+                self._stamps.popitem(last=False)
+        else:
+            self._stamps.move_to_end(key)
+        return stamp
+
+    def put_text(self, frame, text, org, scale, color, thickness=2):
+        return self.stamp(text, scale, thickness).draw(frame, org, color)
@@ -0,0 +1,206 @@
+import re
+from collections import deque, namedtuple
+
+# keyword is the canonical keyword, phrase the registered phrase (the keyword
+# itself or one of its synonyms); start/end are token indices, end exclusive.
+PhraseMatch = namedtuple("PhraseMatch", ["keyword", "phrase", "start", "end", "fuzzy"])
+
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def tokenize(text):
+    """Lowercase word tokens; keeps contractions like "can't" whole"""
+    return _TOKEN.findall(text.lower().replace("’", "'"))
+
+
+def phrase_table(keywords):
+    """{keyword: set of phrases} from an iterable of keywords or a {keyword: synonyms} mapping"""
+    if not keywords:
+        return {}
+    items = keywords.items() if hasattr(keywords, "items") else ((k, ()) for k in keywords)
+    table = {}
+    for keyword, synonyms in items:
+        keyword = " ".join(tokenize(keyword))
+        if not keyword:
+            continue
+        phrases = table.setdefault(keyword, set())
+        phrases.add(keyword)
+        for synonym in [synonyms] if isinstance(synonyms, str) else synonyms or ():
+            synonym = " ".join(tokenize(synonym))
+            if synonym:
+                phrases.add(synonym)
+    return table
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _within_one_edit(a, b):
+    """True when a and b differ by at most one insertion, deletion, substitution or swap"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return (a[i + 1:] == b[i + 1:]
+                or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1]))
+    if len(a) > len(b):
+        a, b = b, a
+    return a[i:] == b[i + 1:]
+
+
+class _Node:
+    __slots__ = ("next", "fail", "outputs", "depth")
+
+    def __init__(self, depth):
+        self.next = {}
+        self.fail = None
+        self.outputs = []  # (keyword, phrase, length) of every phrase ending here
+        self.depth = depth
+
+
+class PhraseMatcher:
+    """Finds keyword phrases and their synonyms in recognizer text.
+
+    Phrases are compiled into an Aho-Corasick automaton over word tokens, so
+    matching is one pass over the text whatever the number of phrases. Words
+    are mapped to vocabulary tokens first; with max_edits=1, a word that is not
+    in the vocabulary matches a vocabulary token at most one edit away (only
+    for tokens of `min_fuzzy_length` or more, and only when that token is the
+    single such candidate). Candidates come from a deletion index, so that
+    lookup costs O(word length), not O(vocabulary).
+
+    add() only extends the trie; the failure links are rebuilt lazily, once,
+    before the next match.
+    """
+
+    def __init__(self, keywords=None, max_edits=0, min_fuzzy_length=5):
+        if max_edits not in (0, 1):
+            raise ValueError("max_edits must be 0 or 1")
+        self.max_edits = max_edits
+        self.min_fuzzy_length = min_fuzzy_length
+        self.clear()
+        for keyword, phrases in phrase_table(keywords).items():
+            for phrase in phrases:
+                self.add(phrase, keyword)
+
+    def clear(self):
+        self.root = _Node(0)
+        self.vocabulary = set()
+        self._deletion_index = {}  # one-character deletion -> vocabulary tokens
+        self.phrases = {}  # phrase -> keyword
+        self._compiled = True
+
+    def add(self, phrase, keyword=None):
+        """Register `phrase` as a way of saying `keyword` (itself by default)"""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        phrase = " ".join(tokens)
+        keyword = " ".join(tokenize(keyword)) if keyword else phrase
+        if self.phrases.get(phrase) == keyword:
+            return
+        self.phrases[phrase] = keyword
+        node = self.root
+        for token in tokens:
+            self._add_token(token)
+            child = node.next.get(token)
+            if child is None:
+                child = node.next[token] = _Node(node.depth + 1)
+            node = child
+        # A phrase re-registered under another keyword now only means that one
+        node.outputs = [o for o in node.outputs if o[1] != phrase]
+        node.outputs.append((keyword, phrase, len(tokens)))
+        self._compiled = False
+
+    def add_synonyms(self, keyword, synonyms):
+        self.add(keyword)
+        for synonym in synonyms:
+            self.add(synonym, keyword)
+
+    def _add_token(self, token):
+        if token in self.vocabulary:
+            return
+        self.vocabulary.add(token)
+        if len(token) >= self.min_fuzzy_length:
+            for deleted in _deletions(token):
+                self._deletion_index.setdefault(deleted, set()).add(token)
+
+    def _compile(self):
+        # Breadth-first, so every node's failure target already has its outputs
+        queue = deque()
+        for child in self.root.next.values():
+            child.fail = self.root
+            child.outputs = [o for o in child.outputs if self._is_own(o, child)]
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for token, child in node.next.items():
+                fail = node.fail
+                while fail is not None and token not in fail.next:
+                    fail = fail.fail
+                child.fail = fail.next[token] if fail is not None else self.root
+                own = [o for o in child.outputs if self._is_own(o, child)]
+                child.outputs = own + child.fail.outputs
+                queue.append(child)
+        self._compiled = True
+
+    @staticmethod
+    def _is_own(output, node):
+        # Recompiling must drop the outputs inherited from failure links last time
+        return output[2] == node.depth
+
+    def _resolve(self, word):
+        """(vocabulary token or None, fuzzy)"""
+        if word in self.vocabulary:
+            return word, False
+        if not self.max_edits or len(word) < self.min_fuzzy_length - 1:
+            return None, False
+        candidates = set(self._deletion_index.get(word, ()))
+        for deleted in _deletions(word):
+            if deleted in self.vocabulary and len(deleted) >= self.min_fuzzy_length:
+                candidates.add(deleted)
+            candidates.update(self._deletion_index.get(deleted, ()))
+        candidates = [c for c in candidates if _within_one_edit(word, c)]
+        if len(candidates) == 1:
+            return candidates[0], True
+        return None, False
+
+    def match_tokens(self, tokens):
+        """All phrase matches in a token list, in order of where they end.
+
+        Overlapping matches of the same keyword (e.g. "help" and "help me") are
+        reported once, for the phrase that ends first.
+        """
+        if not self._compiled:
+            self._compile()
+        matches = []
+        last_end = {}  # keyword -> end of its last reported match
+        fuzzy_at = []
+        node = self.root
+        for i, word in enumerate(tokens):
+            token, fuzzy = self._resolve(word)
+            fuzzy_at.append(fuzzy)
+            if token is None:
+                node = self.root
+                continue
+            while node is not self.root and token not in node.next:
+                node = node.fail
+            node = node.next.get(token, self.root)
+            for keyword, phrase, length in node.outputs:
+                start = i + 1 - length
+                if last_end.get(keyword, -1) > start:
+                    continue
+                last_end[keyword] = i + 1
+                matches.append(PhraseMatch(keyword, phrase, start, i + 1, any(fuzzy_at[start:i + 1])))
+        return matches
+
+    def match(self, text):
+        return self.match_tokens(tokenize(text))
+
+    def keywords(self):
+        return set(self.phrases.values())
@@ -0,0 +1,119 @@
+import time
+import tkinter as tk
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from streaming import RunningStats
+
+
+class PreviewRenderer:
+    """Draws the newest frame of a LatestFrameBuffer onto a Tk canvas.
+
+    Runs entirely on the Tk thread from after() callbacks, at most `max_fps`
+    times a second. Nothing is allocated per frame: the frame is resized with
+    INTER_AREA into a preallocated buffer, converted to RGB into a second one
+    that a PIL image shares, and pasted into one PhotoImage shown by a single
+    canvas item. Frames published between ticks are skipped, and a tick that
+    fires more than one interval late gives its slot back to the UI instead
+    of rendering, unless nothing was drawn for `max_stale` intervals; a loop
+    that is late on every tick still shows a frame now and then.
+    """
+
+    def __init__(self, canvas, width, height, max_fps=30, max_stale=4, stats_window=300):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / max_fps
+        self.max_stale = max_stale * self.interval
+        self._resized = np.zeros((height, width, 3), dtype=np.uint8)
+        self._rgb = np.zeros((height, width, 3), dtype=np.uint8)
+        self._image = Image.frombuffer("RGB", (width, height), self._rgb, "raw", "RGB", 0, 1)
+        self._photo = ImageTk.PhotoImage(image=self._image)
+        self._item = canvas.create_image(0, 0, anchor=tk.NW, image=self._photo)
+
+        self.buffer = None
+        self.render = None
+        self._after_id = None
+        self._due = 0.0
+        self._drawn_at = 0.0
+        self._last_seq = 0
+        self._attached_at = None
+        self.rendered = 0
+        self.skipped = 0
+        self.late_ticks = 0
+        self.render_ms = RunningStats(stats_window)
+        self.cpu_seconds = 0.0
+
+    def attach(self, buffer, render=None):
+        """Start showing `buffer`; render(image) may draw overlays onto the resized BGR frame"""
+        self.detach()
+        self.buffer = buffer
+        self.render = render
+        self._last_seq = 0
+        self._attached_at = time.monotonic()
+        self.rendered = self.skipped = self.late_ticks = 0
+        self.cpu_seconds = 0.0
+        self.render_ms.reset()
+        self._due = self._drawn_at = time.monotonic()
+        self._after_id = self.canvas.after(0, self._tick)
+
+    def detach(self):
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        self.buffer = None
+        self.render = None
+        self.clear()
+
+    def clear(self):
+        self._rgb.fill(0)
+        self._photo.paste(self._image)
+
+    def _tick(self):
+        now = time.monotonic()
+        late = now - self._due > self.interval
+        if late and now - self._drawn_at < self.max_stale:
+            self.late_ticks += 1
+        else:
+            self._drawn_at = now
+            self._draw_latest()
+        if self.buffer is None or self.buffer.closed and self._last_seq >= self.buffer.latest()[0]:
+            self._after_id = None
+            return
+        # Stay on the interval grid; slots the UI was too busy for are dropped
+        now = time.monotonic()
+        self._due += self.interval * max(1, int((now - self._due) / self.interval) + 1)
+        self._after_id = self.canvas.after(max(1, int((self._due - now) * 1000)), self._tick)
+
+    def _draw_latest(self):
+        seq, frame = self.buffer.latest()
+        if frame is None or seq == self._last_seq:
+            return
+        if self._last_seq:
+            self.skipped += seq - self._last_seq - 1
+        self._last_seq = seq
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        image = frame.image
+        if image.shape[:2] == (self.height, self.width):
+            np.copyto(self._resized, image)
+        else:
+            cv2.resize(image, (self.width, self.height), dst=self._resized, interpolation=cv2.INTER_AREA)
+        if self.render is not None:
+            self.render(self._resized)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self._photo.paste(self._image)
+        self.cpu_seconds += time.thread_time() - cpu_start
+        self.render_ms.update((time.perf_counter() - start) * 1000)
+        self.rendered += 1
+
+    def stats(self):
+        elapsed = time.monotonic() - self._attached_at if self._attached_at else 0.0
+        return {
+            "rendered": self.rendered,
+            "skipped": self.skipped,
+            "late_ticks": self.late_ticks,
+            "render_ms": round(self.render_ms.mean, 2),
+            "cpu_percent": round(100 * self.cpu_seconds / elapsed, 1) if elapsed else 0.0,
+        }
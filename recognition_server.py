@@ -0,0 +1,238 @@
+"""Recognition for several audio streams (e.g. one microphone per room) on one shared model.
+
+Usage:
+    python recognition_server.py room1.wav room2.wav --keywords help fire
+
+Each stream has its own KaldiRecognizer, bounded audio queue and keyword
+trigger; a pool of worker threads (one per core by default) decodes them.
+Streams with queued audio wait in a round-robin run queue and a worker
+decodes at most `quantum` blocks of one stream per turn, so a room with a
+constant backlog cannot starve the quiet ones. Vosk releases the GIL while
+decoding, so the workers run in parallel.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from audio_buffer import AudioBlockQueue, DROP_OLDEST
+from audio_source import open_audio_source
+from model_registry import default_registry
+from recognizer import StreamDecoder
+from streaming import RunningStats
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+# kind is "text" (a final result), "keyword" or "end" (a finite source was
+# fully decoded); position is the stream position in seconds.
+RecognitionEvent = namedtuple("RecognitionEvent", ["kind", "stream_id", "text", "early", "position", "timestamp"])
+
+
+class RecognitionStream:
+    """One audio stream's queue, decoder and counters"""
+
+    def __init__(self, server, stream_id, decoder, audio_queue, source=None):
+        self.server = server
+        self.stream_id = stream_id
+        self.decoder = decoder
+        self.audio_queue = audio_queue
+        self.source = source
+        self.scheduled = False
+        self.removed = False
+        self.ended = False
+        self.blocks = 0
+        self.turns = 0
+        self.decode_ms = 0.0
+        self.latency = RunningStats(200)
+
+    def push(self, data, block=False):
+        """Queue one block of 16-bit mono PCM; safe to call from any thread"""
+        ok = self.audio_queue.put(data, block=block, timeout=0.5)
+        self.server._schedule(self)
+        return ok
+
+    def stats(self):
+        stats = self.audio_queue.stats()
+        stats.update({
+            "blocks": self.blocks,
+            "turns": self.turns,
+            "decode_ms": round(self.decode_ms, 1),
+            "latency_ms": round(self.latency.mean, 1),
+        })
+        return stats
+
+
+class RecognitionServer:
+    def __init__(self, model_path=None, model=None, registry=None, workers=None, quantum=2,
+                 samplerate=16000, blocksize=4000, queue_blocks=16, drop_policy=DROP_OLDEST,
+                 keywords=None, use_grammar=True, stable_partials=2, vad_factory=None, max_edits=0):
+        # One model for every stream; recognizers are cheap by comparison
+        if model is None:
+            model = (registry or default_registry()).get(model_path)
+        self.model = model
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.queue_blocks = queue_blocks
+        self.drop_policy = drop_policy
+        self.quantum = quantum
+        # Keyword phrases, or a {keyword: synonyms} mapping
+        self.keywords = keywords or ()
+        self.max_edits = max_edits
+        self.use_grammar = use_grammar
+        self.stable_partials = stable_partials
+        self.vad_factory = vad_factory
+
+        self.streams = {}
+        self.listeners = []
+        self._run_queue = deque()
+        self._cond = threading.Condition()
+        self.running = True
+        self.workers = [threading.Thread(target=self._work, daemon=True)
+                        for _ in range(workers or os.cpu_count() or 1)]
+        for worker in self.workers:
+            worker.start()
+
+    def add_listener(self, callback):
+        """Call `callback(event)` with every RecognitionEvent, from worker threads"""
+        self.listeners.append(callback)
+
+    def add_stream(self, stream_id, source=None):
+        """Register a stream; with a source it is started, otherwise feed stream.push()"""
+        if stream_id in self.streams:
+            raise ValueError(f"Stream '{stream_id}' already exists")
+        decoder = StreamDecoder(
+            self.model, self.samplerate, self.keywords, self.use_grammar, self.stable_partials,
+            vad=self.vad_factory() if self.vad_factory else None, max_edits=self.max_edits
+        )
+        stream = RecognitionStream(self, stream_id, decoder,
+                                   AudioBlockQueue(self.blocksize * 2, self.queue_blocks, self.drop_policy),
+                                   source)
+        decoder.on_text = lambda text: self._emit("text", stream, text)
+        decoder.on_keyword = lambda keyword, early: self._emit("keyword", stream, keyword, early)
+        self.streams[stream_id] = stream
+        if source is not None:
+            source.on_finished = lambda: self._schedule(stream)
+            source.start(stream.push)
+        logger.info(f"Recognition stream '{stream_id}' added")
+        return stream
+
+    def remove_stream(self, stream_id):
+        stream = self.streams.pop(stream_id, None)
+        if stream is None:
+            return
+        stream.removed = True
+        if stream.source is not None:
+            stream.source.stop()
+
+    def set_keywords(self, keywords):
+        """Change the keywords of every stream; each applies them before its next block"""
+        self.keywords = keywords or ()
+        for stream in list(self.streams.values()):
+            stream.decoder.set_keywords(self.keywords)
+
+    def _schedule(self, stream):
+        with self._cond:
+            if not stream.scheduled and not stream.removed:
+                stream.scheduled = True
+                self._run_queue.append(stream)
+                self._cond.notify()
+
+    def _has_work(self, stream):
+        if stream.removed:
+            return False
+        if stream.audio_queue.qsize():
+            return True
+        return stream.source is not None and stream.source.finished.is_set() and not stream.ended
+
+    def _work(self):
+        while self.running:
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._run_queue or not self.running, timeout=0.5):
+                    continue
+                if not self.running:
+                    break
+                stream = self._run_queue.popleft()
+            self._run_turn(stream)
+            with self._cond:
+                # Still busy: go to the back of the line behind the other rooms
+                if self._has_work(stream):
+                    self._run_queue.append(stream)
+                    self._cond.notify()
+                else:
+                    stream.scheduled = False
+
+    def _run_turn(self, stream):
+        stream.turns += 1
+        start = time.perf_counter()
+        for _ in range(self.quantum):
+            block = stream.audio_queue.get(timeout=0)
+            if block is None:
+                break
+            stream.decoder.feed(block.data)
+            stream.blocks += 1
+            stream.latency.update((time.monotonic() - block.timestamp) * 1000)
+        if (not stream.audio_queue.qsize() and stream.source is not None
+                and stream.source.finished.is_set() and not stream.ended):
+            stream.ended = True
+            stream.decoder.finish()
+            self._emit("end", stream, "")
+        stream.decode_ms += (time.perf_counter() - start) * 1000
+
+    def _emit(self, kind, stream, text, early=False):
+        event = RecognitionEvent(kind, stream.stream_id, text, early, stream.decoder.position, time.time())
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Recognition listener failed: {e}")
+
+    def stats(self):
+        return {stream_id: stream.stats() for stream_id, stream in list(self.streams.items())}
+
+    def stop(self):
+        for stream_id in list(self.streams):
+            self.remove_stream(stream_id)
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        for worker in self.workers:
+            worker.join(timeout=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recognize several audio files as concurrent streams")
+    parser.add_argument("audio", nargs="+", help="16 kHz 16-bit mono WAV or raw PCM files, one per stream")
+    parser.add_argument("--model", default="vosk-model-small-en-us-0.15")
+    parser.add_argument("--keywords", nargs="*", default=["help", "fire", "emergency"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--realtime", action="store_true", help="replay at real-time pace")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = RecognitionServer(model_path=args.model, workers=args.workers, keywords=args.keywords)
+    done = threading.Semaphore(0)
+
+    def on_event(event):
+        if event.kind == "end":
+            done.release()
+        else:
+            print(f"[{event.stream_id} {event.position:7.2f}s] {event.kind}: {event.text}"
+                  + (" (early)" if event.early else ""))
+
+    server.add_listener(on_event)
+    start = time.perf_counter()
+    for path in args.audio:
+        server.add_stream(os.path.basename(path), open_audio_source(path, realtime=args.realtime))
+    for _ in args.audio:
+        done.acquire()
+    elapsed = time.perf_counter() - start
+    for stream_id, stats in server.stats().items():
+        print(f"{stream_id}: {stats}")
+    print(f"Decoded {len(args.audio)} streams in {elapsed:.2f}s")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,348 @@
-import queue
 import json
 import threading
 import logging
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+import time
+from collections import deque
+from cffi import FFI
+from vosk import KaldiRecognizer
+
+from audio_buffer import AudioBlockQueue, DROP_OLDEST
+from audio_source import MicrophoneSource
+from model_registry import default_registry
+from phrase_matcher import PhraseMatcher, phrase_table, tokenize
+from streaming import RunningStats
 
 logger = logging.getLogger("EmergencySoundTracker")
 
+UNKNOWN_WORD = "[unk]"
+
+# Lets AcceptWaveform read queue slots in place instead of from bytes copies
+_ffi = FFI()
+
+
+def keyword_grammar(keywords):
+    """Vosk grammar for keyword spotting: every keyword phrase and synonym plus a catch-all for other speech"""
+    phrases = set()
+    for synonyms in phrase_table(keywords).values():
+        phrases |= synonyms
+    return json.dumps(sorted(phrases) + [UNKNOWN_WORD])
+
+
+def _words(text):
+    return tokenize(text.replace(UNKNOWN_WORD, " "))
+
+
+class KeywordTrigger:
+    """Fires keywords from partial results before the utterance ends.
+
+    A keyword occurrence fires once it has appeared in `stable_partials`
+    consecutive partial results, so a word the decoder is still revising does
+    not trigger. The final result then only reports occurrences that never
+    fired early, so each spoken keyword is reported exactly once.
+
+    `keywords` is an iterable of keyword phrases or a {keyword: synonyms}
+    mapping; a synonym fires its keyword. With max_edits=1, words one typo-like
+    edit away from a keyword word also match (useful without a grammar).
+    """
+
+    def __init__(self, keywords, stable_partials=2, max_edits=0):
+        self.stable_partials = stable_partials
+        self.matcher = PhraseMatcher(max_edits=max_edits)
+        self._pending_keywords = None
+        self.set_keywords(keywords)
+        self.latencies = deque(maxlen=100)
+        self._reset()
+
+    def set_keywords(self, keywords):
+        """Safe from any thread; the matcher is updated before the next result is matched"""
+        table = phrase_table(keywords)
+        self._pending_keywords = {phrase: keyword for keyword, phrases in table.items() for phrase in phrases}
+
+    def _apply_keywords(self):
+        wanted, self._pending_keywords = self._pending_keywords, None
+        if wanted is None:
+            return
+        # Adding keywords extends the compiled matcher; anything else rebuilds it
+        if any(wanted.get(phrase) != keyword for phrase, keyword in self.matcher.phrases.items()):
+            self.matcher.clear()
+        for phrase, keyword in wanted.items():
+            self.matcher.add(phrase, keyword)
+
+    def _occurrences(self, text):
+        """(keyword, n) for the n-th occurrence of every keyword in `text`"""
+        self._apply_keywords()
+        found = []
+        counts = {}
+        for match in self.matcher.match_tokens(_words(text)):
+            n = counts.get(match.keyword, 0)
+            counts[match.keyword] = n + 1
+            found.append((match.keyword, n))
+        return found
+
+    def _reset(self):
+        self._seen = {}  # occurrence -> (partials seen in a row, first seen at)
+        self._fired = {}  # occurrence -> fired at
+
+    def partial(self, text, now=None):
+        """Feed a partial result; returns keywords that just became stable"""
+        now = time.monotonic() if now is None else now
+        current = set(self._occurrences(text))
+        seen = {}
+        for occ in current:
+            count, first_seen = self._seen.get(occ, (0, now))
+            seen[occ] = (count + 1, first_seen)
+        self._seen = seen
+        fired = []
+        for occ, (count, first_seen) in self._seen.items():
+            if count >= self.stable_partials and occ not in self._fired:
+                self._fired[occ] = now
+                self.latencies.append({"keyword": occ[0], "stabilize_ms": (now - first_seen) * 1000})
+                fired.append(occ[0])
+        return fired
+
+    def final(self, text, now=None):
+        """Feed the final result; returns keywords not already fired, and starts a new utterance"""
+        now = time.monotonic() if now is None else now
+        late = []
+        for occ in self._occurrences(text):
+            if occ in self._fired:
+                # How much earlier than the final result the early trigger fired
+                for record in reversed(self.latencies):
+                    if record["keyword"] == occ[0] and "lead_ms" not in record:
+                        record["lead_ms"] = (now - self._fired[occ]) * 1000
+                        break
+            else:
+                late.append(occ[0])
+        self._reset()
+        return late
+
+
+class StreamDecoder:
+    """Decoding state for one audio stream: recognizer, grammar, VAD gate and keyword trigger.
+
+    feed() must be called from one thread at a time. Results go to
+    `on_text(text)` and `on_keyword(keyword, early)`.
+    """
+
+    def __init__(self, model, samplerate=16000, keywords=None, use_grammar=True, stable_partials=2,
+                 vad=None, words=False, on_text=None, on_keyword=None, max_edits=0):
+        self.model = model
+        self.samplerate = samplerate
+        self.on_text = on_text
+        self.on_keyword = on_keyword
+        # Optional VoiceActivityDetector; silent blocks then never reach Kaldi
+        self.vad = vad
+        self.words = words
+        # Seconds of audio fed so far, i.e. the stream position
+        self.position = 0.0
+        self.decode_listener = None
+        self.last_result = None
+
+        # With keywords the decoder only searches the keyword grammar, which is
+        # far cheaper than open-vocabulary decoding and rejects near misses
+        self.use_grammar = use_grammar
+        self.grammar = keyword_grammar(keywords) if keywords and use_grammar else None
+        self._pending_grammar = None
+        self._grammar_lock = threading.Lock()
+        self.recognizer = self._make_recognizer()
+        self.trigger = KeywordTrigger(keywords, stable_partials, max_edits)
+
+    def _make_recognizer(self):
+        if self.grammar:
+            recognizer = KaldiRecognizer(self.model, self.samplerate, self.grammar)
+        else:
+            recognizer = KaldiRecognizer(self.model, self.samplerate)
+        if self.words:
+            recognizer.SetWords(True)
+        return recognizer
+
+    def set_keywords(self, keywords, apply_now=False):
+        """Change the keyword set (None for none).
+
+        With use_grammar the decoder grammar follows the keywords; it is swapped
+        before the next fed block (or at once with apply_now), and an unchanged
+        keyword set is a no-op.
+        """
+        self.trigger.set_keywords(keywords)
+        if not self.use_grammar:
+            return
+        grammar = keyword_grammar(keywords) if keywords else ""
+        with self._grammar_lock:
+            current = self._pending_grammar if self._pending_grammar is not None else (self.grammar or "")
+            if grammar == current:
+                return
+            self._pending_grammar = grammar
+        if apply_now:
+            self._apply_grammar()
+
+    def _apply_grammar(self):
+        with self._grammar_lock:
+            grammar, self._pending_grammar = self._pending_grammar, None
+        if grammar is None:
+            return
+        previous, self.grammar = self.grammar, grammar or None
+        if self.grammar and previous:
+            # Swapping one grammar for another keeps the recognizer
+            self.recognizer.SetGrammar(self.grammar)
+        else:
+            self.recognizer = self._make_recognizer()
+        logger.info(f"Recognizer grammar: {self.grammar or 'open vocabulary'}")
+
+    def feed(self, data):
+        """Decode one block of 16-bit mono PCM (any buffer)"""
+        if self._pending_grammar is not None:
+            self._apply_grammar()
+        self.position += len(data) / 2 / self.samplerate
+        if self.vad is None:
+            self._decode(_ffi.from_buffer(data))
+            return
+        chunks, ended = self.vad.process(data)
+        for chunk in chunks:
+            self._decode(_ffi.from_buffer(chunk))
+        if ended:
+            self.finish()
+
+    def _decode(self, data):
+        start = time.perf_counter()
+        if self.recognizer.AcceptWaveform(data):
+            self._on_final(self.recognizer.Result())
+        elif self.on_keyword is not None:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            for keyword in self.trigger.partial(partial):
+                self._fire_keyword(keyword, early=True)
+        if self.decode_listener is not None:
+            self.decode_listener(len(data), (time.perf_counter() - start) * 1000)
+
+    def finish(self):
+        """End the utterance now (VAD segment end or end of stream) instead of waiting for Kaldi's endpointer"""
+        self._on_final(self.recognizer.FinalResult())
+
+    def _on_final(self, result_json):
+        self.last_result = json.loads(result_json)
+        text = " ".join(_words(self.last_result.get("text", "")))
+        for keyword in self.trigger.final(text):
+            self._fire_keyword(keyword, early=False)
+        if text and self.on_text is not None:
+            self.on_text(text)
+
+    def _fire_keyword(self, keyword, early):
+        if self.on_keyword is None:
+            return
+        if early:
+            logger.info(f"Keyword '{keyword}' triggered from partial result")
+        self.on_keyword(keyword, early)
+
+    def stats(self):
+        return self.vad.stats() if self.vad is not None else None
+
+
 class SpeechRecognitionEngine:
-    def __init__(self, model_path, samplerate=16000, device=None):
+    def __init__(self, model_path=None, samplerate=16000, device=None, model=None, registry=None,
+                 keywords=None, use_grammar=True, stable_partials=2,
+                 blocksize=4000, queue_blocks=16, drop_policy=DROP_OLDEST, vad=None, source=None,
+                 words=False, max_edits=0):
         self.samplerate = samplerate
         self.device = device
-        self.audio_queue = queue.Queue()
+        # 16-bit mono; smaller blocks reach the decoder (and partial results) sooner
+        self.blocksize = blocksize
+        self.audio_queue = AudioBlockQueue(blocksize * 2, queue_blocks, drop_policy)
+        self.latency = RunningStats(200)
+        self.max_latency_ms = 0.0
+        # Microphone unless an AudioSource (e.g. a WAV replay) is given
+        self.source = source
+        self.finished = threading.Event()
+        self.taps = []
         self.is_running = False
-        self.stream = None
         self.recognition_thread = None
+        self.text_callback = None
+        self.keyword_callback = None
+
+        # Models are shared process-wide; only the first engine pays for loading
+        if model is None:
+            model = (registry or default_registry()).get(model_path)
+        self.model = model
+        self.decoder = StreamDecoder(model, samplerate, keywords, use_grammar, stable_partials, vad, words,
+                                     max_edits=max_edits)
+
+    @property
+    def position(self):
+        return self.decoder.position
 
-        self.model = Model(model_path)
-        self.recognizer = KaldiRecognizer(self.model, self.samplerate)
+    @property
+    def last_result(self):
+        return self.decoder.last_result
 
-    def audio_callback(self, indata, frames, time, status):
-        if status:
-            logger.warning(f"Audio stream status: {status}")
-        self.audio_queue.put(bytes(indata))
+    def set_keywords(self, keywords):
+        """Change the keyword set; see StreamDecoder.set_keywords"""
+        self.decoder.set_keywords(keywords, apply_now=not self.is_running)
 
-    def start(self, text_callback):
+    def add_tap(self, callback):
+        """Also hand every captured block to `callback(data)` (e.g. a SoundEventDetector).
+
+        Taps run on the audio thread, before VAD gating, so they must be quick.
+        """
+        self.taps.append(callback)
+
+    def push(self, data, block=False):
+        """Queue one block of 16-bit mono PCM; called from the audio source's thread"""
+        ok = self.audio_queue.put(data, block=block, timeout=0.5)
+        if ok or not block:
+            for tap in self.taps:
+                tap(data)
+        return ok
+
+    def start(self, text_callback, keyword_callback=None):
+        """Start listening.
+
+        `text_callback(text)` gets every final result. `keyword_callback(keyword,
+        early)` gets each spoken keyword once: early=True when it fired from a
+        partial result, False when it only showed up in the final result.
+        """
         if self.is_running:
             return
         self.is_running = True
         self.text_callback = text_callback
+        self.keyword_callback = keyword_callback
+        self.decoder.on_text = text_callback
+        self.decoder.on_keyword = keyword_callback
+        self.finished.clear()
+        if self.source is None:
+            self.source = MicrophoneSource(self.samplerate, self.blocksize, self.device)
         self.recognition_thread = threading.Thread(target=self._recognition_loop, daemon=True)
         self.recognition_thread.start()
+        self.source.start(self.push)
 
-        self.stream = sd.RawInputStream(
-            samplerate=self.samplerate,
-            blocksize=8000,
-            device=self.device,
-            dtype='int16',
-            channels=1,
-            callback=self.audio_callback
-        )
-        self.stream.__enter__()
+    def wait(self, timeout=None):
+        """Block until a finite source has been fully decoded"""
+        return self.finished.wait(timeout)
 
     def _recognition_loop(self):
         while self.is_running:
-            try:
-                data = self.audio_queue.get(timeout=1)
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    text = result.get("text", "")
-                    if text:
-                        self.text_callback(text)
-            except queue.Empty:
+            block = self.audio_queue.get(timeout=0.1)
+            if block is None:
+                if self.source.finished.is_set() and not self.audio_queue.qsize():
+                    self.decoder.finish()
+                    self.finished.set()
+                    break
                 continue
+            self.decoder.feed(block.data)
+            # Capture to decoded, including time spent waiting in the queue
+            latency_ms = (time.monotonic() - block.timestamp) * 1000
+            self.latency.update(latency_ms)
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+
+    def stats(self):
+        stats = self.audio_queue.stats()
+        stats["latency_ms"] = round(self.latency.mean, 1)
+        stats["max_latency_ms"] = round(self.max_latency_ms, 1)
+        if self.decoder.vad is not None:
+            stats["vad"] = self.decoder.stats()
+        return stats
 
     def stop(self):
         self.is_running = False
-        if self.stream:
-            self.stream.__exit__(None, None, None)
+        if self.source is not None:
+            self.source.stop()
         if self.recognition_thread and self.recognition_thread.is_alive():
             self.recognition_thread.join(timeout=2)
+        logger.info(f"Audio pipeline: {self.stats()}")
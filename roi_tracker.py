@@ -0,0 +1,134 @@
+import time
+
+import cv2
+import numpy as np
+
+from landmarks import landmarks_to_array
+
+
+class RoiTracker:
+    """Feeds FaceMesh a padded crop around the last face instead of the full frame.
+
+    With tracking enabled, each frame is cropped to a square region around the
+    previous frame's face box and the input is downscaled until the measured
+    per-frame latency fits `latency_budget_ms`. Full-frame detection is used
+    for the first frame and whenever the face is lost. With tracking disabled
+    and no budget this is exactly the plain full-frame path.
+    """
+
+    def __init__(self, tracking=True, padding=0.5, latency_budget_ms=None,
+                 min_scale=0.4, min_input_side=128, smoothing=0.2, lost_after=2):
+        self.tracking = tracking
+        self.padding = padding
+        self.lost_after = lost_after
+        self.latency_budget_ms = latency_budget_ms
+        self.min_scale = min_scale
+        self.min_input_side = min_input_side
+        self.smoothing = smoothing
+
+        self.scale = 1.0
+        self.latency_ms = None
+        self.face_box = None  # (x0, y0, x1, y1) in pixels, unpadded
+        self.roi = None       # crop used for the last frame
+        self.misses = 0
+        self.tracked_frames = 0
+        self.full_frames = 0
+        self._points = None
+
+    def reset(self):
+        self.face_box = None
+        self.roi = None
+        self.misses = 0
+
+    def _crop_region(self, width, height):
+        if not self.tracking or self.face_box is None:
+            return 0, 0, width, height
+        # FaceMesh tracks in input-image coordinates, so keep the crop fixed for
+        # as long as the face stays well inside it rather than re-centering
+        # every frame; each move costs FaceMesh a re-detection.
+        if self.roi is not None and self._face_fits(self.roi):
+            return self.roi
+        x0, y0, x1, y1 = self.face_box
+        side = max(x1 - x0, y1 - y0) * (1 + 2 * self.padding)
+        # Quantize so the crop size only changes when the face size really does
+        side = int(min(max(32, np.ceil(side / 32) * 32), width, height))
+        cx = (x0 + x1) // 2
+        cy = (y0 + y1) // 2
+        left = int(min(max(cx - side // 2, 0), width - side))
+        top = int(min(max(cy - side // 2, 0), height - side))
+        return left, top, left + side, top + side
+
+    def _face_fits(self, roi):
+        rx0, ry0, rx1, ry1 = roi
+        fx0, fy0, fx1, fy1 = self.face_box
+        side = rx1 - rx0
+        face_side = max(fx1 - fx0, fy1 - fy0)
+        if face_side * (1 + 2 * self.padding) > side or face_side * (1 + 4 * self.padding) < side:
+            return False
+        margin = side * self.padding / (2 * (1 + 2 * self.padding))
+        return (fx0 - rx0 >= margin and fy0 - ry0 >= margin and
+                rx1 - fx1 >= margin and ry1 - fy1 >= margin)
+
+    def _update_scale(self, elapsed_ms):
+        if self.latency_ms is None:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms += self.smoothing * (elapsed_ms - self.latency_ms)
+        if self.latency_budget_ms is None:
+            return
+        if self.latency_ms > self.latency_budget_ms:
+            self.scale = max(self.min_scale, self.scale * 0.85)
+        elif self.latency_ms < 0.7 * self.latency_budget_ms:
+            self.scale = min(1.0, self.scale * 1.05)
+
+    def process(self, face_mesh, frame):
+        """Run FaceMesh on the tracked region; return full-frame (N, 3) points or None"""
+        start = time.perf_counter()
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self._crop_region(width, height)
+        crop = frame[y0:y1, x0:x1]
+        crop_w, crop_h = x1 - x0, y1 - y0
+
+        scale = self.scale
+        if min(crop_w, crop_h) * scale < self.min_input_side:
+            scale = min(1.0, self.min_input_side / min(crop_w, crop_h))
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(crop_w * scale)), max(1, int(crop_h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        results = face_mesh.process(rgb)
+
+        self.roi = (x0, y0, x1, y1) if self.face_box is not None else None
+        if (x1 - x0, y1 - y0) == (width, height):
+            self.full_frames += 1
+        else:
+            self.tracked_frames += 1
+
+        if not results.multi_face_landmarks:
+            # FaceMesh usually needs one frame to re-detect inside a freshly moved
+            # crop; only after repeated misses is the face treated as lost and
+            # the next frame run full-frame.
+            self.misses += 1
+            if self.face_box is not None and self.misses >= self.lost_after:
+                self.face_box = None
+                self.roi = None
+            self._update_scale((time.perf_counter() - start) * 1000)
+            return None
+
+        self.misses = 0
+
+        points = landmarks_to_array(results.multi_face_landmarks[0], self._points)
+        self._points = points
+        # Map crop-normalized coordinates back to full-frame normalized ones
+        points[:, 0] = (x0 + points[:, 0] * crop_w) / width
+        points[:, 1] = (y0 + points[:, 1] * crop_h) / height
+        points[:, 2] *= crop_w / width
+
+        xs = points[:, 0] * width
+        ys = points[:, 1] * height
+        self.face_box = (
+            max(0, int(xs.min())), max(0, int(ys.min())),
+            min(width, int(xs.max())), min(height, int(ys.max())),
+        )
+        self._update_scale((time.perf_counter() - start) * 1000)
+        return points
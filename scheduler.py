@@ -8,12 +8,14 @@ import json
 import os
 
 class TaskScheduler:
-    def __init__(self, read_aloud_callback=None):
+    def __init__(self, read_aloud_callback=None, on_task=None):
         self.scheduled_tasks = []
         self.task_queue = Queue()
         self.is_running = False
         self.scheduler_thread = None
         self.read_aloud_callback = read_aloud_callback
+        # Called on the scheduler thread instead of queueing for check_for_tasks()
+        self.on_task = on_task
         self.logger = logging.getLogger("EmergencySoundTracker")
         self.reminders_file = "reminders.json"
         self._load_reminders()
@@ -87,8 +89,11 @@ class TaskScheduler:
         """Handle task triggering"""
         self.logger.info(f"Task triggered: {task['name']}")
         
-        # Add to queue for UI thread to handle
-        self.task_queue.put(task)
+        # Hand over to the UI thread
+        if self.on_task:
+            self.on_task(task)
+        else:
+            self.task_queue.put(task)
         
         # Play alert sound
         winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
@@ -0,0 +1,598 @@
+"""Headless service: camera, gesture and speech pipelines behind a local HTTP API.
+
+Usage:
+    python service.py --room 101 --port 8765 --source 0 --start camera gesture speech
+
+Endpoints:
+    GET  /events        Server-Sent Events: gesture, keyword, sound, speech and status events
+    GET  /preview.mjpg  MJPEG preview; frames are only encoded while someone watches
+    GET  /status        pipeline state and counters (JSON)
+    POST /start         {"pipelines": ["camera", "gesture", "speech"]}, all when omitted
+    POST /stop          same body as /start
+    POST /keywords      {"keyword": "help", "synonyms": ["help me"]}
+
+Every event carries the room id, so one nurse-station screen can subscribe
+to many rooms. The server binds to 127.0.0.1 unless --host says otherwise;
+on any other address --token is required and every request must send it as
+"Authorization: Bearer <token>" or, for EventSource and <img> clients that
+cannot set headers, as a ?token= query parameter.
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from frame_buffer import LatestFrameBuffer, CaptureThread
+from model_registry import default_registry
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+CAMERA = "camera"
+GESTURE = "gesture"
+SPEECH = "speech"
+PIPELINES = (CAMERA, GESTURE, SPEECH)
+
+DEFAULT_KEYWORDS = {
+    "help": {"help me", "somebody help"},
+    "fire": set(),
+    "emergency": {"call the nurse", "can't breathe", "i fell"},
+    "water": {"i'm thirsty"},
+    "food": {"i'm hungry"},
+    "medicine": {"my pills", "medication"},
+}
+
+
+class EventHub:
+    """Numbered event history that any number of clients can follow.
+
+    post() never blocks on clients. Each client remembers the id of the last
+    event it sent and asks for everything after it; a client that falls more
+    than `history` events behind skips ahead and is told how many it missed.
+    Client-facing ids are prefixed with a per-process epoch, so an id handed
+    out before a restart is recognized as stale instead of waited on.
+    """
+
+    def __init__(self, room, history=1000):
+        self.room = room
+        self.epoch = f"{time.time_ns():x}"
+        self._events = deque(maxlen=history)
+        self._cond = threading.Condition()
+        self._next_id = 1
+
+    def post(self, kind, **payload):
+        with self._cond:
+            event = {"id": self._next_id, "kind": kind, "room": self.room, "time": time.time()}
+            event.update(payload)
+            self._next_id += 1
+            self._events.append(event)
+            self._cond.notify_all()
+        return event
+
+    @property
+    def last_id(self):
+        return self._next_id - 1
+
+    def event_id(self, event):
+        return f"{self.epoch}-{event['id']}"
+
+    def resume_after(self, last_event_id):
+        """The id to wait() after for a client that sent `last_event_id`.
+
+        New clients start at the newest event. A client whose id is from
+        another process, or newer than anything posted here, gets the
+        whole history replayed.
+        """
+        if not last_event_id:
+            return self.last_id
+        epoch, _, number = last_event_id.rpartition("-")
+        if epoch != self.epoch or not number.isdigit() or int(number) > self.last_id:
+            return 0
+        return int(number)
+
+    def wait(self, after_id, timeout=None):
+        """Return (events after `after_id`, number missed), waiting up to `timeout` for one"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_id - 1 > after_id, timeout)
+            if not self._events or self._events[-1]["id"] <= after_id:
+                return [], 0
+            first = self._events[0]["id"]
+            missed = max(0, first - after_id - 1)
+            return [event for event in self._events if event["id"] > after_id], missed
+
+
+class MjpegEncoder:
+    """Encodes the newest camera frame to JPEG once, for every preview client.
+
+    The encoding thread sleeps while nobody is connected and otherwise
+    encodes at most `max_fps` frames a second, scaled to `width` pixels.
+    """
+
+    def __init__(self, service, max_fps=5, width=480, quality=70):
+        self.service = service
+        self.min_interval = 1.0 / max_fps
+        self.width = width
+        self.quality = quality
+        self.clients = 0
+        self.encoded = 0
+        self.encode_ms = 0.0
+        self._jpeg = None
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._wanted = threading.Event()
+        self._resized = None
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="mjpeg", daemon=True)
+        self._thread.start()
+
+    def attach(self):
+        with self._cond:
+            self.clients += 1
+            self._wanted.set()
+
+    def detach(self):
+        with self._cond:
+            self.clients -= 1
+            if not self.clients:
+                self._wanted.clear()
+
+    def next_frame(self, seq, timeout=None):
+        """Return (seq, jpeg bytes) newer than `seq`, or (seq, None) on timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > seq or not self.running, timeout):
+                return seq, None
+            return self._seq, self._jpeg
+
+    def _run(self):
+        import cv2
+        import numpy as np
+        source = None
+        frame_seq = 0
+        while self.running:
+            if not self._wanted.wait(timeout=0.5):
+                continue
+            buffer = self.service.frame_buffer
+            if buffer is None or buffer.closed:
+                time.sleep(0.2)
+                continue
+            if buffer is not source:
+                # A restarted camera has a new buffer that counts from zero again
+                source = buffer
+                frame_seq = 0
+            seq, frame = buffer.wait_newer(frame_seq, timeout=0.5)
+            if frame is None:
+                continue
+            frame_seq = seq
+            start = time.perf_counter()
+            image = frame.image
+            h, w = image.shape[:2]
+            if w > self.width:
+                size = (self.width, h * self.width // w)
+                if self._resized is None or self._resized.shape[:2] != (size[1], size[0]):
+                    self._resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                image = cv2.resize(image, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+            else:
+                image = image.copy()
+            detector = self.service.detector
+            if detector is not None:
+                detector.render(image)
+            ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                with self._cond:
+                    self._jpeg = jpeg.tobytes()
+                    self._seq += 1
+                    self._cond.notify_all()
+                self.encoded += 1
+                self.encode_ms += (time.perf_counter() - start) * 1000
+            time.sleep(max(0.0, self.min_interval - (time.perf_counter() - start)))
+
+    def stats(self):
+        return {"clients": self.clients, "encoded": self.encoded,
+                "encode_ms": round(self.encode_ms / self.encoded, 2) if self.encoded else 0.0}
+
+    def stop(self):
+        self.running = False
+        self._wanted.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+
+class EdgeService:
+    """Owns the camera, gesture and speech pipelines of one room"""
+
+    def __init__(self, room="room", camera_source=0, model_path="vosk-model-small-en-us-0.15",
+                 keywords=None, preview_fps=5, preview_width=480, use_vad=True, detect_sound_events=True,
+                 power_save=True):
+        self.room = room
+        self.camera_source = camera_source
+        self.model_path = model_path
+        self.keywords = {k: set(v) for k, v in (keywords or DEFAULT_KEYWORDS).items()}
+        self.use_vad = use_vad
+        self.detect_sound_events = detect_sound_events
+        self.power_save = power_save
+        self.hub = EventHub(room)
+        self.model_registry = default_registry()
+        self._lock = threading.Lock()
+
+        self.source = None
+        self.frame_buffer = None
+        self.capture_thread = None
+        self.detector = None
+        self.gesture_thread = None
+        self.gesture_running = False
+        self._gesture_stop = None  # stop event of the current gesture run
+        self.alert_dispatcher = None  # shared by every gesture run, created on first use
+        self.engine = None
+        self.sound_events = None
+        self.encoder = MjpegEncoder(self, max_fps=preview_fps, width=preview_width)
+
+    def running(self):
+        return {
+            CAMERA: self.capture_thread is not None and self.capture_thread.is_alive(),
+            GESTURE: self.gesture_running,
+            SPEECH: self.engine is not None and self.engine.is_running,
+        }
+
+    def start(self, pipelines=PIPELINES):
+        with self._lock:
+            if CAMERA in pipelines or GESTURE in pipelines:
+                self._start_camera()
+            if GESTURE in pipelines:
+                self._start_gesture()
+            if SPEECH in pipelines:
+                self._start_speech()
+        return self.running()
+
+    def stop(self, pipelines=PIPELINES):
+        with self._lock:
+            if SPEECH in pipelines:
+                self._stop_speech()
+            if GESTURE in pipelines or CAMERA in pipelines:
+                self._stop_gesture()
+            if CAMERA in pipelines:
+                self._stop_camera()
+        return self.running()
+
+    def _start_camera(self):
+        if self.running()[CAMERA]:
+            return
+        from frame_source import open_source
+        self.source = open_source(self.camera_source)
+        if not self.source.is_opened():
+            self.source = None
+            raise IOError(f"Cannot open camera source {self.camera_source!r}")
+        self.frame_buffer = LatestFrameBuffer()
+        self.capture_thread = CaptureThread(self.source, self.frame_buffer)
+        self.capture_thread.start()
+        self.hub.post("status", pipeline=CAMERA, running=True)
+
+    def _stop_camera(self):
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
+            self.capture_thread = None
+        if self.source is not None:
+            self.source.release()
+            self.source = None
+        self.hub.post("status", pipeline=CAMERA, running=False)
+
+    def _start_gesture(self):
+        if self.gesture_running:
+            return
+        from gesture_detector import GestureDetector, call_dispatcher
+        if self.alert_dispatcher is None:
+            self.alert_dispatcher = call_dispatcher()
+        detector = GestureDetector(power_save=self.power_save, alert_dispatcher=self.alert_dispatcher)
+        detector.pipeline.add_listener(
+            lambda event: self.hub.post(GESTURE, gesture=event.kind, message=event.message)
+        )
+        # Each run gets its own stop event, so a run that outlives its join
+        # cannot end the next one
+        stop = threading.Event()
+        subscriber = self.frame_buffer.subscribe("gesture")
+        self.detector = detector
+        self._gesture_stop = stop
+        self.gesture_running = True
+        self.gesture_thread = threading.Thread(target=self._run_gesture, args=(detector, subscriber, stop),
+                                               name="gesture", daemon=True)
+        self.gesture_thread.start()
+        self.hub.post("status", pipeline=GESTURE, running=True)
+
+    def _run_gesture(self, detector, subscriber, stop):
+        try:
+            while not stop.is_set():
+                frame = subscriber.get(timeout=0.5)
+                if frame is None:
+                    if subscriber.buffer.closed:
+                        break
+                    continue
+                detector.detect(frame.image, frame.timestamp)
+        except Exception as e:
+            logger.error(f"Gesture detection error: {e}")
+            self.hub.post("error", pipeline=GESTURE, message=str(e))
+        finally:
+            detector.close()
+            if self._gesture_stop is stop:
+                # Ended on its own rather than through _stop_gesture
+                self._gesture_stop = None
+                self.gesture_running = False
+                self.detector = None
+
+    def _stop_gesture(self):
+        if not self.gesture_running:
+            return
+        self._gesture_stop.set()
+        self._gesture_stop = None
+        self.gesture_running = False
+        self.detector = None
+        if self.gesture_thread is not None:
+            self.gesture_thread.join(timeout=1.0)
+            self.gesture_thread = None
+        self.hub.post("status", pipeline=GESTURE, running=False)
+
+    def _start_speech(self):
+        if self.running()[SPEECH]:
+            return
+        from recognizer import SpeechRecognitionEngine
+        from vad import VoiceActivityDetector
+        engine = SpeechRecognitionEngine(
+            model_path=self.model_path,
+            registry=self.model_registry,
+            keywords=self.keywords,
+            vad=VoiceActivityDetector() if self.use_vad else None,
+        )
+        if self.detect_sound_events:
+            from sound_events import SoundEventDetector
+            self.sound_events = SoundEventDetector(
+                on_event=lambda event: self.hub.post("sound", sound=event.kind, message=event.message,
+                                                     level_db=event.level_db)
+            )
+            self.sound_events.start()
+            engine.add_tap(self.sound_events.tap)
+        engine.start(
+            lambda text: self.hub.post(SPEECH, text=text),
+            lambda keyword, early: self.hub.post("keyword", keyword=keyword, early=early),
+        )
+        self.engine = engine
+        self.hub.post("status", pipeline=SPEECH, running=True)
+
+    def _stop_speech(self):
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine = None
+        if self.sound_events is not None:
+            self.sound_events.stop()
+            self.sound_events = None
+        self.hub.post("status", pipeline=SPEECH, running=False)
+
+    def add_keyword(self, keyword, synonyms=()):
+        keyword = keyword.strip().lower()
+        if not keyword:
+            raise ValueError("keyword must not be empty")
+        with self._lock:
+            self.keywords.setdefault(keyword, set()).update(s.strip().lower() for s in synonyms if s.strip())
+            if self.engine is not None:
+                self.engine.set_keywords(self.keywords)
+        self.hub.post("status", keyword_added=keyword)
+        return {k: sorted(v) for k, v in self.keywords.items()}
+
+    def status(self):
+        status = {"room": self.room, "running": self.running(), "events": self.hub.last_id,
+                  "preview": self.encoder.stats(), "keywords": sorted(self.keywords)}
+        if self.engine is not None:
+            status["speech"] = self.engine.stats()
+        detector = self.detector
+        if detector is not None:
+            status["gesture"] = {"blinks": detector.blink_counter, "nods": detector.nod_counter,
+                                 "emergency": detector.emergency_triggered}
+            if detector.duty_cycle is not None:
+                status["gesture"]["power_save"] = detector.duty_cycle.stats()
+        if self.capture_thread is not None:
+            status["camera"] = {"captured": self.capture_thread.captured}
+        return status
+
+    def shutdown(self):
+        self.stop()
+        self.encoder.stop()
+        if self.alert_dispatcher is not None:
+            self.alert_dispatcher.stop()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    keepalive_interval = 15.0
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+    def do_GET(self):
+        path = self._authorized_path()
+        if path is None:
+            return
+        if path == "/events":
+            self._stream_events()
+        elif path == "/preview.mjpg":
+            self._stream_preview()
+        elif path == "/status":
+            self._send_json(self.service.status())
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _authorized_path(self):
+        """The request path without its query, or None after answering 401"""
+        url = urlsplit(self.path)
+        token = self.server.token
+        if token is None:
+            return url.path
+        scheme, _, sent = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() != "bearer":
+            sent = (parse_qs(url.query).get("token") or [""])[0]
+        if hmac.compare_digest(sent.strip().encode(), token.encode()):
+            return url.path
+        self._send_json({"error": "unauthorized"}, 401)
+        return None
+
+    def do_POST(self):
+        path = self._authorized_path()
+        if path is None:
+            return
+        try:
+            body = self._read_json()
+            if path in ("/start", "/stop"):
+                pipelines = body.get("pipelines") or PIPELINES
+                unknown = set(pipelines) - set(PIPELINES)
+                if unknown:
+                    raise ValueError(f"unknown pipelines: {sorted(unknown)}")
+                action = self.service.start if path == "/start" else self.service.stop
+                self._send_json({"running": action(pipelines)})
+            elif path == "/keywords":
+                self._send_json({"keywords": self.service.add_keyword(body.get("keyword", ""),
+                                                                      body.get("synonyms", ()))})
+            else:
+                self._send_json({"error": "not found"}, 404)
+        except (ValueError, IOError) as e:
+            self._send_json({"error": str(e)}, 400)
+        except Exception as e:
+            logger.exception("Service request failed")
+            self._send_json({"error": str(e)}, 500)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("request body must be a JSON object")
+        return body
+
+    def _send_json(self, data, status=200):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self):
+        hub = self.service.hub
+        last_id = hub.resume_after(self.headers.get("Last-Event-ID"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                events, missed = hub.wait(last_id, timeout=self.keepalive_interval)
+                if not events:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                chunks = [f": missed {missed} events\n\n"] if missed else []
+                for event in events:
+                    chunks.append(f"id: {hub.event_id(event)}\nevent: {event['kind']}\ndata: {json.dumps(event)}\n\n")
+                self.wfile.write("".join(chunks).encode("utf-8"))
+                self.wfile.flush()
+                last_id = events[-1]["id"]
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream_preview(self):
+        encoder = self.service.encoder
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        encoder.attach()
+        seq = 0
+        try:
+            while True:
+                seq, jpeg = encoder.next_frame(seq, timeout=5.0)
+                if jpeg is None:
+                    if not encoder.running:
+                        break
+                    continue
+                self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                                 + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            encoder.detach()
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(service, host="127.0.0.1", port=8765, token=None):
+    """HTTP server for `service`; every request needs `token` when it is set"""
+    if not token and not is_loopback(host):
+        raise ValueError(f"a token is required to serve on {host}")
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.token = token or None
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipelines headless behind a local HTTP API")
+    parser.add_argument("--room", default="room", help="room id attached to every event")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token", help="shared token for every request; required unless bound to loopback")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or 'synthetic[:N]'")
+    parser.add_argument("--model", default="vosk-model-small-en-us-0.15")
+    parser.add_argument("--start", nargs="*", default=list(PIPELINES), choices=PIPELINES,
+                        help="pipelines to start right away")
+    parser.add_argument("--preview-fps", type=float, default=5.0)
+    parser.add_argument("--preview-width", type=int, default=480)
+    parser.add_argument("--no-vad", action="store_true")
+    parser.add_argument("--no-sound-events", action="store_true")
+    parser.add_argument("--no-power-save", action="store_true",
+                        help="run FaceMesh on every frame even when nothing moves")
+    args = parser.parse_args()
+    if not args.token and not is_loopback(args.host):
+        parser.error(f"--token is required when serving on {args.host}")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    service = EdgeService(room=args.room, camera_source=args.source, model_path=args.model,
+                          preview_fps=args.preview_fps, preview_width=args.preview_width,
+                          use_vad=not args.no_vad, detect_sound_events=not args.no_sound_events,
+                          power_save=not args.no_power_save)
+    if SPEECH in args.start:
+        service.model_registry.preload(args.model)
+    server = serve(service, args.host, args.port, args.token)
+    logger.info(f"Room {args.room}: serving on http://{args.host}:{args.port}")
+    try:
+        if args.start:
+            service.start(args.start)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
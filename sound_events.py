@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+# kind is "impact" (fall, crash), "glass" or "alarm"; level_db is how far the
+# triggering band rose above its background.
+SoundEvent = namedtuple("SoundEvent", ["kind", "timestamp", "message", "level_db"])
+
+# name: (low Hz, high Hz)
+BANDS = {
+    "low": (40, 400),
+    "mid": (400, 2500),
+    "high": (2500, 8000),
+}
+# Covers smoke and CO alarm tones (about 3.1-3.2 kHz) as well as lower sirens
+TONAL_RANGE = (500, 4500)
+
+MESSAGES = {
+    "impact": "Loud impact detected. Possible fall or crash.",
+    "glass": "Breaking glass detected.",
+    "alarm": "Sustained alarm sound detected.",
+}
+
+
+class SoundEventDetector:
+    """Detects falls/crashes, breaking glass and alarms in the microphone stream.
+
+    tap() is attached to the speech engine and only copies samples into a ring
+    buffer. A background thread then runs a batched STFT over the new hops and
+    compares per-band log energies against slowly adapting backgrounds:
+    impacts and breaking glass need a sharp attack (the band beats the frames
+    before the previous one by `onset_db`, which speech rarely does); impacts
+    are broadband but led by the low band, glass is dominated by the high band
+    and not tonal. Alarms are strongly tonal frames whose peak band rose above
+    its background; they add up to `alarm_seconds` of tone across gaps of up
+    to `alarm_gap_seconds`, so beep patterns such as T3 count as well.
+    """
+
+    def __init__(self, samplerate=16000, n_fft=512, hop=256, buffer_seconds=2.0,
+                 impact_db=18.0, onset_db=20.0, glass_db=15.0, tonal_ratio=25.0, alarm_seconds=2.0,
+                 alarm_gap_seconds=2.0, cooldown=5.0, background_alpha=0.02, dispatcher=None, channels=("alarm",),
+                 on_event=None):
+        self.samplerate = samplerate
+        self.n_fft = n_fft
+        self.hop = hop
+        self.impact_db = impact_db
+        self.onset_db = onset_db
+        self.glass_db = glass_db
+        self.tonal_ratio = tonal_ratio
+        self.alarm_frames = int(alarm_seconds * samplerate / hop)
+        self.alarm_gap_frames = int(alarm_gap_seconds * samplerate / hop)
+        self.cooldown = cooldown
+        self.background_alpha = background_alpha
+        self.dispatcher = dispatcher
+        self.channels = list(channels)
+        self.on_event = on_event
+
+        self.window = np.hanning(n_fft).astype(np.float32)
+        freqs = np.fft.rfftfreq(n_fft, 1.0 / samplerate)
+        # Band energies are one matrix product with a 0/1 band membership matrix
+        self.band_names = list(BANDS)
+        self.band_matrix = np.stack([((freqs >= lo) & (freqs < hi)).astype(np.float32)
+                                     for lo, hi in BANDS.values()], axis=1)
+        self.tonal_bins = (freqs >= TONAL_RANGE[0]) & (freqs < TONAL_RANGE[1])
+        # Band index of every tonal bin, to find which band holds a tonal peak
+        self.tonal_band = np.argmax(self.band_matrix[self.tonal_bins], axis=1)
+
+        self._ring = np.zeros(int(buffer_seconds * samplerate), dtype=np.float32)
+        self._written = 0  # total samples ever written
+        self._analyzed = 0  # start of the next frame to analyze
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.background = None
+        self.tonal_frames = 0  # tonal frames in the current alarm run
+        self.tonal_gap = 0  # frames since the last tonal frame of the run
+        self.recent_db = deque(maxlen=4)
+        self.last_event = {}
+        self.frames = 0
+        self.cpu_seconds = 0.0
+        self._started = None
+        self.running = False
+        self.thread = None
+
+    def tap(self, data, timestamp=None):
+        """Copy one block of 16-bit mono PCM into the ring; cheap enough for the audio callback"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        capacity = len(self._ring)
+        with self._lock:
+            start = self._written % capacity
+            end = start + len(samples)
+            if end <= capacity:
+                self._ring[start:end] = samples
+            else:
+                split = capacity - start
+                self._ring[start:] = samples[:split]
+                self._ring[:end - capacity] = samples[split:]
+            self._written += len(samples)
+        self._wake.set()
+
+    def start(self):
+        self.running = True
+        self._started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=1)
+
+    def _run(self):
+        while self.running:
+            self._wake.wait(timeout=0.5)
+            self._wake.clear()
+            start = time.thread_time()
+            self.process_pending()
+            self.cpu_seconds += time.thread_time() - start
+
+    def _pending_samples(self):
+        capacity = len(self._ring)
+        with self._lock:
+            # If analysis fell a whole ring behind, skip to what is still there
+            self._analyzed = max(self._analyzed, self._written - capacity)
+            count = (self._written - self._analyzed - self.n_fft) // self.hop + 1
+            if count <= 0:
+                return None
+            length = (count - 1) * self.hop + self.n_fft
+            start = self._analyzed % capacity
+            idx = (start + np.arange(length)) % capacity
+            segment = self._ring[idx]
+            self._analyzed += count * self.hop
+        return segment
+
+    def process_pending(self):
+        """Analyze every complete hop written since the last call; returns the events raised"""
+        segment = self._pending_samples()
+        if segment is None:
+            return []
+        frames = sliding_window_view(segment, self.n_fft)[::self.hop] * self.window
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        bands_db = 10 * np.log10(power @ self.band_matrix + 1e-3)
+        tonal = power[:, self.tonal_bins]
+        tonality = tonal.max(axis=1) / (tonal.mean(axis=1) + 1e-3)
+        peak_band = self.tonal_band[tonal.argmax(axis=1)]
+        self.frames += len(frames)
+
+        events = []
+        for band_db, ratio, band in zip(bands_db, tonality, peak_band):
+            events.extend(self._check_frame(band_db, ratio, band))
+        return events
+
+    def _check_frame(self, band_db, tonality, peak_band):
+        # Frames overlap by half, so a step shows up over two frames; compare
+        # against the frames before the previous one
+        if len(self.recent_db) >= 2:
+            onset = band_db - np.max(list(self.recent_db)[:-1], axis=0)
+        else:
+            onset = np.zeros_like(band_db)
+        self.recent_db.append(band_db)
+        if self.background is None:
+            self.background = band_db.copy()
+            return []
+        rise = band_db - self.background
+        low, mid, high = rise
+        tonal = tonality > self.tonal_ratio and rise[peak_band] > 6
+        events = []
+        kind = None
+        if (onset[0] > self.onset_db and low > self.impact_db and low >= mid - 3
+                and min(mid, high) > self.impact_db / 2):
+            kind = "impact"
+        elif onset[2] > self.onset_db and high > self.glass_db and high > low + 6 and not tonal:
+            kind = "glass"
+        if kind is not None:
+            events += self._raise(kind, float(max(rise)))
+
+        if tonal:
+            self.tonal_frames += 1
+            self.tonal_gap = 0
+            # Repeats while the alarm keeps sounding, as often as the cooldown allows
+            if self.tonal_frames >= self.alarm_frames:
+                events += self._raise("alarm", float(rise[peak_band]))
+        elif self.tonal_frames:
+            self.tonal_gap += 1
+            if self.tonal_gap > self.alarm_gap_frames:
+                self.tonal_frames = 0
+
+        # Backgrounds only learn from ordinary frames, so events do not raise them
+        if kind is None and not tonal:
+            self.background += self.background_alpha * (band_db - self.background)
+        return events
+
+    def _raise(self, kind, level_db):
+        now = time.time()
+        if now - self.last_event.get(kind, 0.0) < self.cooldown:
+            return []
+        self.last_event[kind] = now
+        event = SoundEvent(kind, now, MESSAGES[kind], round(level_db, 1))
+        logger.warning(f"Sound event: {kind} (+{event.level_db} dB)")
+        if self.dispatcher is not None:
+            self.dispatcher.submit(event.message, self.channels)
+        if self.on_event is not None:
+            self.on_event(event)
+        return [event]
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "frames": self.frames,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "cpu_percent": round(100 * self.cpu_seconds / elapsed, 2) if elapsed else 0.0,
+        }
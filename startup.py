@@ -0,0 +1,228 @@
+import importlib
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("EmergencySoundTracker")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Process start as near as we can get to it; app.py imports this module first
+PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader to time its execution"""
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self.profiler._time_import(module.__name__):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self._finding = threading.local()
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self.profiler)
+        return spec
+
+
+class StartupProfiler:
+    """Breaks startup time down per import and per initialization step.
+
+    While enabled, every module executed on the main thread is timed through
+    a meta path finder; `self` time excludes the imports it triggered, so
+    the report shows where the time actually goes. Initialization steps are
+    recorded with phase() or add(), from any thread.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.imports = {}  # module -> [total seconds, self seconds]
+        self.phases = []  # (name, thread, start offset, seconds)
+        self.marks = {}
+        self._stack = []
+        self._lock = threading.Lock()
+        self._finder = None
+        if enabled:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    @contextmanager
+    def _time_import(self, name):
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports[name] = [elapsed, elapsed - children]
+
+    def import_module(self, name):
+        """Import `name`, recording it as a phase of its own"""
+        with self.phase(f"import {name}"):
+            return importlib.import_module(name)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, start)
+
+    def add(self, name, seconds, start=None):
+        if not self.enabled:
+            return
+        start = time.perf_counter() - seconds if start is None else start
+        with self._lock:
+            self.phases.append((name, threading.current_thread().name, start - PROCESS_START, seconds))
+
+    def mark(self, name):
+        """Record a milestone such as 'window shown', relative to process start"""
+        self.marks.setdefault(name, time.perf_counter() - PROCESS_START)
+
+    def stop(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def report(self, top=25):
+        lines = ["Startup profile", "", "Milestones (s since start):"]
+        for name, offset in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  {offset:8.3f}  {name}")
+        lines += ["", "Initialization (start s, duration ms, thread):"]
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+        for name, thread, offset, seconds in phases:
+            lines.append(f"  {offset:8.3f}  {seconds * 1000:9.1f}  {thread:<14} {name}")
+        lines += ["", f"Imports on the main thread, top {top} by self time (self ms, total ms):"]
+        ranked = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (total, own) in ranked[:top]:
+            lines.append(f"  {own * 1000:9.1f}  {total * 1000:9.1f}  {name}")
+        total_imports = sum(own for _, own in self.imports.values())
+        lines.append(f"  {len(self.imports)} modules, {total_imports * 1000:.0f} ms in total")
+        return "\n".join(lines)
+
+
+class WarmupTask:
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+        self.state = PENDING
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self.done = threading.Event()
+
+
+class Warmup:
+    """Runs slow initializations on background threads, one thread per task.
+
+    A task is `func(report)`; it may call report(progress) with a fraction
+    for finer progress. Listeners are called as `callback(task)` from the
+    task's thread on every state or progress change.
+    """
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler or StartupProfiler()
+        self.tasks = {}
+        self.listeners = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self, name, func):
+        task = self.tasks.get(name)
+        if task is not None and task.state in (PENDING, RUNNING, DONE):
+            return task
+        task = WarmupTask(name, func)
+        self.tasks[name] = task
+        threading.Thread(target=self._run, args=(task,), name=f"warmup-{name}", daemon=True).start()
+        return task
+
+    def result(self, name, timeout=None):
+        """The task's result once it has finished, else None"""
+        task = self.tasks.get(name)
+        if task is None or not task.done.wait(timeout):
+            return None
+        return task.result
+
+    def take(self, name, timeout=None):
+        """Like result(), but hands the object out only once, e.g. to its one user"""
+        result = self.result(name, timeout)
+        if result is not None:
+            self.tasks[name].result = None
+        return result
+
+    def all_done(self):
+        return all(task.done.is_set() for task in self.tasks.values())
+
+    def _set(self, task, state=None, progress=None):
+        if state is not None:
+            task.state = state
+        if progress is not None:
+            task.progress = progress
+        for listener in list(self.listeners):
+            try:
+                listener(task)
+            except Exception as e:
+                logger.warning(f"Warm-up listener failed: {e}")
+
+    def _run(self, task):
+        start = time.perf_counter()
+        self._set(task, RUNNING, 0.0)
+        try:
+            task.result = task.func(lambda progress: self._set(task, progress=progress))
+        except Exception as e:
+            task.error = e
+            task.seconds = time.perf_counter() - start
+            logger.error(f"Warm-up of {task.name} failed: {e}")
+            self.profiler.add(f"warm up {task.name} (failed)", task.seconds, start)
+            task.done.set()
+            self._set(task, FAILED)
+            return
+        task.seconds = time.perf_counter() - start
+        self.profiler.add(f"warm up {task.name}", task.seconds, start)
+        task.done.set()
+        self._set(task, DONE, 1.0)
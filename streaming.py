@@ -0,0 +1,162 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity NumPy ring buffer; appends are O(1) and never allocate"""
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._next = 0
+        self._size = 0
+
+    def append(self, value):
+        """Store value; return the value it overwrote, or None while filling"""
+        evicted = self._data[self._next] if self._size == self.capacity else None
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return evicted
+
+    def values(self):
+        """Contents in insertion order (a copy)"""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def raw(self):
+        """Contents in storage order, without copying; fine for order-free reductions"""
+        return self._data[:self._size] if self._size < self.capacity else self._data
+
+    @property
+    def last(self):
+        return self._data[self._next - 1] if self._size else None
+
+    @property
+    def full(self):
+        return self._size == self.capacity
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+
+class RunningStats:
+    """Mean and variance over the last `window` samples in O(1) per update"""
+
+    # Running sums drift with float error; rebuild them from the buffer now and then
+    RESYNC_EVERY = 4096
+
+    def __init__(self, window):
+        self.buffer = RingBuffer(window)
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._updates = 0
+
+    def update(self, value):
+        value = float(value)
+        evicted = self.buffer.append(value)
+        self._sum += value
+        self._sumsq += value * value
+        if evicted is not None:
+            self._sum -= evicted
+            self._sumsq -= evicted * evicted
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            data = self.buffer.raw()
+            self._sum = float(data.sum())
+            self._sumsq = float(np.dot(data, data))
+        return self
+
+    @property
+    def count(self):
+        return len(self.buffer)
+
+    @property
+    def full(self):
+        return self.buffer.full
+
+    @property
+    def mean(self):
+        return self._sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        mean = self.mean
+        return max(0.0, self._sumsq / self.count - mean * mean)
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    def reset(self):
+        self.buffer.clear()
+        self._sum = self._sumsq = 0.0
+        self._updates = 0
+
+
+class EMAFilter:
+    """Exponential moving average; the first sample initializes the state"""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value):
+        if self.value is None:
+            self.value = float(value)
+        else:
+            self.value += self.alpha * (float(value) - self.value)
+        return self.value
+
+    def reset(self):
+        self.value = None
+
+
+class MedianFilter:
+    """Median of the last `window` samples; rejects single-frame landmark glitches"""
+
+    def __init__(self, window):
+        self.buffer = RingBuffer(window)
+
+    def update(self, value):
+        self.buffer.append(value)
+        return float(np.median(self.buffer.raw()))
+
+    def reset(self):
+        self.buffer.clear()
+
+
+class Hysteresis:
+    """Two-threshold switch, so a signal hovering at one threshold does not chatter.
+
+    With enter < exit the switch is active while the signal is low (e.g. EAR
+    for closed eyes); with enter > exit it is active while the signal is high.
+    `rose` / `fell` report whether the last update switched it on / off.
+    """
+
+    def __init__(self, enter, exit):
+        self.enter = enter
+        self.exit = exit
+        self.active = False
+        self.rose = False
+        self.fell = False
+
+    def update(self, value):
+        was_active = self.active
+        low_active = self.enter < self.exit
+        if not self.active:
+            self.active = value < self.enter if low_active else value > self.enter
+        else:
+            self.active = not (value > self.exit if low_active else value < self.exit)
+        self.rose = self.active and not was_active
+        self.fell = was_active and not self.active
+        return self.active
+
+    def reset(self):
+        self.active = self.rose = self.fell = False
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from alerts import ClientPool, PooledTransport
+
+
+class FlakyTransport(PooledTransport):
+    def __init__(self):
+        super().__init__(object, pool_size=1)
+        self.calls = 0
+        self.first_started = threading.Event()
+
+    def _send(self, client, message):
+        self.calls += 1
+        if message == "fail":
+            self.first_started.set()
+            time.sleep(0.1)
+            raise RuntimeError("send failed")
+        return "ok"
+
+
+def test_discard_wakes_waiting_acquire():
+    transport = FlakyTransport()
+    results = []
+    failing = threading.Thread(target=lambda: results.append(_send(transport, "fail")), daemon=True)
+    failing.start()
+    transport.first_started.wait(1.0)
+    waiting = threading.Thread(target=lambda: results.append(_send(transport, "second")), daemon=True)
+    waiting.start()
+    failing.join(2.0)
+    waiting.join(2.0)
+    assert not waiting.is_alive()
+    assert sorted(results) == ["error", "ok"]
+
+
+def test_pool_reuses_released_clients():
+    created = []
+    pool = ClientPool(lambda: created.append(object()) or created[-1], size=2)
+    client = pool.acquire()
+    pool.release(client)
+    assert pool.acquire() is client
+    assert len(created) == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = ClientPool(object, size=1)
+    pool.acquire()
+    try:
+        pool.acquire(timeout=0.05)
+    except TimeoutError:
+        return
+    raise AssertionError("acquire should have timed out")
+
+
+def _send(transport, message):
+    try:
+        return transport.send(message)
+    except RuntimeError:
+        return "error"
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from audio_buffer import DROP_NEWEST, DROP_OLDEST, AudioBlockQueue
+
+
+def _block(value, size=4):
+    return bytes([value]) * size
+
+
+def _drain(queue):
+    values = []
+    while True:
+        block = queue.get(timeout=0)
+        if block is None:
+            return values
+        values.append(bytes(block.data)[0])
+
+
+def test_blocks_come_out_in_order_with_sequence_numbers():
+    queue = AudioBlockQueue(block_bytes=4, capacity=4)
+    for value in range(3):
+        assert queue.put(_block(value), timestamp=float(value))
+    first = queue.get(timeout=0)
+    assert (bytes(first.data), first.timestamp, first.seq) == (_block(0), 0.0, 1)
+    assert [queue.get(timeout=0).seq for _ in range(2)] == [2, 3]
+    assert queue.get(timeout=0) is None
+
+
+def test_drop_oldest_keeps_the_newest_blocks():
+    queue = AudioBlockQueue(block_bytes=4, capacity=3, policy=DROP_OLDEST)
+    assert all(queue.put(_block(value)) for value in range(5))
+    assert queue.stats()["overflows"] == 2
+    assert _drain(queue) == [2, 3, 4]
+
+
+def test_drop_newest_keeps_the_queued_blocks():
+    queue = AudioBlockQueue(block_bytes=4, capacity=3, policy=DROP_NEWEST)
+    results = [queue.put(_block(value)) for value in range(5)]
+    assert results == [True, True, True, False, False]
+    assert queue.stats()["overflows"] == 2
+    assert _drain(queue) == [0, 1, 2]
+
+
+def test_held_block_survives_a_full_queue():
+    queue = AudioBlockQueue(block_bytes=4, capacity=2, policy=DROP_OLDEST)
+    queue.put(_block(1))
+    held = queue.get(timeout=0)
+    for value in range(2, 8):
+        queue.put(_block(value))
+    # The consumer's slot is reserved, so the block it holds is not overwritten
+    assert bytes(held.data) == _block(1)
+    assert _drain(queue) == [6, 7]
+
+
+def test_stats_counters():
+    queue = AudioBlockQueue(block_bytes=4, capacity=3)
+    for value in range(4):
+        queue.put(_block(value), timestamp=0.0)
+    stats = queue.stats()
+    assert stats["depth"] == 3
+    assert stats["max_depth"] == 3
+    assert stats["overflows"] == 1
+    queue.get(timeout=0)
+    stats = queue.stats()
+    assert stats["depth"] == 2
+    assert stats["queue_latency_ms"] > 0
+    assert stats["max_queue_latency_ms"] >= stats["queue_latency_ms"]
+    queue.clear()
+    assert queue.stats()["depth"] == 0
+
+
+def test_blocking_put_waits_instead_of_dropping():
+    queue = AudioBlockQueue(block_bytes=4, capacity=1, policy=DROP_NEWEST)
+    queue.put(_block(1))
+    assert not queue.put(_block(2), block=True, timeout=0.05)
+    consumer = threading.Timer(0.05, lambda: queue.get(timeout=0))
+    consumer.start()
+    assert queue.put(_block(3), block=True, timeout=2.0)
+    consumer.join()
+    assert queue.stats()["overflows"] == 0
+    assert _drain(queue) == [3]
+
+
+def test_short_blocks_and_unknown_policy():
+    queue = AudioBlockQueue(block_bytes=4, capacity=2)
+    queue.put(b"\x01\x02")
+    assert bytes(queue.get(timeout=0).data) == b"\x01\x02"
+    with pytest.raises(ValueError):
+        AudioBlockQueue(block_bytes=4, policy="drop_random")
@@ -0,0 +1,15 @@
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from batch_analysis import _segments
+
+
+def test_segments_cover_the_video():
+    assert _segments(250, 100) == [(0, 100), (100, 200), (200, 250)]
+
+
+@pytest.mark.parametrize("frame_count", [0, -1])
+def test_unknown_frame_count_is_one_sequential_segment(frame_count):
+    assert _segments(frame_count, 100) == [(0, None)]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from duty_cycle import FULL, NO_FACE, STILL, DutyCycle
+
+FPS = 30
+
+
+def _run(cycle, seconds, face_visible=False, start=0.0, frame=None):
+    """Feed still frames at FPS; returns the timestamps FaceMesh ran at"""
+    frame = np.zeros((48, 64, 3), dtype=np.uint8) if frame is None else frame
+    runs = []
+    for i in range(int(seconds * FPS)):
+        timestamp = start + i / FPS
+        if cycle.should_process(frame, timestamp):
+            cycle.observe(face_visible, timestamp)
+            runs.append(timestamp)
+    return runs
+
+
+def test_empty_room_backs_off_from_min_interval_after_full_rate():
+    cycle = DutyCycle(hold=4.0, min_interval=0.25, max_interval=2.0)
+    runs = _run(cycle, 20.0)
+    after_hold = [t for t in runs if t >= 4.0]
+    gaps = np.diff(after_hold)
+    # Full rate must not have used up the backoff: 0.25, 0.5, 1, 2, then 2 s
+    assert np.allclose(gaps[:4], [0.25, 0.5, 1.0, 2.0], atol=1 / FPS)
+    assert all(gap <= 2.0 + 1 / FPS for gap in gaps)
+    assert cycle.mode == NO_FACE
+
+
+def test_worst_case_reaction_bounds_the_gaps():
+    cycle = DutyCycle(hold=1.0, still_interval=0.25, max_interval=2.0)
+    assert cycle.worst_case_reaction() == 0.0
+    runs = _run(cycle, 10.0)
+    assert cycle.mode == NO_FACE
+    assert cycle.worst_case_reaction() == 2.0
+    assert max(np.diff(runs)) <= cycle.worst_case_reaction() + 1 / FPS
+
+    runs = _run(cycle, 6.0, face_visible=True, start=10.0)
+    assert cycle.mode == STILL
+    assert cycle.worst_case_reaction() == 0.25
+    still = [t for t in runs if t >= 11.0]
+    assert max(np.diff(still)) <= cycle.worst_case_reaction() + 1 / FPS
+
+
+def test_motion_returns_to_full_rate():
+    cycle = DutyCycle(hold=1.0)
+    _run(cycle, 5.0)
+    assert cycle.mode == NO_FACE
+    moved = np.full((48, 64, 3), 200, dtype=np.uint8)
+    assert cycle.should_process(moved, 5.0)
+    assert cycle.mode == FULL
+    assert cycle.worst_case_reaction() == 0.0
+    assert cycle.stats()["wakeups"] == 1
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from event_bus import ALERT, LOG, REMINDER, EventBus, TkEventPump
+
+
+class FakeWidget:
+    """Records after() calls instead of running a Tk main loop"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.cancelled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append((delay, callback))
+        return f"after#{len(self.scheduled)}"
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+def test_handlers_run_in_posting_order_on_the_draining_thread():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(LOG, lambda event: seen.append(("log", event.payload["message"], threading.get_ident())))
+    bus.subscribe(ALERT, lambda event: seen.append(("alert", event.payload["message"], threading.get_ident())))
+    workers = [threading.Thread(target=bus.post, args=(LOG,), kwargs={"message": i}) for i in range(3)]
+    for worker in workers:
+        worker.start()
+        worker.join()
+    bus.post(ALERT, message="fire")
+    assert seen == []
+    assert bus.drain() == 4
+    assert [(kind, message) for kind, message, _ in seen] == [("log", 0), ("log", 1), ("log", 2), ("alert", "fire")]
+    assert {ident for _, _, ident in seen} == {threading.get_ident()}
+    assert bus.stats() == {"posted": 4, "delivered": 4, "pending": 0, "max_backlog": 4, "max_batch": 4}
+
+
+def test_failing_handler_does_not_stop_the_batch():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(LOG, lambda event: 1 / 0)
+    bus.subscribe(LOG, lambda event: seen.append(event.payload["message"]))
+    bus.post(LOG, message="a")
+    bus.post(LOG, message="b")
+    assert bus.drain() == 2
+    assert seen == ["a", "b"]
+
+
+def test_pump_dispatches_in_batches_and_catches_up_immediately():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(LOG, lambda event: seen.append(event.payload["message"]))
+    widget = FakeWidget()
+    pump = TkEventPump(widget, bus, interval_ms=50, batch=10)
+    for i in range(25):
+        bus.post(LOG, message=i)
+
+    assert pump.pump() == 10
+    assert seen == list(range(10))
+
+    pump.start()
+    pump.start()  # already scheduled
+    assert [delay for delay, _ in widget.scheduled] == [50]
+    widget.scheduled[0][1]()
+    # A backlog is left, so the next tick comes right away
+    assert widget.scheduled[1][0] == 1
+    widget.scheduled[1][1]()
+    assert seen == list(range(25))
+    assert widget.scheduled[2][0] == 50
+    assert bus.stats()["max_batch"] == 10
+
+    pump.stop()
+    assert widget.cancelled == ["after#3"]
+
+
+def test_scheduler_hands_reminders_to_the_bus(tmp_path, monkeypatch):
+    winsound = pytest.importorskip("winsound")
+    monkeypatch.setattr(winsound, "PlaySound", lambda *args: None)
+    monkeypatch.chdir(tmp_path)
+    from scheduler import TaskScheduler
+
+    bus = EventBus()
+    reminders = []
+    bus.subscribe(REMINDER, lambda event: reminders.append(event.payload["task"]["name"]))
+    scheduler = TaskScheduler(on_task=lambda task: bus.post(REMINDER, task=task))
+    scheduler._trigger_task({"name": "pills", "time": "08:00", "repeat": False})
+    assert scheduler.check_for_tasks() == []
+    assert reminders == []
+    bus.drain()
+    assert reminders == ["pills"]
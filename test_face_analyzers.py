@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from face_analyzers import NodAnalyzer
+from face_pipeline import FaceObservation
+from landmarks import FOREHEAD, NOSE_TIP
+
+FPS = 30
+
+
+def _points(displacement):
+    points = np.full((478, 3), 0.5, dtype=np.float32)
+    points[FOREHEAD, 1] = points[NOSE_TIP, 1] - displacement
+    return points
+
+
+def _nods(analyzer, displacements):
+    kinds = []
+    for index, displacement in enumerate(displacements):
+        observation = FaceObservation(None, _points(displacement), None, index / FPS, index)
+        kinds += [event.kind for event in analyzer.analyze(observation)]
+    return kinds.count("nod")
+
+
+def test_held_nod_is_reported_once():
+    analyzer = NodAnalyzer(threshold=0.1, cooldown=1.0)
+    # Three seconds above the threshold, well past the cooldown
+    assert _nods(analyzer, [0.05] * 5 + [0.15] * 3 * FPS) == 1
+    assert analyzer.nod_count == 1
+
+
+def test_repeated_nods_are_each_reported():
+    analyzer = NodAnalyzer(threshold=0.1, cooldown=1.0)
+    # Dropping below the 0.08 exit threshold re-arms the detector
+    nod = [0.15] * 5 + [0.05] * int(1.5 * FPS)
+    assert _nods(analyzer, [0.05] * 5 + nod * 3) == 3
+
+
+def test_nods_within_the_cooldown_count_once():
+    analyzer = NodAnalyzer(threshold=0.1, cooldown=1.0)
+    nod = [0.15] * 3 + [0.05] * 3
+    assert _nods(analyzer, nod * 4) == 1
+
+
+def test_hovering_at_the_threshold_does_not_chatter():
+    analyzer = NodAnalyzer(threshold=0.1, cooldown=0.0)
+    # Stays above the exit threshold, so it is one nod
+    assert _nods(analyzer, [0.11, 0.095, 0.105, 0.09, 0.11] * 10) == 1
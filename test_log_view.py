@@ -0,0 +1,72 @@
+from log_view import LogView
+
+
+class FakeText:
+    """Just enough of a Tk Text widget for LogView, one entry per line"""
+
+    def __init__(self):
+        self.lines = []
+
+    def tag_config(self, tag, **options):
+        pass
+
+    def after_idle(self, callback):
+        return "idle"
+
+    def after_cancel(self, after_id):
+        pass
+
+    def config(self, **options):
+        pass
+
+    def yview(self):
+        return 0.0, 1.0
+
+    def see(self, index):
+        pass
+
+    def insert(self, index, *args):
+        lines = [(args[i], args[i + 1]) for i in range(0, len(args), 2)]
+        if index == "1.0":
+            self.lines[:0] = lines
+        else:
+            self.lines += lines
+
+    def delete(self, start, end):
+        del self.lines[:int(end.split(".")[0]) - 1]
+
+
+def _log(view, count, start=0):
+    for i in range(start, start + count):
+        view.append(f"line {i}", is_alert=i % 10 == 0)
+        view.flush()
+
+
+def test_widget_stays_bounded_and_pages_back_from_disk(tmp_path):
+    text = FakeText()
+    view = LogView(text, path=str(tmp_path / "log.txt"), max_lines=50, trim_chunk=10, page_lines=20)
+    _log(view, 200)
+    assert len(text.lines) <= 60
+    first = text.lines[0][0]
+    assert view.page_back() == 20
+    assert text.lines[20][0] == first
+    assert text.lines[0][0].endswith(f"line {int(first.split()[-1]) - 20}\n")
+    alerts = [line for line, tag in text.lines if tag == "alert"]
+    assert all(int(line.split()[-1]) % 10 == 0 for line in alerts)
+    view.close()
+
+
+def test_index_is_capped_at_history_lines(tmp_path):
+    text = FakeText()
+    view = LogView(text, path=str(tmp_path / "log.txt"), max_lines=50, trim_chunk=10, page_lines=100,
+                   history_lines=100)
+    _log(view, 1000)
+    assert len(view._offsets) <= 100 + 10
+    assert len(view._alerts) == len(view._offsets)
+    paged = 0
+    while view.can_page_back():
+        paged += view.page_back()
+    assert paged <= 100
+    numbers = [int(line.split()[-1]) for line, _ in text.lines]
+    assert numbers == list(range(numbers[0], 1000))
+    view.close()
@@ -0,0 +1,100 @@
+import pytest
+
+from phrase_matcher import PhraseMatcher, phrase_table, tokenize
+
+KEYWORDS = {
+    "help": ["help me", "somebody help"],
+    "emergency": ["call the nurse", "can't breathe", "i fell"],
+    "fall": ["fell down"],
+    "nurse": [],
+}
+
+
+def _found(matcher, text):
+    return [(m.keyword, m.phrase, m.start, m.end, m.fuzzy) for m in matcher.match(text)]
+
+
+def test_synonyms_expand_to_their_keyword():
+    table = phrase_table({"Help": "help me", "water": ["I'm thirsty", "  "]})
+    assert table == {"help": {"help", "help me"}, "water": {"water", "i'm thirsty"}}
+    assert phrase_table(["fire", "Fire!"]) == {"fire": {"fire"}}
+    matcher = PhraseMatcher(KEYWORDS)
+    assert matcher.keywords() == {"help", "emergency", "fall", "nurse"}
+    assert _found(matcher, "I can’t breathe") == [("emergency", "can't breathe", 1, 3, False)]
+
+
+def test_multi_word_phrases_need_every_word_in_order():
+    matcher = PhraseMatcher(KEYWORDS)
+    assert _found(matcher, "please call the nurse") == [
+        ("emergency", "call the nurse", 1, 4, False),
+        ("nurse", "nurse", 3, 4, False),
+    ]
+    assert _found(matcher, "call a nurse") == [("nurse", "nurse", 2, 3, False)]
+    assert _found(matcher, "the nurse will call") == [("nurse", "nurse", 1, 2, False)]
+
+
+def test_overlapping_phrases():
+    matcher = PhraseMatcher(KEYWORDS)
+    # Same keyword: reported once, for the phrase that ends first
+    assert _found(matcher, "help me") == [("help", "help", 0, 1, False)]
+    assert _found(matcher, "somebody help") == [("help", "somebody help", 0, 2, False)]
+    # Different keywords sharing a word are both reported
+    assert _found(matcher, "i fell down") == [
+        ("emergency", "i fell", 0, 2, False),
+        ("fall", "fell down", 1, 3, False),
+    ]
+    # A repeated keyword that does not overlap is reported again
+    assert [m.start for m in matcher.match("help help")] == [0, 1]
+
+
+def test_one_edit_matches():
+    matcher = PhraseMatcher(KEYWORDS, max_edits=1)
+    for word in ("emergancy", "emergncy", "emergenncy", "emegrency"):
+        assert _found(matcher, word) == [("emergency", "emergency", 0, 1, True)], word
+    assert _found(matcher, "call the nurce") == [
+        ("emergency", "call the nurse", 0, 3, True),
+        ("nurse", "nurse", 2, 3, True),
+    ]
+
+
+def test_edit_distance_non_matches():
+    assert _found(PhraseMatcher(KEYWORDS), "emergancy") == []
+    matcher = PhraseMatcher(KEYWORDS, max_edits=1)
+    # Two edits away
+    assert _found(matcher, "emrgancy") == []
+    # Too short for fuzzy matching
+    assert _found(matcher, "hlep") == []
+    assert _found(matcher, "helps") == []
+    # One edit from two vocabulary words is ambiguous
+    ambiguous = PhraseMatcher({"pills": [], "mills": []}, max_edits=1)
+    assert _found(ambiguous, "bills") == []
+    assert _found(ambiguous, "pils") == [("pills", "pills", 0, 1, True)]
+
+
+def test_clear_and_re_add():
+    matcher = PhraseMatcher(KEYWORDS, max_edits=1)
+    matcher.match("help")
+    matcher.clear()
+    assert matcher.match("help me call the nurse") == []
+    assert matcher.match("emergancy") == []
+    assert matcher.keywords() == set()
+
+    matcher.add("fire")
+    matcher.add_synonyms("help", ["help me"])
+    assert _found(matcher, "fire help me") == [("fire", "fire", 0, 1, False), ("help", "help", 1, 2, False)]
+    # Re-registering a phrase under another keyword moves it
+    matcher.add("help me", "emergency")
+    assert _found(matcher, "help me") == [
+        ("help", "help", 0, 1, False),
+        ("emergency", "help me", 0, 2, False),
+    ]
+    assert matcher.phrases["help me"] == "emergency"
+
+
+def test_rejects_unsupported_edit_distance():
+    with pytest.raises(ValueError):
+        PhraseMatcher(KEYWORDS, max_edits=2)
+
+
+def test_tokenize_keeps_contractions():
+    assert tokenize("I can’t BREATHE, help_me!") == ["i", "can't", "breathe", "help", "me"]
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("cffi")
+pytest.importorskip("vosk")
+
+from audio_buffer import AudioBlockQueue
+from recognition_server import RecognitionServer, RecognitionStream
+
+
+class FakeDecoder:
+    """Records which stream each block was decoded for"""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.position = 0.0
+        self.finished = False
+
+    def feed(self, data):
+        self.log.append(self.name)
+        self.position += 0.25
+
+    def finish(self):
+        self.finished = True
+
+
+class FakeSource:
+    def __init__(self):
+        self.finished = threading.Event()
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def _stream(server, name, log, blocks, source=None):
+    stream = RecognitionStream(server, name, FakeDecoder(name, log), AudioBlockQueue(8, capacity=16), source)
+    for _ in range(blocks):
+        stream.audio_queue.put(b"\0" * 8)
+    server.streams[name] = stream
+    return stream
+
+
+def _wait_idle(server, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while server._run_queue or any(s.scheduled for s in server.streams.values()):
+        assert time.monotonic() < deadline, "worker did not go idle"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    server = RecognitionServer(model=object(), workers=1, quantum=2)
+    yield server
+    server.stop()
+
+
+def test_streams_take_turns_of_quantum_blocks(server):
+    log = []
+    busy = _stream(server, "busy", log, 8)
+    quiet = _stream(server, "quiet", log, 3)
+    # Queue both before the worker can pick either
+    with server._cond:
+        server._schedule(busy)
+        server._schedule(quiet)
+    _wait_idle(server)
+    assert log == ["busy", "busy", "quiet", "quiet", "busy", "busy", "quiet", "busy", "busy", "busy", "busy"]
+    assert (busy.turns, quiet.turns) == (4, 2)
+    assert (busy.blocks, quiet.blocks) == (8, 3)
+
+
+def test_finished_stream_ends_and_leaves_the_run_queue(server):
+    log, events = [], []
+    server.add_listener(events.append)
+    source = FakeSource()
+    finite = _stream(server, "file", log, 3, source)
+    live = _stream(server, "live", log, 0)
+    source.finished.set()
+    server._schedule(finite)
+    _wait_idle(server)
+    assert log == ["file"] * 3
+    assert finite.ended and finite.decoder.finished
+    assert [(e.kind, e.stream_id) for e in events] == [("end", "file")]
+    assert not finite.scheduled and finite not in server._run_queue
+    # An ended stream is not decoded again, and idle streams are never queued
+    server._schedule(finite)
+    _wait_idle(server)
+    assert [e.kind for e in events] == ["end"]
+    assert not live.scheduled and live.turns == 0
+
+
+def test_removed_stream_is_not_scheduled(server):
+    log = []
+    stream = _stream(server, "room", log, 2, FakeSource())
+    server.remove_stream("room")
+    assert stream.removed and stream.source.stopped
+    server._schedule(stream)
+    stream.push(b"\0" * 8)
+    assert not stream.scheduled
+    assert log == []
+    assert "room" not in server.stats()
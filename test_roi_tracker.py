@@ -0,0 +1,105 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from roi_tracker import RoiTracker
+
+WIDTH, HEIGHT = 640, 480
+
+
+class FakeFaceMesh:
+    """Finds a face filling the middle of whatever image it is given"""
+
+    def __init__(self, delay=0.0):
+        self.found = True
+        self.delay = delay
+        self.inputs = []
+        u = np.linspace(0.35, 0.65, 478)
+        self.landmarks = SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=0.1) for x, y in zip(u, u[::-1])])
+
+    def process(self, rgb):
+        self.inputs.append(rgb.shape[:2])
+        if self.delay:
+            time.sleep(self.delay)
+        return SimpleNamespace(multi_face_landmarks=[self.landmarks] if self.found else None)
+
+
+def _frame():
+    return np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def test_untracked_points_are_full_frame_coordinates():
+    tracker = RoiTracker(tracking=False)
+    points = tracker.process(FakeFaceMesh(), _frame())
+    assert points.shape == (478, 3)
+    assert np.isclose(points[:, 0].min(), 0.35) and np.isclose(points[:, 0].max(), 0.65)
+    assert tracker.face_box == (224, 168, 416, 312)
+    tracker.process(FakeFaceMesh(), _frame())
+    assert (tracker.full_frames, tracker.tracked_frames) == (2, 0)
+
+
+def test_tracked_crop_maps_back_to_the_full_frame():
+    tracker = RoiTracker(tracking=True)
+    mesh = FakeFaceMesh()
+    tracker.process(mesh, _frame())
+    assert mesh.inputs[-1] == (HEIGHT, WIDTH)
+    points = tracker.process(mesh, _frame())
+    x0, y0, x1, y1 = tracker.roi
+    assert (x1 - x0, y1 - y0) != (WIDTH, HEIGHT)
+    assert mesh.inputs[-1] == (y1 - y0, x1 - x0)
+    assert np.isclose(points[0, 0], (x0 + 0.35 * (x1 - x0)) / WIDTH)
+    assert np.isclose(points[0, 1], (y0 + 0.65 * (y1 - y0)) / HEIGHT)
+    assert (tracker.full_frames, tracker.tracked_frames) == (1, 1)
+
+
+def test_face_is_lost_after_repeated_misses_and_reacquired_full_frame():
+    tracker = RoiTracker(tracking=True, lost_after=2)
+    mesh = FakeFaceMesh()
+    tracker.process(mesh, _frame())
+    tracker.process(mesh, _frame())
+    face_box = tracker.face_box
+
+    mesh.found = False
+    # One miss keeps the face box and crop, so FaceMesh can re-detect inside it
+    assert tracker.process(mesh, _frame()) is None
+    roi = tracker.roi
+    assert tracker.face_box == face_box and roi is not None
+    assert tracker.process(mesh, _frame()) is None
+    assert mesh.inputs[-1] == (roi[3] - roi[1], roi[2] - roi[0])
+    assert tracker.face_box is None and tracker.roi is None
+
+    mesh.found = True
+    assert tracker.process(mesh, _frame()) is not None
+    assert mesh.inputs[-1] == (HEIGHT, WIDTH)
+    assert tracker.misses == 0
+    tracker.process(mesh, _frame())
+    assert tracker.full_frames == 2 and mesh.inputs[-1] != (HEIGHT, WIDTH)
+
+
+def test_scale_adapts_to_the_latency_budget():
+    tracker = RoiTracker(tracking=False, latency_budget_ms=5, min_scale=0.4, min_input_side=128)
+    slow = FakeFaceMesh(delay=0.015)
+    for _ in range(12):
+        tracker.process(slow, _frame())
+    assert tracker.scale == pytest.approx(0.4)
+    # The input shrinks with the scale, but never below min_input_side
+    assert min(slow.inputs[-1]) == 192
+
+    fast = FakeFaceMesh()
+    scales = []
+    for _ in range(40):
+        tracker.process(fast, _frame())
+        scales.append(tracker.scale)
+    assert 0.4 < scales[-1] <= 1.0
+
+
+def test_min_input_side_overrides_a_small_scale():
+    tracker = RoiTracker(tracking=False, latency_budget_ms=5, min_input_side=300)
+    tracker.scale = 0.4
+    mesh = FakeFaceMesh()
+    tracker.process(mesh, _frame())
+    assert min(mesh.inputs[-1]) == 300
@@ -0,0 +1,58 @@
+import numpy as np
+
+from sound_events import SoundEventDetector
+
+RATE = 16000
+
+
+def _noise(seconds, rng, level=300):
+    return rng.normal(0, level, int(seconds * RATE))
+
+
+def _tone(seconds, freq=3150, amplitude=8000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def _feed(detector, signal, block=4000):
+    pcm = np.clip(signal, -32768, 32767).astype(np.int16)
+    events = []
+    for start in range(0, len(pcm), block):
+        detector.tap(pcm[start:start + block].tobytes())
+        events += detector.process_pending()
+    return [event.kind for event in events]
+
+
+def test_smoke_alarm_tone_is_an_alarm_not_glass():
+    rng = np.random.default_rng(0)
+    detector = SoundEventDetector(samplerate=RATE)
+    _feed(detector, _noise(2.0, rng))
+    tone = _tone(3.0) + _noise(3.0, rng)
+    assert _feed(detector, tone) == ["alarm"]
+
+
+def test_t3_beep_pattern_accumulates_into_an_alarm():
+    rng = np.random.default_rng(1)
+    detector = SoundEventDetector(samplerate=RATE)
+    _feed(detector, _noise(2.0, rng))
+    beep, pause = _tone(0.5), np.zeros(int(0.5 * RATE))
+    cycle = np.concatenate([beep, pause, beep, pause, beep, np.zeros(int(1.5 * RATE))])
+    pattern = np.tile(cycle, 3)
+    kinds = _feed(detector, pattern + _noise(len(pattern) / RATE, rng))
+    assert "alarm" in kinds
+    assert "glass" not in kinds
+
+
+def test_background_noise_raises_nothing():
+    rng = np.random.default_rng(2)
+    detector = SoundEventDetector(samplerate=RATE)
+    assert _feed(detector, _noise(6.0, rng)) == []
+
+
+def test_sustained_alarm_repeats_after_the_cooldown():
+    rng = np.random.default_rng(3)
+    detector = SoundEventDetector(samplerate=RATE, cooldown=0.0)
+    _feed(detector, _noise(2.0, rng))
+    kinds = _feed(detector, _tone(4.0) + _noise(4.0, rng))
+    assert kinds.count("alarm") > 1
+    assert set(kinds) == {"alarm"}
@@ -0,0 +1,40 @@
+import numpy as np
+
+from streaming import RunningStats
+
+
+def test_running_stats_window():
+    stats = RunningStats(3)
+    for value in (1, 2, 3, 4):
+        stats.update(value)
+    assert stats.full
+    assert stats.mean == 3.0
+    assert np.isclose(stats.variance, np.var([2, 3, 4]))
+
+
+def test_reset_starts_over():
+    stats = RunningStats(3)
+    for value in (10, 20, 30, 40):
+        stats.update(value)
+    stats.reset()
+    assert stats.count == 0
+    assert stats.mean == 0.0
+    assert stats._updates == 0
+    stats.update(5)
+    assert stats.mean == 5.0
+    assert stats._updates == 1
+
+
+def test_resync_schedule_counts_from_reset():
+    stats = RunningStats(4)
+    stats.RESYNC_EVERY = 8
+    for value in range(5):
+        stats.update(value)
+    stats.reset()
+    # Drift injected after the reset is only cleared by the first resync
+    # counted from it, RESYNC_EVERY updates later
+    for value in range(7):
+        stats.update(1.0)
+    stats._sum += 100.0
+    stats.update(1.0)
+    assert np.isclose(stats.mean, 1.0)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from vad import VoiceActivityDetector
+
+RATE = 16000
+BLOCK = 4000  # 250 ms
+
+
+def _silence(rng, blocks=1):
+    return [rng.normal(0, 30, BLOCK).astype(np.int16).tobytes() for _ in range(blocks)]
+
+
+def _speech(blocks=1):
+    t = np.arange(BLOCK * blocks) / RATE
+    voiced = (5000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+    return [voiced[i * BLOCK:(i + 1) * BLOCK].tobytes() for i in range(blocks)]
+
+
+def _hiss(rng, blocks=1):
+    return [rng.normal(0, 5000, BLOCK).clip(-32768, 32767).astype(np.int16).tobytes() for _ in range(blocks)]
+
+
+def test_silence_never_reaches_the_decoder():
+    rng = np.random.default_rng(0)
+    vad = VoiceActivityDetector(samplerate=RATE)
+    for block in _silence(rng, 20):
+        assert vad.process(block) == ([], False)
+    assert not vad.active
+    assert vad.stats()["segments"] == 0
+    assert vad.stats()["blocks"] == 20
+
+
+def test_loud_hiss_is_not_speech():
+    rng = np.random.default_rng(1)
+    vad = VoiceActivityDetector(samplerate=RATE)
+    for block in _silence(rng, 4) + _hiss(rng, 4):
+        assert vad.process(block) == ([], False)
+
+
+def test_speech_onset_replays_the_pre_roll():
+    rng = np.random.default_rng(2)
+    vad = VoiceActivityDetector(samplerate=RATE, pre_roll_ms=300)
+    silence = _silence(rng, 4)
+    for block in silence:
+        vad.process(block)
+    speech = _speech(1)[0]
+    chunks, ended = vad.process(speech)
+    assert not ended and vad.active
+    pre, data = chunks
+    assert len(pre) == RATE * 300 // 1000
+    assert np.array_equal(pre, np.frombuffer(b"".join(silence), dtype=np.int16)[-len(pre):])
+    assert data == speech
+
+
+def test_hangover_keeps_the_gate_open_then_ends_the_segment():
+    rng = np.random.default_rng(3)
+    vad = VoiceActivityDetector(samplerate=RATE, hangover_ms=600)
+    for block in _silence(rng, 4):
+        vad.process(block)
+    for block in _speech(4):
+        chunks, ended = vad.process(block)
+        assert chunks and not ended
+    # 600 ms of hangover: two 250 ms silent blocks still pass, the third ends the segment
+    results = [vad.process(block) for block in _silence(rng, 4)]
+    assert [ended for _, ended in results] == [False, False, True, False]
+    assert [len(chunks) for chunks, _ in results] == [1, 1, 1, 0]
+    # A short pause inside the hangover does not split the segment
+    for block in _speech(2) + _silence(rng, 1) + _speech(2):
+        assert not vad.process(block)[1]
+    assert vad.stats()["segments"] == 2
+
+
+def test_long_speech_is_cut_at_max_segment():
+    rng = np.random.default_rng(4)
+    vad = VoiceActivityDetector(samplerate=RATE, max_segment_ms=2000)
+    for block in _silence(rng, 4):
+        vad.process(block)
+    ended = [vad.process(block)[1] for block in _speech(8)]
+    # Eight 250 ms blocks make 2 s
+    assert ended == [False] * 7 + [True]
+    assert not vad.active
+    assert vad.stats()["segments"] == 1
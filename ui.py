@@ -5,37 +5,82 @@ from tkinter import ttk, messagebox, scrolledtext, simpledialog
 from datetime import datetime
 import threading
 import winsound
-from PIL import Image, ImageTk
-import cv2
-import numpy as np
-from recognizer import SpeechRecognitionEngine
+from frame_buffer import LatestFrameBuffer, CaptureThread
+from model_registry import default_registry, LOADED, FAILED
 from scheduler import TaskScheduler
+from log_view import LogView
+from event_bus import EventBus, TkEventPump, RECOGNITION, GESTURE, REMINDER, ALERT, LOG, WARMUP
+from startup import StartupProfiler, Warmup, RUNNING, DONE
 import time
-import pyttsx3
 import customtkinter as ctk
 
-# Initialize the TTS engine once (at the top of your class or module)
-tts_engine = pyttsx3.init()
+# OpenCV, MediaPipe, Vosk and pyttsx3 are imported where they are first used
+# or by the warm-up threads, so the window can appear before they load.
+
+WARMUP_LABELS = {
+    "speech model": "Speech model",
+    "face mesh": "Face mesh",
+    "voice": "Voice",
+}
+
 
 class EmergencySoundTracker(tk.Tk):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler or StartupProfiler()
+        self.warmup = Warmup(self.profiler)
+        self.warmup_labels = {}
+        self.on_warmup_done = None  # called once on the Tk thread when every warm-up has finished
         self.title("Emergency Sound Tracker")
         self.geometry("1000x700")
         self.resizable(False, False)
 
         self.model_path = "vosk-model-small-en-us-0.15"
         self.alert_sound = os.path.join(os.path.dirname(__file__), "alarm.wav")
-        self.emergency_keywords = {"help", "fire", "emergency", "water", "food", "medicine"}
+        # keyword -> other phrases that mean the same thing
+        self.emergency_keywords = {
+            "help": {"help me", "somebody help"},
+            "fire": set(),
+            "emergency": {"call the nurse", "can't breathe", "i fell"},
+            "water": {"i'm thirsty"},
+            "food": {"i'm hungry"},
+            "medicine": {"my pills", "medication"},
+        }
+        self.keyword_max_edits = 0  # 1 also matches near misses; only useful without keyword_spotting
+        self.keyword_spotting = True  # decode only the keyword grammar instead of free speech
+        self.use_vad = True  # skip decoding while the room is silent
+        self.detect_sound_events = True  # falls, breaking glass and alarms from the same microphone
+        self.sound_events = None
         self.engine = None
+        self.model_registry = default_registry()
 
         self.gesture_thread = None
         self.gesture_running = False
+        self._gesture_stop = None  # stop event of the current gesture run
         self.camera_running = False
-        self.cap = None
-        self.camera_thread = None
+        self.camera_source = 0  # camera index, video file, image directory or 'synthetic[:N]'
+        self.source = None
+        self.frame_buffer = None
+        self.frame_subscribers = []
+        self.capture_thread = None
         self.detector = None
-        self.frame_image = None
+        self.alert_dispatcher = None  # shared by every gesture run, created on first use
+        self._dispatcher_lock = threading.Lock()
+        self.preview = None
+        self.preview_fps = 30  # display refresh cap for the camera preview
+        self.power_save = True  # skip FaceMesh while the room is empty or still
+        self.notifications = []
+        self.max_notifications = 4
+
+        # Worker threads only post here; the Tk loop drains it, so neither waits on the other
+        self.bus = EventBus()
+        self.bus.subscribe(LOG, self._on_log_event)
+        self.bus.subscribe(RECOGNITION, self._on_recognition_event)
+        self.bus.subscribe(GESTURE, self._on_gesture_event)
+        self.bus.subscribe(REMINDER, self._on_reminder_event)
+        self.bus.subscribe(ALERT, self._on_alert_event)
+        self.bus.subscribe(WARMUP, self._on_warmup_event)
+        self.event_pump = TkEventPump(self, self.bus)
 
         # Theme colors (moved to class scope)
         self.accent = "#009688"  # Teal
@@ -48,8 +93,11 @@ class EmergencySoundTracker(tk.Tk):
         self.btn_radius = 20
 
         # --- Layout ---
-        self._setup_layout()
+        with self.profiler.phase("build layout"):
+            self._setup_layout()
         self._update_clock()
+        self.event_pump.start()
+        self.bind("<Map>", self._on_first_map, add="+")
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _setup_layout(self):
@@ -118,16 +166,19 @@ class EmergencySoundTracker(tk.Tk):
         self.camera_frame.grid_propagate(False)
         self.camera_canvas = tk.Canvas(self.camera_frame, bg="#222", width=self.camera_width, height=self.camera_height, highlightthickness=0)
         self.camera_canvas.pack(expand=False, fill=tk.NONE)
-        self._show_placeholder_camera()
 
         # System log below camera feed (2/5)
         log_frame = tk.Frame(main_area, bg=self.bg_light, highlightbackground=self.accent_light, highlightthickness=2)
         log_frame.grid(row=1, column=0, sticky="nsew", padx=30, pady=(0, 30))
         log_label = tk.Label(log_frame, text="Recognition Log", font=("Segoe UI", 15, "bold"), fg=self.accent, bg=self.bg_light)
         log_label.pack(pady=(12, 0))
+        older_button = tk.Button(log_frame, text="Load older entries", font=("Segoe UI", 9), fg=self.accent_dark, bg=self.bg_light, bd=0, relief=tk.FLAT, command=self._load_older_log)
+        older_button.pack(anchor="e", padx=8)
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, font=("Consolas", 11), height=10, width=60, bg=self.bg_light, bd=0, relief=tk.FLAT)
         self.log_text.pack(pady=8, padx=8, fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
+        # Keeps the widget to the newest few thousand lines; the rest stay on disk
+        self.log_view = LogView(self.log_text)
 
         # Sidebar content (with Teal/Aqua theme)
         self.clock_label = ctk.CTkLabel(sidebar, text="", font=("Segoe UI", 15, "bold"), text_color=self.accent, fg_color="transparent")
@@ -157,13 +208,23 @@ class EmergencySoundTracker(tk.Tk):
         section3.pack(pady=(10, 2))
         self.add_task_btn = self._add_icon_button(sidebar, "Add Reminder", "⏰", 'Accent.TButton', self._add_scheduled_task)
         self.add_task_btn.pack(pady=12, ipadx=8, ipady=4, fill='x')
+        # Divider
+        ctk.CTkFrame(sidebar, height=2, fg_color=self.card_border).pack(fill='x', pady=8)
+        section4 = ctk.CTkLabel(sidebar, text="STARTUP", font=("Segoe UI", 11, "bold"), text_color=self.accent_dark, fg_color="transparent")
+        section4.pack(pady=(10, 2))
+        for name, label in WARMUP_LABELS.items():
+            status = ctk.CTkLabel(sidebar, text=f"{label}: waiting", font=("Segoe UI", 11), text_color=self.text_dark, fg_color="transparent", anchor="w")
+            status.pack(fill='x', padx=12)
+            self.warmup_labels[name] = status
         self.view_tasks_btn = self._add_icon_button(sidebar, "View Reminders", "📋", 'Accent.TButton', self._view_scheduled_tasks)
         self.view_tasks_btn.pack(pady=12, ipadx=8, ipady=4, fill='x')
         
         # Scheduler
-        self.scheduler = TaskScheduler(read_aloud_callback=self._read_aloud)
+        self.scheduler = TaskScheduler(
+            read_aloud_callback=self._read_aloud,
+            on_task=lambda task: self.bus.post(REMINDER, task=task)
+        )
         self.scheduler.start()
-        self.after(1000, self._check_scheduled_tasks)
 
     def _update_clock(self):
         now = datetime.now().strftime("%H:%M:%S")
@@ -174,94 +235,139 @@ class EmergencySoundTracker(tk.Tk):
         if self.camera_running:
             self.camera_running = False
             self.camera_button.configure(text="📷  Start Camera", fg_color=self.accent, hover_color=self.accent_dark)
-            self._log_message("Camera stopped.")
+            if self.capture_thread is not None:
+                self.capture_thread.stop()
+                self.capture_thread = None
+            if self.source is not None:
+                self.source.release()
+                self.source = None
+            preview_stats = self.preview.stats()
+            self.preview.detach()
+            self._log_message(f"Camera stopped. {self._frame_drop_summary()}")
+            self._log_message(f"Preview: {preview_stats}")
             self.gesture_button.configure(state='disabled')
-            if self.cap is not None:
-                self.cap.release()
-                self.cap = None
-            if self.camera_thread and self.camera_thread.is_alive():
-                self.camera_thread.join(timeout=1)
-            self._show_placeholder_camera()
         else:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
+            from frame_source import open_source
+            try:
+                self.source = open_source(self.camera_source)
+            except IOError:
+                self.source = None
+            if self.source is None or not self.source.is_opened():
                 self._log_message("Failed to start camera.", is_alert=True)
-                self.cap = None
+                self.source = None
                 return
+            # One capture thread feeds every consumer through a latest-frame-wins buffer
+            self.frame_buffer = LatestFrameBuffer()
+            self.frame_subscribers = []
+            self.capture_thread = CaptureThread(self.source, self.frame_buffer)
+            self.capture_thread.start()
             self.camera_running = True
             self.camera_button.configure(text="⏹️  Stop Camera", fg_color="#e53935", hover_color="#b71c1c")
             self._log_message("Camera started.")
             self.gesture_button.configure(state='normal')
-            self.camera_thread = threading.Thread(target=self._show_camera_feed, daemon=True)
-            self.camera_thread.start()
-
-    def _show_camera_feed(self):
-        while self.camera_running and self.cap is not None and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
-                break
-            # If gesture detection is running, let that thread handle the display
-            if not self.gesture_running:
-                self._update_camera_label(frame)
-            cv2.waitKey(10)
-            time.sleep(0.03)  # Limit update rate to reduce flicker
-        self.camera_canvas.delete("all")
-
-    def _update_camera_label(self, frame):
-        # Convert OpenCV BGR to RGB and then to ImageTk
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(rgb).resize((self.camera_width, self.camera_height))
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.frame_image = imgtk  # Prevent garbage collection
-        self.camera_canvas.delete("all")  # Clear previous image to prevent flicker
-        self.camera_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
+            if self.preview is None:
+                from preview import PreviewRenderer
+                # Starts out black, which doubles as the placeholder while the camera is off
+                self.preview = PreviewRenderer(self.camera_canvas, self.camera_width, self.camera_height, max_fps=self.preview_fps)
+            self.preview.attach(self.frame_buffer, render=self._render_overlay)
+
+    def _subscribe_frames(self, name, max_fps=None):
+        subscriber = self.frame_buffer.subscribe(name, max_fps=max_fps)
+        self.frame_subscribers.append(subscriber)
+        return subscriber
+
+    def _frame_drop_summary(self):
+        return ", ".join(f"{s.name}: {s.received} frames, {s.dropped} dropped" for s in self.frame_subscribers)
+
+    def _render_overlay(self, image):
+        # The gesture thread only detects; overlays are drawn onto the scaled
+        # preview frame on the Tk thread, for display only
+        detector = self.detector
+        if self.gesture_running and detector is not None:
+            detector.render(image)
 
     def _toggle_gesture_detection(self):
-        if not self.camera_running or self.cap is None:
+        if not self.camera_running or self.source is None:
             self._log_message("Camera must be started before gesture detection.", is_alert=True)
             return
         if self.gesture_running:
+            self._gesture_stop.set()
+            self._gesture_stop = None
             self.gesture_running = False
+            self.detector = None
             self.gesture_button.configure(text="✋  Start Gesture Detection", fg_color=self.accent_dark, hover_color=self.accent)
             self._log_message("Stopped gesture detection.")
         else:
+            # Each run gets its own stop event, so a quick stop and start cannot
+            # leave the previous loop running
+            stop = threading.Event()
+            self._gesture_stop = stop
             self.gesture_running = True
             self.gesture_button.configure(text="⏹️  Stop Gesture Detection", fg_color="#e53935", hover_color="#b71c1c")
             self._log_message("Started gesture detection.")
-            self.gesture_thread = threading.Thread(target=self._run_gesture_detection, daemon=True)
+            self.gesture_thread = threading.Thread(target=self._run_gesture_detection, args=(stop,), daemon=True)
             self.gesture_thread.start()
 
-    def _run_gesture_detection(self):
+    def _call_dispatcher(self):
+        # One dispatcher for every detector; it outlives a stopped run so a queued call still goes out
+        with self._dispatcher_lock:
+            if self.alert_dispatcher is None:
+                from gesture_detector import call_dispatcher
+                self.alert_dispatcher = call_dispatcher()
+            return self.alert_dispatcher
+
+    def _run_gesture_detection(self, stop):
+        detector = None
         try:
-            from gesture_detector import GestureDetector
-            self.detector = GestureDetector()
-            while self.gesture_running and self.camera_running and self.cap is not None and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-                processed_frame = self.detector.process_frame(frame)
-                self._update_camera_label(processed_frame)
-                cv2.waitKey(10)
-            self.detector = None
+            # The warm-up builds the first detector ahead of time; later starts build their own
+            detector = self.warmup.take("face mesh")
+            if detector is None:
+                from gesture_detector import GestureDetector
+                detector = GestureDetector(power_save=self.power_save, alert_dispatcher=self._call_dispatcher())
+            detector.pipeline.add_listener(
+                lambda event: self.bus.post(GESTURE, kind=event.kind, message=event.message)
+            )
+            if self._gesture_stop is stop:
+                self.detector = detector
+            subscriber = self._subscribe_frames("gesture")
+            while not stop.is_set() and self.camera_running:
+                frame = subscriber.get(timeout=0.5)
+                if frame is None:
+                    if subscriber.buffer.closed:
+                        break
+                    continue
+                detector.detect(frame.image, frame.timestamp)
+            if detector.duty_cycle is not None:
+                self.bus.post(LOG, message=f"Gesture power save: {detector.duty_cycle.stats()}", is_alert=False)
         except Exception as e:
-            self._log_message(f"Gesture detection error: {e}", is_alert=True)
+            self.bus.post(LOG, message=f"Gesture detection error: {e}", is_alert=True)
         finally:
-            self.gesture_running = False
+            if detector is not None:
+                detector.close()
+            if self._gesture_stop is stop:
+                # Ended on its own (camera stopped, error) rather than from the button
+                self._gesture_stop = None
+                self.gesture_running = False
+                self.detector = None
+                self.bus.post(GESTURE, kind="stopped", message=None)
+
+    def _on_gesture_event(self, event):
+        kind, message = event.payload["kind"], event.payload["message"]
+        if kind == "stopped":
             self.gesture_button.configure(text="✋  Start Gesture Detection", fg_color=self.accent_dark, hover_color=self.accent)
+        elif kind == "emergency":
+            self._raise_alert("EMERGENCY BLINK PATTERN", message)
+        else:
+            self._log_message(message)
 
-    def _check_scheduled_tasks(self):
-        """Check for any triggered tasks (called periodically)"""
-        tasks = self.scheduler.check_for_tasks()
-        for task in tasks:
-            self._log_message(f"REMINDER: {task['name']}", is_alert=True)
-            threading.Thread(
-                target=lambda: winsound.PlaySound(self.alert_sound, winsound.SND_FILENAME | winsound.SND_ASYNC),
-                daemon=True
-            ).start()
-            self._show_reminder_popup(task['name'])
-        
-        # Check again in 1 second
-        self.after(1000, self._check_scheduled_tasks)
+    def _on_reminder_event(self, event):
+        task = event.payload["task"]
+        self._log_message(f"REMINDER: {task['name']}", is_alert=True)
+        threading.Thread(
+            target=lambda: winsound.PlaySound(self.alert_sound, winsound.SND_FILENAME | winsound.SND_ASYNC),
+            daemon=True
+        ).start()
+        self._show_reminder_popup(task['name'])
 
     def _add_scheduled_task(self):
         """Open dialog to add a new scheduled task"""
@@ -294,83 +400,199 @@ class EmergencySoundTracker(tk.Tk):
         self._show_reminders_popup(task_list)
 
     def _read_aloud(self, text):
-        self._log_message(f"Reading aloud: {text}", is_alert=True)
+        # Called on the scheduler thread
+        self.bus.post(LOG, message=f"Reading aloud: {text}", is_alert=True)
         # Play alert sound (if you want)
         threading.Thread(
             target=lambda: winsound.PlaySound(self.alert_sound, winsound.SND_FILENAME | winsound.SND_ASYNC),
             daemon=True
         ).start()
         # Speak the text
-        threading.Thread(
-            target=lambda: tts_engine.say(text) or tts_engine.runAndWait(),
-            daemon=True
-        ).start()
+        threading.Thread(target=self._speak, args=(text,), daemon=True).start()
+
+    def _speak(self, text):
+        # Waits for the warm-up if the engine is still starting
+        self.warmup.start("voice", self._warm_voice)
+        engine = self.warmup.result("voice")
+        if engine is not None:
+            engine.say(text)
+            engine.runAndWait()
+
+    def _on_first_map(self, event):
+        if self.profiler.marks.get("window shown") is not None:
+            return
+        self.profiler.mark("window shown")
+        # Give the window a moment to paint before the warm-up threads compete for the GIL
+        self.after(50, self._start_warmup)
+
+    def _start_warmup(self):
+        self.warmup.add_listener(
+            lambda task: self.bus.post(WARMUP, name=task.name, state=task.state, progress=task.progress)
+        )
+        self.warmup.start("speech model", self._warm_speech_model)
+        self.warmup.start("face mesh", self._warm_face_mesh)
+        self.warmup.start("voice", self._warm_voice)
+
+    def _warm_speech_model(self, report):
+        # Load the model while the user is still looking at the window, so
+        # Start Listening only has to create a recognizer
+        import recognizer  # vosk, sounddevice and cffi
+        def on_progress(path, state, progress):
+            if state not in (LOADED, FAILED):
+                report(progress)
+        self.model_registry.add_listener(on_progress)
+        try:
+            return self.model_registry.get(self.model_path)
+        finally:
+            self.model_registry.remove_listener(on_progress)
+
+    def _warm_face_mesh(self, report):
+        import numpy as np
+        from gesture_detector import GestureDetector
+        report(0.5)
+        detector = GestureDetector(power_save=self.power_save, alert_dispatcher=self._call_dispatcher())
+        # The first process() call initializes the MediaPipe graph
+        detector.pipeline.process(np.zeros((self.camera_height, self.camera_width, 3), dtype=np.uint8))
+        return detector
+
+    def _warm_voice(self, report):
+        import pyttsx3
+        return pyttsx3.init()
+
+    def _on_warmup_event(self, event):
+        name, state, progress = event.payload["name"], event.payload["state"], event.payload["progress"]
+        label = WARMUP_LABELS.get(name, name)
+        task = self.warmup.tasks[name]
+        if state == RUNNING:
+            text = f"{label}: loading {progress:.0%}"
+        elif state == DONE:
+            text = f"{label}: ready ({task.seconds:.1f}s)"
+            self._log_message(f"{label} ready.")
+        else:
+            text = f"{label}: failed"
+            self._log_message(f"Failed to load {label.lower()}: {task.error}", is_alert=True)
+        if name in self.warmup_labels:
+            self.warmup_labels[name].configure(text=text)
+        if state != RUNNING and self.warmup.all_done() and self.on_warmup_done is not None:
+            callback, self.on_warmup_done = self.on_warmup_done, None
+            callback()
 
     def _toggle_listening(self):
         if self.engine and self.engine.is_running:
             self.engine.stop()
             self.engine = None
+            self._stop_sound_events()
             self.start_button.configure(text="🎤  Start Listening", fg_color=self.accent, hover_color=self.accent_dark)
             self._log_message("Stopped listening.")
         else:
+            # Never wait for the model here: registry.get() would block the Tk thread
+            state = self.model_registry.state(self.model_path)
+            if state in (None, FAILED):
+                self.warmup.start("speech model", self._warm_speech_model)
+                self._log_message("Speech model is not loaded, retrying in the background. Try again shortly.")
+                return
+            if state != LOADED:
+                progress = self.model_registry.progress(self.model_path)
+                self._log_message(f"Speech model is still loading ({progress:.0%}), try again shortly.")
+                return
             try:
-                self.engine = SpeechRecognitionEngine(model_path=self.model_path)
-                self.engine.start(self._on_text_recognized)
+                from recognizer import SpeechRecognitionEngine
+                from vad import VoiceActivityDetector
+                from sound_events import SoundEventDetector
+                self.engine = SpeechRecognitionEngine(
+                    model_path=self.model_path,
+                    registry=self.model_registry,
+                    keywords=self.emergency_keywords,
+                    use_grammar=self.keyword_spotting,
+                    max_edits=self.keyword_max_edits,
+                    vad=VoiceActivityDetector() if self.use_vad else None
+                )
+                if self.detect_sound_events:
+                    self.sound_events = SoundEventDetector(on_event=self._on_sound_event)
+                    self.sound_events.start()
+                    self.engine.add_tap(self.sound_events.tap)
+                self.engine.start(self._on_text_recognized, self._on_keyword_detected)
                 self.start_button.configure(text="⏹️  Stop Listening", fg_color="#e53935", hover_color="#b71c1c")
                 self._log_message("Started listening.")
             except Exception as e:
+                self._stop_sound_events()
                 messagebox.showerror("Error", str(e))
 
+    def _stop_sound_events(self):
+        if self.sound_events is not None:
+            self.sound_events.stop()
+            self._log_message(f"Sound event detection: {self.sound_events.stats()}")
+            self.sound_events = None
+
+    # The three callbacks below run on the sound-event and recognition
+    # threads; they only post to the bus and return straight to decoding.
+    def _on_sound_event(self, event):
+        self.bus.post(ALERT, what=event.kind.upper(), detail=event.message)
+
     def _on_text_recognized(self, text):
-        self._log_message(f"Recognized: {text}")
-        words = text.lower().split()
-        found = self.emergency_keywords.intersection(words)
-        if found:
-            keyword_str = ", ".join(found)
-            self._log_message(f"🚨 ALERT: {keyword_str.upper()} DETECTED!", is_alert=True)
-            threading.Thread(
-                target=lambda: winsound.PlaySound(self.alert_sound, winsound.SND_FILENAME | winsound.SND_ASYNC),
-                daemon=True
-            ).start()
-            messagebox.showwarning("Emergency", f"Detected: {keyword_str.upper()}")
+        self.bus.post(RECOGNITION, text=text)
 
-    def _log_message(self, message, is_alert=False):
-        self.log_text.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        tag = "alert" if is_alert else "normal"
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n", tag)
+    def _on_keyword_detected(self, keyword, early):
+        # Early keywords fire from partial results, before the utterance ends;
+        # the engine reports each spoken keyword only once
+        self.bus.post(ALERT, what=keyword.upper(), detail=None)
 
-        if is_alert:
-            self.log_text.tag_config("alert", foreground="red", font=("Courier", 11, "bold"))
-        else:
-            self.log_text.tag_config("normal", foreground="black")
+    def _on_log_event(self, event):
+        self._log_message(event.payload["message"], event.payload["is_alert"])
 
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+    def _on_recognition_event(self, event):
+        self._log_message(f"Recognized: {event.payload['text']}")
+
+    def _on_alert_event(self, event):
+        self._raise_alert(event.payload["what"], event.payload["detail"])
+
+    def _raise_alert(self, what, detail=None):
+        self._log_message(f"🚨 ALERT: {what} DETECTED!" + (f" {detail}" if detail else ""), is_alert=True)
+        threading.Thread(
+            target=lambda: winsound.PlaySound(self.alert_sound, winsound.SND_FILENAME | winsound.SND_ASYNC),
+            daemon=True
+        ).start()
+        self._show_notification("🚨 Emergency", f"Detected: {what}")
+
+    def _log_message(self, message, is_alert=False):
+        # Tk thread only; lines are inserted together once the current tick is done
+        self.log_view.append(message, is_alert)
+
+    def _load_older_log(self):
+        if not self.log_view.page_back():
+            self._log_message("No older log entries.")
 
     def _add_keyword(self):
-        keyword = self.keyword_var.get().strip().lower()
-        if keyword:
-            self.emergency_keywords.add(keyword)
-            self._log_message(f"Added keyword: {keyword}")
+        # "phrase = keyword" adds a synonym of an existing keyword
+        entry = self.keyword_var.get().strip().lower()
+        phrase, _, keyword = (part.strip() for part in entry.partition("="))
+        if phrase:
+            if keyword:
+                self.emergency_keywords.setdefault(keyword, set()).add(phrase)
+                self._log_message(f"Added phrase for {keyword}: {phrase}")
+            else:
+                self.emergency_keywords.setdefault(phrase, set())
+                self._log_message(f"Added keyword: {phrase}")
+            if self.engine:
+                self.engine.set_keywords(self.emergency_keywords)
             self.keyword_var.set("")
 
     def _on_close(self):
         """Handle window closing"""
+        self.event_pump.stop()
+        if self.preview is not None:
+            self.preview.detach()
+        self.log_view.close()
         if self.engine and self.engine.is_running:
             self.engine.stop()
+        if self.sound_events is not None:
+            self.sound_events.stop()
         if hasattr(self, 'scheduler'):
             self.scheduler.stop()
+        if self.alert_dispatcher is not None:
+            self.alert_dispatcher.stop()
         self.destroy()
 
-    def _show_placeholder_camera(self):
-        # Create a blank (black) image as a placeholder
-        blank = np.zeros((self.camera_height, self.camera_width, 3), dtype=np.uint8)
-        img = Image.fromarray(blank)
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.frame_image = imgtk  # Prevent garbage collection
-        self.camera_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
-
     def _add_icon_button(self, parent, text, icon, style, command, **kwargs):
         btn = ctk.CTkButton(
             parent,
@@ -409,6 +631,34 @@ class EmergencySoundTracker(tk.Tk):
         # Center the popup
         self.after(100, lambda: popup.geometry(f"+{self.winfo_x() + self.winfo_width()//2 - 170}+{self.winfo_y() + self.winfo_height()//2 - 100}"))
 
+    def _show_notification(self, title, text, timeout_ms=8000):
+        """Non-modal toast in the window's top-right corner that closes itself"""
+        while len(self.notifications) >= self.max_notifications:
+            self._close_notification(self.notifications[0])
+        toast = ctk.CTkToplevel(self)
+        toast.overrideredirect(True)
+        toast.attributes('-topmost', True)
+        toast.configure(fg_color="#e53935")
+        ctk.CTkLabel(toast, text=title, font=("Segoe UI", 15, "bold"), text_color="white").pack(padx=16, pady=(10, 0), anchor="w")
+        ctk.CTkLabel(toast, text=text, font=("Segoe UI", 13), text_color="white", wraplength=280, justify="left").pack(padx=16, pady=(2, 10), anchor="w")
+        toast.bind("<Button-1>", lambda e: self._close_notification(toast))
+        self.notifications.append(toast)
+        self._stack_notifications()
+        toast.after(timeout_ms, lambda: self._close_notification(toast))
+
+    def _close_notification(self, toast):
+        if toast in self.notifications:
+            self.notifications.remove(toast)
+            toast.destroy()
+            self._stack_notifications()
+
+    def _stack_notifications(self):
+        x = self.winfo_x() + self.winfo_width() - 330
+        y = self.winfo_y() + 60
+        for toast in self.notifications:
+            toast.geometry(f"310x80+{x}+{y}")
+            y += 90
+
     def _show_reminders_popup(self, reminders):
         popup = ctk.CTkToplevel(self)
         popup.title("📋 Scheduled Reminders")
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Energy + zero-crossing voice activity detection for 16-bit mono PCM.
+
+    Each block is split into short frames. A frame is speech when its energy
+    is well above an adaptive noise floor and its zero-crossing rate is not
+    hiss-like. Speech keeps the gate open for `hangover_ms` after the last
+    speech frame, and the `pre_roll_ms` of audio before the onset is replayed
+    so the first syllable is not clipped.
+    """
+
+    def __init__(self, samplerate=16000, frame_ms=20, energy_ratio=4.0, min_energy=1e-5,
+                 max_zcr=0.4, min_speech_frames=2, hangover_ms=600, pre_roll_ms=300,
+                 max_segment_ms=15000, floor_rise=0.02):
+        self.samplerate = samplerate
+        self.frame = max(1, samplerate * frame_ms // 1000)
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.max_zcr = max_zcr
+        self.min_speech_frames = min_speech_frames
+        self.hangover = samplerate * hangover_ms // 1000
+        # The floor is frozen during speech; cap segments so a noise step that
+        # starts mid-utterance cannot hold the gate open forever
+        self.max_segment = samplerate * max_segment_ms // 1000
+        self.floor_rise = floor_rise
+
+        self.noise_floor = None
+        self.active = False
+        self._silent_samples = 0
+        self._segment_samples = 0
+        self._preroll = np.zeros(samplerate * pre_roll_ms // 1000, dtype=np.int16)
+        self._pre_pos = 0
+        self._pre_len = 0
+
+        self.blocks = 0
+        self.speech_blocks = 0
+        self.segments = 0
+
+    def _frame_features(self, samples):
+        count = len(samples) // self.frame
+        if count == 0:
+            frames = samples[None, :].astype(np.float32)
+        else:
+            frames = samples[:count * self.frame].reshape(count, self.frame).astype(np.float32)
+        frames *= 1.0 / 32768
+        energy = np.einsum("ij,ij->i", frames, frames) / frames.shape[1]
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+        return energy, zcr
+
+    def _update_floor(self, energy):
+        # Falls immediately to quieter frames, rises slowly with louder noise
+        if self.noise_floor is None:
+            self.noise_floor = float(np.median(energy))
+        for e in energy:
+            if e < self.noise_floor:
+                self.noise_floor = float(e)
+            else:
+                self.noise_floor += self.floor_rise * (float(e) - self.noise_floor)
+        self.noise_floor = max(self.noise_floor, self.min_energy / self.energy_ratio)
+
+    def is_speech(self, samples):
+        """True when enough frames in the block look like speech"""
+        energy, zcr = self._frame_features(samples)
+        floor = self.noise_floor if self.noise_floor is not None else float(np.median(energy))
+        threshold = max(floor * self.energy_ratio, self.min_energy)
+        speech = (energy > threshold) & (zcr < self.max_zcr)
+        if not self.active:
+            self._update_floor(energy)
+        return np.count_nonzero(speech) >= min(self.min_speech_frames, len(speech))
+
+    def _remember(self, samples):
+        capacity = len(self._preroll)
+        if capacity == 0:
+            return
+        if len(samples) >= capacity:
+            self._preroll[:] = samples[-capacity:]
+            self._pre_pos = 0
+            self._pre_len = capacity
+            return
+        end = self._pre_pos + len(samples)
+        if end <= capacity:
+            self._preroll[self._pre_pos:end] = samples
+        else:
+            split = capacity - self._pre_pos
+            self._preroll[self._pre_pos:] = samples[:split]
+            self._preroll[:end - capacity] = samples[split:]
+        self._pre_pos = end % capacity
+        self._pre_len = min(capacity, self._pre_len + len(samples))
+
+    def _take_preroll(self):
+        ordered = np.concatenate((self._preroll[self._pre_pos:], self._preroll[:self._pre_pos]))
+        pre = ordered[len(ordered) - self._pre_len:]
+        self._pre_len = 0
+        return pre
+
+    def process(self, data):
+        """Gate one block of PCM bytes.
+
+        Returns (chunks, ended): the buffers the decoder should get for this
+        block (pre-roll first at an onset, empty during silence) and whether a
+        speech segment just ended, i.e. the decoder should be finalized.
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        self.blocks += 1
+        speech = self.is_speech(samples)
+        if speech:
+            self._silent_samples = 0
+        else:
+            self._silent_samples += len(samples)
+
+        if not self.active:
+            if not speech:
+                self._remember(samples)
+                return [], False
+            self.active = True
+            self._segment_samples = len(samples)
+            self.segments += 1
+            self.speech_blocks += 1
+            pre = self._take_preroll()
+            return ([pre, data] if len(pre) else [data]), False
+
+        self.speech_blocks += 1
+        self._segment_samples += len(samples)
+        if self._silent_samples >= self.hangover or self._segment_samples >= self.max_segment:
+            self.active = False
+            return [data], True
+        return [data], False
+
+    def reset(self):
+        self.active = False
+        self._silent_samples = 0
+        self._pre_len = 0
+
+    def stats(self):
+        return {
+            "blocks": self.blocks,
+            "speech_blocks": self.speech_blocks,
+            "segments": self.segments,
+            "noise_floor_db": round(10 * np.log10(self.noise_floor), 1) if self.noise_floor else None,
+        }